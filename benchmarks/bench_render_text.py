@@ -0,0 +1,68 @@
+"""
+Benchmark rendering 10k labels with and without the font cache and text atlas.
+
+Usage: python benchmarks/bench_render_text.py [font.ttf] [labels]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+import PIL.Image
+import PIL.ImageDraw
+import PIL.ImageFont
+
+from nodetool.nodes.lib.pillow.text import clear_caches, draw_text, load_font
+
+DEFAULT_FONT = Path(__file__).parents[1] / "tests" / "image" / "DejaVuSans.ttf"
+WORDS = ["person", "car", "dog", "bicycle", "traffic light", "stop sign", "bus"]
+
+
+def make_labels(count: int) -> list[tuple[tuple[int, int], str, int]]:
+    rng = random.Random(0)
+    return [
+        (
+            (rng.randrange(0, 1900), rng.randrange(0, 1060)),
+            f"{rng.choice(WORDS)} {rng.randrange(50, 100)}%",
+            rng.choice([12, 14, 16]),
+        )
+        for _ in range(count)
+    ]
+
+
+def uncached(image, labels, font_path):
+    draw = PIL.ImageDraw.Draw(image)
+    for xy, text, size in labels:
+        draw.text(xy, text, font=PIL.ImageFont.truetype(font_path, size), fill="red")
+
+
+def font_cache(image, labels, font_path):
+    for xy, text, size in labels:
+        draw_text(image, xy, text, load_font(font_path, size), "red", use_atlas=False)
+
+
+def font_cache_and_atlas(image, labels, font_path):
+    for xy, text, size in labels:
+        draw_text(image, xy, text, load_font(font_path, size), "red")
+
+
+def main():
+    font_path = sys.argv[1] if len(sys.argv) > 1 else str(DEFAULT_FONT)
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    labels = make_labels(count)
+
+    for render in (uncached, font_cache, font_cache_and_atlas):
+        clear_caches()
+        image = PIL.Image.new("RGB", (2048, 1080), "white")
+        start = time.perf_counter()
+        render(image, labels, font_path)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{render.__name__:<22} {elapsed * 1000:9.1f} ms "
+            f"{count / elapsed:10.0f} labels/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
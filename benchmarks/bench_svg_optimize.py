@@ -0,0 +1,143 @@
+"""
+Benchmark the SVG optimization pass on a document shaped like the output of
+the SVG nodes: one drop shadow filter per shape, grid lines, and heatmap cells
+that carry the default stroke attributes.
+
+Output sizes and the cost of the pass are measured anywhere. Render times need
+the cairo library.
+
+Usage: python benchmarks/bench_svg_optimize.py [cells]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_optimize import optimize_content
+from nodetool.nodes.lib.svg_render import render_pixels
+from nodetool.nodes.lib.svg_serialize import serialize_document
+
+SIZE = 1024
+
+
+def timed(name, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<28} {best * 1000:9.1f} ms")
+    return best
+
+
+def shadow() -> SVGElement:
+    return SVGElement(
+        name="filter",
+        attributes={"id": "filter_drop_shadow"},
+        children=[
+            SVGElement(
+                name="feGaussianBlur",
+                attributes={"in": "SourceAlpha", "stdDeviation": "3.0"},
+            ),
+            SVGElement(name="feOffset", attributes={"dx": "2", "dy": "2"}),
+            SVGElement(name="feFlood", attributes={"flood-color": "#000000"}),
+            SVGElement(
+                name="feComposite", attributes={"operator": "in", "in2": "SourceAlpha"}
+            ),
+            SVGElement(
+                name="feMerge",
+                children=[
+                    SVGElement(name="feMergeNode"),
+                    SVGElement(name="feMergeNode", attributes={"in": "SourceGraphic"}),
+                ],
+            ),
+        ],
+    )
+
+
+def make_content(cells: int) -> list:
+    rng = np.random.default_rng(0)
+    side = int(cells**0.5)
+    step = SIZE / side
+    palette = ["#f7fbff", "#c6dbef", "#6baed6", "#2171b5", "#08306b"]
+    content = []
+    for row in range(side):
+        for column in range(side):
+            content.append(
+                SVGElement(
+                    name="rect",
+                    attributes={
+                        "x": str(int(column * step)),
+                        "y": str(int(row * step)),
+                        "width": str(int(step)),
+                        "height": str(int(step)),
+                        "fill": palette[rng.integers(0, 2)],
+                        "stroke": "none",
+                        "stroke-width": "1",
+                    },
+                )
+            )
+    for i in range(side + 1):
+        position = str(int(i * step))
+        for x1, y1, x2, y2 in (
+            (position, "0", position, SIZE),
+            ("0", position, SIZE, position),
+        ):
+            content.append(
+                SVGElement(
+                    name="line",
+                    attributes={
+                        "x1": x1,
+                        "y1": y1,
+                        "x2": str(x2),
+                        "y2": str(y2),
+                        "stroke": "#333333",
+                        "stroke-width": "1",
+                    },
+                )
+            )
+    for _ in range(100):
+        content.append(shadow())
+        content.append(
+            SVGElement(
+                name="circle",
+                attributes={
+                    "cx": str(rng.integers(0, SIZE)),
+                    "cy": str(rng.integers(0, SIZE)),
+                    "r": "12",
+                    "fill": "#ff7f0e",
+                    "stroke": "none",
+                    "stroke-width": "1",
+                    "filter": "url(#filter_drop_shadow)",
+                },
+            )
+        )
+    return content
+
+
+def main():
+    cells = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    content = make_content(cells)
+    viewBox = f"0 0 {SIZE} {SIZE}"
+
+    original = serialize_document(content, SIZE, SIZE, viewBox)
+    optimized = serialize_document(optimize_content(content), SIZE, SIZE, viewBox)
+    print(f"{len(content)} top-level elements")
+    print(f"{'document size':<28} {len(original):>9} bytes")
+    print(f"{'optimized size':<28} {len(optimized):>9} bytes")
+    timed("optimize_content", lambda: optimize_content(content))
+
+    try:
+        import cairosvg  # noqa: F401
+    except OSError as e:
+        print(f"skipping rendering: {e.__class__.__name__}")
+        return
+
+    timed("render original", lambda: render_pixels(original, SIZE, SIZE), repeat=1)
+    timed("render optimized", lambda: render_pixels(optimized, SIZE, SIZE), repeat=1)
+
+
+if __name__ == "__main__":
+    main()
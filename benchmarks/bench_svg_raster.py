@@ -0,0 +1,105 @@
+"""
+Benchmark SVG rasterization through a PNG round-trip against reading the cairo
+surface directly, and against the native rasterizer for primitive shapes.
+
+The conversion section compares a PNG encode and decode of a premultiplied
+surface-sized buffer with the vectorized unpremultiply, and the native section
+draws the document without cairosvg. Both run anywhere. The end-to-end section
+needs the cairo library.
+
+Usage: python benchmarks/bench_svg_raster.py [size] [scale]
+"""
+
+import io
+import sys
+import time
+
+import numpy as np
+import PIL.Image
+
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_native import primitive_shapes, render_shapes
+from nodetool.nodes.lib.svg_render import render_pixels, unpremultiply_bgra
+from nodetool.nodes.lib.svg_serialize import serialize_document
+
+
+def timed(name, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<28} {best * 1000:9.1f} ms")
+    return best
+
+
+def png_round_trip(pixels):
+    buffer = io.BytesIO()
+    PIL.Image.fromarray(pixels).save(buffer, format="PNG")
+    image = PIL.Image.open(io.BytesIO(buffer.getvalue()))
+    image.load()
+
+
+def make_content(size: int) -> list[SVGElement]:
+    rng = np.random.default_rng(0)
+    return [
+        SVGElement(
+            name="circle",
+            attributes={
+                "cx": str(x),
+                "cy": str(y),
+                "r": str(r),
+                "fill": f"#{c:06x}",
+                "fill-opacity": "0.6",
+            },
+        )
+        for x, y, r, c in zip(
+            rng.integers(0, size, 500),
+            rng.integers(0, size, 500),
+            rng.integers(10, size // 8, 500),
+            rng.integers(0, 0xFFFFFF, 500),
+        )
+    ]
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    scale = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    pixels = size * scale
+
+    print(f"conversion of a {pixels}x{pixels} surface")
+    rng = np.random.default_rng(0)
+    surface = rng.integers(0, 256, (pixels, pixels, 4), dtype=np.uint8)
+    surface[..., :3] = np.minimum(surface[..., :3], surface[..., 3:])
+    timed("png encode + decode", lambda: png_round_trip(surface), repeat=1)
+    timed("unpremultiply_bgra", lambda: unpremultiply_bgra(surface))
+
+    print(f"rendering of a {size}px document at scale {scale}")
+    content = make_content(size)
+    svg = serialize_document(content, size, size, f"0 0 {size} {size}")
+    view_box = (0, 0, size, size)
+    operations = primitive_shapes(content, scale)
+    timed(
+        "render_shapes",
+        lambda: render_shapes(operations, pixels, pixels, view_box),
+        repeat=1,
+    )
+
+    try:
+        import cairosvg
+    except OSError as e:
+        print(f"skipping end-to-end rendering: {e.__class__.__name__}")
+        return
+
+    def through_png():
+        png = cairosvg.svg2png(
+            bytestring=svg, output_width=pixels, output_height=pixels
+        )
+        PIL.Image.open(io.BytesIO(png)).load()
+
+    timed("cairosvg.svg2png + decode", through_png, repeat=1)
+    timed("render_pixels", lambda: render_pixels(svg, pixels, pixels), repeat=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark path simplification on a generated contour: a wavy ring with many
+points, like the output of contour tracing on a large mask.
+
+Point counts and the cost of simplifying are measured anywhere. Render times
+need the cairo library.
+
+Usage: python benchmarks/bench_svg_simplify.py [points] [tolerance]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_render import render_pixels
+from nodetool.nodes.lib.svg_serialize import serialize_document
+from nodetool.nodes.lib.svg_simplify import simplify_content
+
+SIZE = 1024
+
+
+def timed(name, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<28} {best * 1000:9.1f} ms")
+    return best
+
+
+def make_content(points: int) -> list:
+    t = np.linspace(0, 2 * np.pi, points, endpoint=False)
+    radius = SIZE * 0.4 + 6 * np.sin(40 * t) + np.sin(997 * t)
+    xs = SIZE / 2 + radius * np.cos(t)
+    ys = SIZE / 2 + radius * np.sin(t)
+    d = "M" + " L".join(f"{x:.3f},{y:.3f}" for x, y in zip(xs, ys)) + "Z"
+    return [SVGElement(name="path", attributes={"d": d, "fill": "#2171b5"})]
+
+
+def main():
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    tolerance = float(sys.argv[2]) if len(sys.argv) > 2 else 0.25
+    content = make_content(points)
+    viewBox = f"0 0 {SIZE} {SIZE}"
+
+    def simplify():
+        return simplify_content(content, tolerance, SIZE, SIZE, viewBox)
+
+    simplified = simplify()
+    original = serialize_document(content, SIZE, SIZE, viewBox)
+    reduced = serialize_document(simplified, SIZE, SIZE, viewBox)
+    kept = simplified[0].attributes["d"].count(",")
+    print(f"{'points':<28} {points:>9}")
+    print(f"{'points kept':<28} {kept:>9}")
+    print(f"{'document size':<28} {len(original):>9} bytes")
+    print(f"{'simplified size':<28} {len(reduced):>9} bytes")
+    timed("simplify_content", simplify)
+
+    try:
+        import cairosvg  # noqa: F401
+    except OSError as e:
+        print(f"skipping rendering: {e.__class__.__name__}")
+        return
+
+    timed("render original", lambda: render_pixels(original, SIZE, SIZE), repeat=1)
+    timed("render simplified", lambda: render_pixels(reduced, SIZE, SIZE), repeat=1)
+
+
+if __name__ == "__main__":
+    main()
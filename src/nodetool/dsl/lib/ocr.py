@@ -8,6 +8,46 @@ from nodetool.dsl.graph import GraphNode
 import nodetool.nodes.lib.ocr
 
 
+class BatchOCR(GraphNode):
+    """
+    Performs OCR on many images in batches, using PaddleOCR in worker processes.
+    image, text, ocr, document, batch
+
+    Use cases:
+    - Extract text from a folder of receipts or invoices
+    - Digitize scanned document pages in bulk
+    - Measure OCR throughput on a dataset
+    """
+
+    OCRLanguage: typing.ClassVar[type] = nodetool.nodes.lib.ocr.OCRLanguage
+    images: list[types.ImageRef] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[], description="The images to perform OCR on"
+    )
+    language: nodetool.nodes.lib.ocr.OCRLanguage = Field(
+        default=nodetool.nodes.lib.ocr.OCRLanguage.ENGLISH,
+        description="Language code for OCR",
+    )
+    batch_size: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=1,
+        description="Images sent to a worker in one job. A pool admits two images per worker at a time, so larger jobs aren't recognized while the next one is decoded.",
+    )
+    recognition_batch: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0,
+        description="Text lines recognized per model call. 0 uses the PaddleOCR default.",
+    )
+    workers: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0,
+        description="OCR worker processes. 0 uses NODETOOL_OCR_WORKERS, 1 by default.",
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.ocr.BatchOCR"
+
+
+import nodetool.nodes.lib.ocr
+
+
 class PaddleOCRNode(GraphNode):
     """
     Performs Optical Character Recognition (OCR) on images using PaddleOCR.
@@ -29,6 +69,22 @@ class PaddleOCRNode(GraphNode):
         default=nodetool.nodes.lib.ocr.OCRLanguage.ENGLISH,
         description="Language code for OCR",
     )
+    workers: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0,
+        description="OCR worker processes. 0 uses NODETOOL_OCR_WORKERS, 1 by default.",
+    )
+    tile_size: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0,
+        description="Recognize images larger than this many pixels in overlapping tiles in parallel. 0 recognizes the whole image at once.",
+    )
+    tile_overlap: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=128,
+        description="Pixels shared by neighbouring tiles. Should exceed the height of a text line. Lines longer than this are cut off on both sides of a vertical seam and their pieces are joined, which is less reliable than reading them whole.",
+    )
+    iou_threshold: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=0.5,
+        description="Overlap above which boxes from neighbouring tiles are merged",
+    )
 
     @classmethod
     def get_node_type(cls):
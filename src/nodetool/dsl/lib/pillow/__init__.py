@@ -61,3 +61,64 @@ class Composite(GraphNode):
     @classmethod
     def get_node_type(cls):
         return "lib.pillow.Composite"
+
+
+import nodetool.nodes.lib.pillow
+
+
+class Transition(GraphNode):
+    """
+    Generate a crossfade between two images as a stream of frames.
+    blend, transition, crossfade, fade, animation, video
+
+    Use cases:
+    - Create transition clips between two shots
+    - Animate a fade between before and after images
+    - Produce frame sequences for video encoding
+    """
+
+    Easing: typing.ClassVar[type] = nodetool.nodes.lib.pillow.Transition.Easing
+    image1: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The image to start from.",
+    )
+    image2: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The image to end with.",
+    )
+    frames: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=30,
+        description="The number of frames, including the first and last image.",
+    )
+    easing: nodetool.nodes.lib.pillow.Transition.Easing = Field(
+        default=nodetool.nodes.lib.pillow.Transition.Easing.LINEAR,
+        description="How the mix ratio progresses over time.",
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.Transition"
+
+
+class WeightedBlend(GraphNode):
+    """
+    Blend any number of images with individual weights in a single pass.
+    blend, mix, average, stack, exposure
+
+    Use cases:
+    - Average multiple exposures or video frames
+    - Reduce noise by stacking similar images
+    - Mix several images with custom weights
+    """
+
+    images: list[types.ImageRef] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[], description="The images to blend."
+    )
+    weights: list[float] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[],
+        description="The weight of each image. Leave empty for equal weights. Weights are normalized to sum to one.",
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.WeightedBlend"
@@ -5,6 +5,74 @@ import nodetool.metadata.types
 import nodetool.metadata.types as types
 from nodetool.dsl.graph import GraphNode
 
+import nodetool.nodes.lib.pillow.noise
+
+
+class AddNoise(GraphNode):
+    """
+    Add Gaussian, uniform, salt-and-pepper or Poisson noise to an image.
+    image, noise, gaussian, uniform, salt, pepper, poisson, grain, distortion
+
+    Use cases:
+    - Simulate sensor noise or film grain on photos
+    - Augment training data with reproducible noise
+    - Test the robustness of image-processing algorithms
+    """
+
+    NoiseType: typing.ClassVar[type] = nodetool.nodes.lib.pillow.noise.NoiseType
+    image: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The input image.",
+    )
+    noise_type: nodetool.nodes.lib.pillow.noise.NoiseType = Field(
+        default=nodetool.nodes.lib.pillow.noise.NoiseType.GAUSSIAN,
+        description="The kind of noise to add.",
+    )
+    amount: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=0.1,
+        description="Noise strength: the standard deviation for gaussian and poisson noise, the range for uniform noise, the fraction of affected pixels for salt and pepper.",
+    )
+    seed: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=-1, description="Random seed. -1 uses a random seed."
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.draw.AddNoise"
+
+
+import nodetool.nodes.lib.pillow.draw
+
+
+class AnnotateText(GraphNode):
+    """
+    Draw many text labels on an image in a single pass.
+    text, label, caption, annotation, batch, overlay
+
+    Use cases:
+    - Caption hundreds of detection or OCR boxes at once
+    - Replace long chains of Render Text nodes
+    - Add labels with background boxes for readability
+    """
+
+    image: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The image to annotate.",
+    )
+    labels: (
+        list[nodetool.nodes.lib.pillow.draw.TextLabel]
+        | GraphNode
+        | tuple[GraphNode, str]
+    ) = Field(default=[], description="The labels, drawn in order.")
+    font: types.FontRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.FontRef(type="font", name="DejaVuSans"),
+        description="The font to use.",
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.draw.AnnotateText"
+
 
 class Background(GraphNode):
     """
@@ -33,6 +101,38 @@ class Background(GraphNode):
         return "lib.pillow.draw.Background"
 
 
+class Checkerboard(GraphNode):
+    """
+    Generate a checkerboard pattern.
+    image, checkerboard, pattern, background, transparency
+
+    Use cases:
+    - Create transparency preview backgrounds
+    - Generate calibration and test patterns
+    - Build tiled backgrounds for designs
+    """
+
+    width: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=512, description=None
+    )
+    height: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=512, description=None
+    )
+    cell_size: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=32, description="Size of a cell."
+    )
+    color1: types.ColorRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ColorRef(type="color", value="#FFFFFF"), description=None
+    )
+    color2: types.ColorRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ColorRef(type="color", value="#CCCCCC"), description=None
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.draw.Checkerboard"
+
+
 class GaussianNoise(GraphNode):
     """
     This node creates and adds Gaussian noise to an image.
@@ -58,12 +158,194 @@ class GaussianNoise(GraphNode):
     height: int | GraphNode | tuple[GraphNode, str] = Field(
         default=512, description=None
     )
+    seed: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=-1, description="Random seed. -1 uses a random seed."
+    )
 
     @classmethod
     def get_node_type(cls):
         return "lib.pillow.draw.GaussianNoise"
 
 
+import nodetool.nodes.lib.pillow.procedural
+
+
+class Gradient(GraphNode):
+    """
+    Generate a linear, radial or conic gradient with multiple color stops.
+    image, gradient, background, linear, radial, conic, ramp
+
+    Use cases:
+    - Create gradient backgrounds of any size up to 16k
+    - Generate masks that fade across an image
+    - Build color ramps without rasterizing an SVG
+    """
+
+    GradientType: typing.ClassVar[type] = (
+        nodetool.nodes.lib.pillow.procedural.GradientType
+    )
+    gradient_type: nodetool.nodes.lib.pillow.procedural.GradientType = Field(
+        default=nodetool.nodes.lib.pillow.procedural.GradientType.LINEAR,
+        description="The shape of the gradient.",
+    )
+    width: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=512, description=None
+    )
+    height: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=512, description=None
+    )
+    colors: list[types.ColorRef] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[
+            types.ColorRef(type="color", value="#000000"),
+            types.ColorRef(type="color", value="#FFFFFF"),
+        ],
+        description="The color stops.",
+    )
+    positions: list[float] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[],
+        description="Positions of the color stops between 0 and 1. Leave empty to space them evenly.",
+    )
+    angle: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=0.0,
+        description="Direction of linear gradients and start of conic gradients, in degrees clockwise from the x axis.",
+    )
+    center_x: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=0.5, description="Horizontal center of radial and conic gradients."
+    )
+    center_y: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=0.5, description="Vertical center of radial and conic gradients."
+    )
+    radius: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=1.0,
+        description="Radius of radial gradients, relative to the farthest corner.",
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.draw.Gradient"
+
+
+class Grid(GraphNode):
+    """
+    Generate a pattern of evenly spaced grid lines.
+    image, grid, lines, pattern, background, guide
+
+    Use cases:
+    - Create graph paper and layout guides
+    - Generate test patterns for distortion checks
+    - Overlay alignment grids on designs
+    """
+
+    width: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=512, description=None
+    )
+    height: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=512, description=None
+    )
+    spacing: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=32, description="Distance between lines."
+    )
+    thickness: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=1, description="Line thickness."
+    )
+    line_color: types.ColorRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ColorRef(type="color", value="#000000"), description=None
+    )
+    background: types.ColorRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ColorRef(type="color", value="#FFFFFF"), description=None
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.draw.Grid"
+
+
+class Label(GraphNode):
+    """
+    Describe a text label for the Annotate Text node.
+    text, label, caption, annotation
+
+    Use cases:
+    - Build label lists for annotating an image in one pass
+    - Caption detection boxes or OCR results
+    - Add text with a readable background box
+    """
+
+    TextAlignment: typing.ClassVar[type] = (
+        nodetool.nodes.lib.pillow.draw.RenderText.TextAlignment
+    )
+    text: str | GraphNode | tuple[GraphNode, str] = Field(
+        default="", description="The text of the label."
+    )
+    x: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0,
+        description="The x coordinate of the left edge, center or right edge, depending on the anchor.",
+    )
+    y: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0, description="The y coordinate of the top edge."
+    )
+    size: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=12, description="The font size."
+    )
+    color: types.ColorRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ColorRef(type="color", value="#000000"),
+        description="The font color.",
+    )
+    anchor: nodetool.nodes.lib.pillow.draw.RenderText.TextAlignment = Field(
+        default=nodetool.nodes.lib.pillow.draw.RenderText.TextAlignment.LEFT,
+        description="Which part of the text is placed at x. Lines of multiline text are aligned to the same side.",
+    )
+    background: types.ColorRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ColorRef(type="color", value=None),
+        description="Color of a box drawn behind the text. Leave empty for no box.",
+    )
+    padding: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=2, description="Padding of the background box."
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.draw.Label"
+
+
+class PerlinNoise(GraphNode):
+    """
+    Generate fractal Perlin noise.
+    image, noise, perlin, fractal, procedural, texture, clouds
+
+    Use cases:
+    - Create organic textures such as clouds, marble or terrain
+    - Generate displacement and blend masks
+    - Add natural-looking variation to designs
+    """
+
+    width: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=512, description=None
+    )
+    height: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=512, description=None
+    )
+    scale: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=64.0, description="Size of the coarsest noise features."
+    )
+    octaves: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=4, description="Number of noise layers."
+    )
+    persistence: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=0.5, description="Amplitude falloff per octave."
+    )
+    lacunarity: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=2.0, description="Frequency growth per octave."
+    )
+    seed: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=-1, description="Random seed. -1 uses a random seed."
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.draw.PerlinNoise"
+
+
 import nodetool.nodes.lib.pillow.draw
 import nodetool.nodes.lib.pillow.draw
 
@@ -211,6 +211,38 @@ class Invert(GraphNode):
         return "lib.pillow.filter.Invert"
 
 
+class MergeChannels(GraphNode):
+    """
+    Merge separate channel images into one color image.
+    image, color, channel, merge, combine, alpha
+
+    - Recombine channels after processing them independently
+    - Swap or reorder color channels
+    - Attach a transparency mask to an image
+    """
+
+    red: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The red channel.",
+    )
+    green: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The green channel.",
+    )
+    blue: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The blue channel.",
+    )
+    alpha: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The alpha channel. Leave empty for an opaque RGB image.",
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.filter.MergeChannels"
+
+
 class Posterize(GraphNode):
     """
     Reduce the number of colors in an image for a poster-like effect.
@@ -275,3 +307,23 @@ class Solarize(GraphNode):
     @classmethod
     def get_node_type(cls):
         return "lib.pillow.filter.Solarize"
+
+
+class SplitChannels(GraphNode):
+    """
+    Split an image into its red, green, blue and alpha channels.
+    image, color, channel, split, separate, alpha
+
+    - Process color channels independently in channel-mixing graphs
+    - Extract the transparency mask of an image
+    - Replace several Get Channel nodes with a single decode
+    """
+
+    image: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The image to split.",
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.filter.SplitChannels"
@@ -0,0 +1,75 @@
+from pydantic import BaseModel, Field
+import typing
+from typing import Any
+import nodetool.metadata.types
+import nodetool.metadata.types as types
+from nodetool.dsl.graph import GraphNode
+
+import nodetool.nodes.lib.pillow.layers
+
+
+class Layer(GraphNode):
+    """
+    Describe an image layer for the Layer Stack node.
+    image, layer, blend, opacity, mask
+
+    Use cases:
+    - Position an image on a layered composition
+    - Set the blend mode and opacity of a layer
+    - Restrict a layer to a region with a mask
+    """
+
+    BlendMode: typing.ClassVar[type] = nodetool.nodes.lib.pillow.layers.BlendMode
+    image: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The layer image.",
+    )
+    mask: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="Optional mask. Only its luminance is used, as layer alpha.",
+    )
+    mode: nodetool.nodes.lib.pillow.layers.BlendMode = Field(
+        default=nodetool.nodes.lib.pillow.layers.BlendMode.NORMAL,
+        description="How the layer blends with the layers below.",
+    )
+    opacity: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=1.0, description="The opacity of the layer."
+    )
+    x: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0, description="The horizontal offset on the canvas."
+    )
+    y: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0, description="The vertical offset on the canvas."
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.layers.Layer"
+
+
+class LayerStack(GraphNode):
+    """
+    Composite a stack of layers with blend modes, opacity and masks in one pass.
+    composite, layer, blend, stack, multiply, screen, overlay
+
+    Use cases:
+    - Build multi-layer compositions without chaining Composite nodes
+    - Apply multiply, screen, overlay or additive layer effects
+    - Render very large compositions with bounded memory
+    """
+
+    layers: (
+        list[nodetool.nodes.lib.pillow.layers.ImageLayer]
+        | GraphNode
+        | tuple[GraphNode, str]
+    ) = Field(default=[], description="The layers, from bottom to top.")
+    width: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0, description="Canvas width. 0 uses the width of the bottom layer."
+    )
+    height: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0, description="Canvas height. 0 uses the height of the bottom layer."
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.pillow.layers.LayerStack"
@@ -6,6 +6,98 @@ import nodetool.metadata.types as types
 from nodetool.dsl.graph import GraphNode
 
 
+import nodetool.nodes.lib.svg
+
+
+class Animation(GraphNode):
+    """
+    Render frames of SVG content animated by keyframed tracks.
+    svg, animation, keyframe, frames, raster
+
+    Use cases:
+    - Render animated logos, charts and overlays frame by frame
+    - Stream frames to a video encoder
+    - Preview motion graphics built from SVG nodes
+    """
+
+    content: (
+        str
+        | nodetool.metadata.types.SVGElement
+        | list[nodetool.metadata.types.SVGElement]
+        | GraphNode
+        | tuple[GraphNode, str]
+    ) = Field(default=[], description="SVG content. Animated elements need an id.")
+    tracks: (
+        list[nodetool.nodes.lib.svg.SVGTrack] | GraphNode | tuple[GraphNode, str]
+    ) = Field(default=[], description="Keyframed tracks.")
+    duration: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=1.0, description="Duration in seconds"
+    )
+    fps: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=24.0, description="Frames per second"
+    )
+    width: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=800, description="Document width"
+    )
+    height: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=600, description="Document height"
+    )
+    viewBox: str | GraphNode | tuple[GraphNode, str] = Field(
+        default="0 0 800 600", description="SVG viewBox attribute"
+    )
+    scale: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=1, description="Scale factor for rasterization"
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.svg.Animation"
+
+
+class BatchSVGToImage(GraphNode):
+    """
+    Rasterize many SVG documents, or one template with many bindings, in parallel.
+    svg, batch, raster, template, parallel
+
+    Use cases:
+    - Render thousands of personalized badges or icons
+    - Fill an SVG template with rows of data and rasterize each result
+    - Stream rendered images to downstream nodes as they finish
+    """
+
+    documents: list[types.SVGRef] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[], description="SVG documents to rasterize."
+    )
+    template: types.SVGRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.SVGRef(type="svg", uri="", asset_id=None, data=None),
+        description="SVG document with $name placeholders. Used instead of documents when connected.",
+    )
+    bindings: list[dict[str, str]] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[], description="Values for the template placeholders, one per image."
+    )
+    width: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=800, description="Output width"
+    )
+    height: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=600, description="Output height"
+    )
+    scale: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=1, description="Scale factor for rasterization"
+    )
+    ordered: bool | GraphNode | tuple[GraphNode, str] = Field(
+        default=True,
+        description="Emit images in input order. Otherwise images are emitted as soon as they are rendered.",
+    )
+    workers: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0,
+        description="Chunks rendered at once in the shared SVG process pool. 0 uses the whole pool, sized by NODETOOL_SVG_WORKERS.",
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.svg.BatchSVGToImage"
+
+
 class CircleNode(GraphNode):
     """
     Generate SVG circle element.
@@ -86,6 +178,10 @@ class Document(GraphNode):
     viewBox: str | GraphNode | tuple[GraphNode, str] = Field(
         default="0 0 800 600", description="SVG viewBox attribute"
     )
+    optimize: bool | GraphNode | tuple[GraphNode, str] = Field(
+        default=False,
+        description="Dedupe definitions, strip default attributes and merge shapes before serializing",
+    )
 
     @classmethod
     def get_node_type(cls):
@@ -259,6 +355,10 @@ class PathNode(GraphNode):
     stroke_width: int | GraphNode | tuple[GraphNode, str] = Field(
         default=1, description="Stroke width"
     )
+    simplify: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=0,
+        description="Drop points closer than this to the simplified outline, in user units. 0 keeps all points.",
+    )
 
     @classmethod
     def get_node_type(cls):
@@ -283,6 +383,10 @@ class PolygonNode(GraphNode):
     stroke_width: int | GraphNode | tuple[GraphNode, str] = Field(
         default=1, description="Stroke width"
     )
+    simplify: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=0,
+        description="Drop points closer than this to the simplified outline, in user units. 0 keeps all points.",
+    )
 
     @classmethod
     def get_node_type(cls):
@@ -352,12 +456,88 @@ class SVGToImage(GraphNode):
     scale: int | GraphNode | tuple[GraphNode, str] = Field(
         default=1, description="Scale factor for rasterization"
     )
+    tile_size: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=0,
+        description="Render in tiles of this many pixels in parallel worker processes. 0 renders in one pass.",
+    )
+    optimize: bool | GraphNode | tuple[GraphNode, str] = Field(
+        default=False,
+        description="Dedupe definitions, strip default attributes and merge shapes before serializing",
+    )
+    simplify: float | GraphNode | tuple[GraphNode, str] = Field(
+        default=0,
+        description="Drop polygon and path points closer than this to the simplified outline, in output pixels. 0 keeps all points.",
+    )
 
     @classmethod
     def get_node_type(cls):
         return "lib.svg.SVGToImage"
 
 
+class SliceAtlas(GraphNode):
+    """
+    Slice sprites out of an atlas made by the SVG Sprite Atlas node.
+    svg, sprite, atlas, slice, crop
+
+    Use cases:
+    - Extract single icons from a rendered atlas
+    - Stream only the sprites a workflow needs
+    """
+
+    atlas: types.ImageRef | GraphNode | tuple[GraphNode, str] = Field(
+        default=types.ImageRef(type="image", uri="", asset_id=None, data=None),
+        description="The atlas image.",
+    )
+    index: list[dict[str, int]] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[], description="The coordinate index of the atlas."
+    )
+    sprites: list[int] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[], description="Positions of the sprites to slice. Empty slices all."
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.svg.SliceAtlas"
+
+
+class SpriteAtlas(GraphNode):
+    """
+    Pack many SVG elements into one sprite atlas and rasterize it in one render.
+    svg, sprite, atlas, icons, pack
+
+    Use cases:
+    - Render hundreds of icons in one pass instead of one document each
+    - Build texture atlases for games and web pages
+    - Produce a coordinate index for slicing sprites later
+    """
+
+    sprites: (
+        list[nodetool.metadata.types.SVGElement] | GraphNode | tuple[GraphNode, str]
+    ) = Field(
+        default=[],
+        description="One element per sprite, usually a group. Sized <svg> elements keep their own size and viewBox.",
+    )
+    sprite_width: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=64, description="Width of sprites without a size"
+    )
+    sprite_height: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=64, description="Height of sprites without a size"
+    )
+    viewBox: str | GraphNode | tuple[GraphNode, str] = Field(
+        default="0 0 64 64", description="viewBox of sprites without a size"
+    )
+    padding: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=1, description="Space between sprites in the atlas"
+    )
+    scale: int | GraphNode | tuple[GraphNode, str] = Field(
+        default=1, description="Scale factor for rasterization"
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.svg.SpriteAtlas"
+
+
 import nodetool.nodes.lib.svg
 
 
@@ -401,6 +581,45 @@ class Text(GraphNode):
         return "lib.svg.Text"
 
 
+import nodetool.nodes.lib.svg_animate
+
+
+class Track(GraphNode):
+    """
+    Describe keyframes of one attribute of an SVG element for the SVG Animation node.
+    svg, animation, keyframe, track, tween
+
+    Use cases:
+    - Move, rotate or scale an element over time
+    - Fade or recolor shapes between keyframes
+    - Build track lists for animating a document
+    """
+
+    Easing: typing.ClassVar[type] = nodetool.nodes.lib.svg_animate.Easing
+    target: str | GraphNode | tuple[GraphNode, str] = Field(
+        default="", description="The id of the animated element."
+    )
+    attribute: str | GraphNode | tuple[GraphNode, str] = Field(
+        default="",
+        description="The animated attribute, or one of translate_x, translate_y, rotate, scale_x and scale_y.",
+    )
+    times: list[float] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[], description="Keyframe times in seconds, in ascending order."
+    )
+    values: list[str] | GraphNode | tuple[GraphNode, str] = Field(
+        default=[],
+        description="Attribute values at the keyframe times. Numbers and colors are interpolated.",
+    )
+    easing: nodetool.nodes.lib.svg_animate.Easing = Field(
+        default=nodetool.nodes.lib.svg_animate.Easing.LINEAR,
+        description="Easing between keyframes.",
+    )
+
+    @classmethod
+    def get_node_type(cls):
+        return "lib.svg.Track"
+
+
 class Transform(GraphNode):
     """
     Apply transformations to SVG elements.
@@ -3,6 +3,7 @@ import PIL.Image
 from nodetool.workflows.base_node import BaseNode
 from nodetool.workflows.processing_context import ProcessingContext
 from nodetool.metadata.types import ImageRef
+from nodetool.nodes.lib.profiling import profiled
 from pydantic import Field
 
 from typing import List
@@ -124,6 +125,7 @@ class SliceImageGrid(BaseNode):
     columns: int = Field(default=0, ge=0, description="Number of columns in the grid.")
     rows: int = Field(default=0, ge=0, description="Number of rows in the grid.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> list[ImageRef]:
         image = await context.image_to_pil(self.image)
         width, height = image.size
@@ -170,6 +172,7 @@ class CombineImageGrid(BaseNode):
     )
     columns: int = Field(default=0, ge=0, description="Number of columns in the grid.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         if not self.tiles:
             raise ValueError("No tiles provided for combining.")
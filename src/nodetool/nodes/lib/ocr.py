@@ -1,3 +1,5 @@
+import asyncio
+import time
 from enum import Enum
 
 from pydantic import Field
@@ -6,7 +8,10 @@ from nodetool.workflows.processing_context import ProcessingContext
 from nodetool.workflows.base_node import BaseNode
 from nodetool.workflows.types import NodeUpdate
 from nodetool.metadata.types import ImageRef, OCRResult
-from paddleocr import PaddleOCR
+from nodetool.nodes.lib.ocr_engines import Line
+from nodetool.nodes.lib.ocr_tiles import recognize_tiled
+from nodetool.nodes.lib.ocr_workers import ocr_workers
+from nodetool.nodes.lib.profiling import profiled
 
 
 class OCRLanguage(str, Enum):
@@ -55,6 +60,20 @@ class OCRLanguage(str, Enum):
     SANSKRIT = "sa"
 
 
+def ocr_results(lines: list[Line]) -> list[OCRResult]:
+    return [
+        OCRResult(
+            text=text,
+            score=score,
+            top_left=[round(v) for v in top_left],
+            top_right=[round(v) for v in top_right],
+            bottom_right=[round(v) for v in bottom_right],
+            bottom_left=[round(v) for v in bottom_left],
+        )
+        for text, score, (top_left, top_right, bottom_right, bottom_left) in lines
+    ]
+
+
 class PaddleOCRNode(BaseNode):
     """
     Performs Optical Character Recognition (OCR) on images using PaddleOCR.
@@ -75,8 +94,30 @@ class PaddleOCRNode(BaseNode):
     language: OCRLanguage = Field(
         default=OCRLanguage.ENGLISH, description="Language code for OCR"
     )
-
-    _ocr: PaddleOCR | None = None
+    workers: int = Field(
+        default=0,
+        ge=0,
+        le=64,
+        description="OCR worker processes. 0 uses NODETOOL_OCR_WORKERS, 1 by default.",
+    )
+    tile_size: int = Field(
+        default=0,
+        ge=0,
+        le=8192,
+        description="Recognize images larger than this many pixels in overlapping tiles in parallel. 0 recognizes the whole image at once.",
+    )
+    tile_overlap: int = Field(
+        default=128,
+        ge=0,
+        le=4096,
+        description="Pixels shared by neighbouring tiles. Should exceed the height of a text line. Lines longer than this are cut off on both sides of a vertical seam and their pieces are joined, which is less reliable than reading them whole.",
+    )
+    iou_threshold: float = Field(
+        default=0.5,
+        ge=0.0,
+        le=1.0,
+        description="Overlap above which boxes from neighbouring tiles are merged",
+    )
 
     def required_inputs(self):
         return ["image"]
@@ -89,39 +130,147 @@ class PaddleOCRNode(BaseNode):
         }
 
     async def initialize(self, context: ProcessingContext):
-        context.post_message(
-            NodeUpdate(
-                node_id=self.id,
-                node_name="PaddleOCR",
-                node_type=self.get_node_type(),
-                status="downloading model",
+        workers = ocr_workers(self.workers)
+        # Workers keep their engines, so only the first node of a language
+        # pays for loading and warming up the models
+        if not workers.is_loaded(self.language.value):
+            context.post_message(
+                NodeUpdate(
+                    node_id=self.id,
+                    node_name="PaddleOCR",
+                    node_type=self.get_node_type(),
+                    status="downloading model",
+                )
             )
-        )
-        self._ocr = PaddleOCR(lang=self.language)
+        await workers.load(self.language.value)
 
+    @profiled
     async def process(self, context: ProcessingContext):
-        assert self._ocr is not None
         image = await context.image_to_numpy(self.image)
+        workers = ocr_workers(self.workers)
+        height, width = image.shape[:2]
+        # Inference runs in worker processes, so the event loop stays free
+        if self.tile_size and max(width, height) > self.tile_size:
+            # Small text on huge pages is lost when PaddleOCR downscales them
+            lines = await recognize_tiled(
+                workers,
+                image,
+                self.language.value,
+                self.tile_size,
+                min(self.tile_overlap, self.tile_size - 1),
+                self.iou_threshold,
+            )
+        else:
+            lines = await workers.recognize(image, self.language.value)
+        processed_results = ocr_results(lines)
 
-        result = self._ocr.ocr(image)
-
-        processed_results = []
-        for idx in range(len(result)):
-            res = result[idx]
-            for line in res:
-                (top_left, top_right, bottom_right, bottom_left), (text, score) = line
-                processed_results.append(
-                    OCRResult(
-                        text=text,
-                        score=float(score),
-                        top_left=top_left,
-                        top_right=top_right,
-                        bottom_right=bottom_right,
-                        bottom_left=bottom_left,
+        return {
+            "boxes": processed_results,
+            "text": "\n".join([result.text for result in processed_results]),
+        }
+
+
+class BatchOCR(BaseNode):
+    """
+    Performs OCR on many images in batches, using PaddleOCR in worker processes.
+    image, text, ocr, document, batch
+
+    Use cases:
+    - Extract text from a folder of receipts or invoices
+    - Digitize scanned document pages in bulk
+    - Measure OCR throughput on a dataset
+    """
+
+    @classmethod
+    def get_title(cls) -> str:
+        return "Batch OCR"
+
+    images: list[ImageRef] = Field(
+        default=[], description="The images to perform OCR on"
+    )
+    language: OCRLanguage = Field(
+        default=OCRLanguage.ENGLISH, description="Language code for OCR"
+    )
+    batch_size: int = Field(
+        default=1,
+        ge=1,
+        le=256,
+        description="Images sent to a worker in one job. A pool admits two images per worker at a time, so larger jobs aren't recognized while the next one is decoded.",
+    )
+    recognition_batch: int = Field(
+        default=0,
+        ge=0,
+        le=256,
+        description="Text lines recognized per model call. 0 uses the PaddleOCR default.",
+    )
+    workers: int = Field(
+        default=0,
+        ge=0,
+        le=64,
+        description="OCR worker processes. 0 uses NODETOOL_OCR_WORKERS, 1 by default.",
+    )
+
+    @classmethod
+    def return_type(cls):
+        return {
+            "results": list[list[OCRResult]],
+            "texts": list[str],
+            "metrics": dict[str, float],
+        }
+
+    @profiled
+    async def process(self, context: ProcessingContext):
+        workers = ocr_workers(self.workers)
+        config = {}
+        if self.recognition_batch:
+            config["rec_batch_num"] = self.recognition_batch
+        start = time.perf_counter()
+        decode_seconds = 0.0
+
+        # Batches are decoded while earlier batches are recognized, at most
+        # as many images ahead as the workers admit
+        jobs: list[asyncio.Future] = []
+        sizes: list[int] = []
+        try:
+            for offset in range(0, len(self.images), self.batch_size):
+                refs = self.images[offset : offset + self.batch_size]
+                while True:
+                    running = {
+                        job: size for job, size in zip(jobs, sizes) if not job.done()
+                    }
+                    pending = sum(running.values())
+                    if not running or pending + len(refs) <= workers.max_pending:
+                        break
+                    await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                decode_start = time.perf_counter()
+                pixels = [await context.image_to_numpy(ref) for ref in refs]
+                decode_seconds += time.perf_counter() - decode_start
+                jobs.append(
+                    asyncio.ensure_future(
+                        workers.recognize_batch(pixels, self.language.value, **config)
                     )
                 )
+                sizes.append(len(refs))
+            batches = await asyncio.gather(*jobs)
+        finally:
+            # After a failure the other jobs are cancelled, and waited for so
+            # their shared memory is released and no error goes unretrieved
+            for job in jobs:
+                job.cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
 
+        results = [ocr_results(lines) for batch in batches for lines in batch]
+        seconds = time.perf_counter() - start
+        lines = sum(len(boxes) for boxes in results)
         return {
-            "boxes": processed_results,
-            "text": "\n".join([result.text for result in processed_results]),
+            "results": results,
+            "texts": ["\n".join(box.text for box in boxes) for boxes in results],
+            "metrics": {
+                "images": float(len(results)),
+                "lines": float(lines),
+                "seconds": seconds,
+                "decode_seconds": decode_seconds,
+                "images_per_second": len(results) / seconds if seconds else 0.0,
+                "lines_per_second": lines / seconds if seconds else 0.0,
+            },
         }
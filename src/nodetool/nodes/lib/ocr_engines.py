@@ -0,0 +1,233 @@
+"""
+Process-wide pool of PaddleOCR engines.
+
+Constructing PaddleOCR loads detection, classification and recognition
+models and the first inference initializes the predictors, which takes
+seconds. The pool keeps engines keyed by language and configuration, so
+nodes and workflow runs share one warmed-up engine per key. Engines are
+evicted least recently used first once their estimated memory exceeds the
+budget. Each engine has a lock, because PaddleOCR engines are not safe to
+use from several threads at once; concurrent requests wait for it.
+
+Configure it with environment variables:
+
+- ``NODETOOL_OCR_ENGINE_BYTES``: memory budget, 4 GB by default
+- ``NODETOOL_OCR_PRELOAD``: comma-separated languages to load and warm up in
+  a background thread when the module is imported, unset loads on first use
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+DEFAULT_ENGINE_BYTES = 4 * 1024 * 1024 * 1024
+# Assumed size of an engine where resident memory can't be measured
+DEFAULT_ENGINE_SIZE = 512 * 1024 * 1024
+
+EngineKey = tuple[str, tuple[tuple[str, Any], ...]]
+# A recognized text line: text, score and the top left, top right, bottom
+# right and bottom left corners of its box
+Line = tuple[str, float, list[list[float]]]
+
+
+def engine_key(language: str, **config) -> EngineKey:
+    return str(language), tuple(sorted(config.items()))
+
+
+def create_engine(language: str, **config):
+    from paddleocr import PaddleOCR
+
+    return PaddleOCR(lang=language, **config)
+
+
+def warm_up(engine):
+    """Run one inference, so predictors are initialized before real requests."""
+    engine.ocr(np.full((64, 64, 3), 255, dtype=np.uint8))
+
+
+def recognize(engine, image: np.ndarray) -> list[Line]:
+    """Run OCR on one image and return its lines as plain, picklable values."""
+    lines = []
+    for page in engine.ocr(image):
+        # Pages without text are None
+        for box, (text, score) in page or []:
+            lines.append((text, float(score), [[float(v) for v in p] for p in box]))
+    return lines
+
+
+def _resident_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.engine = None
+        self.error: BaseException | None = None
+        self.size = 0
+
+
+class EnginePool:
+    """
+    Bounded LRU pool of OCR engines.
+
+    The size of an engine is the growth of resident memory while it is
+    created and warmed up, or DEFAULT_ENGINE_SIZE where that can't be
+    measured. The most recently used engine is never evicted, even when it
+    alone exceeds the budget.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_ENGINE_BYTES,
+        factory: Callable[..., Any] = create_engine,
+        warm: Callable[[Any], None] = warm_up,
+    ):
+        self.max_bytes = max_bytes
+        self.factory = factory
+        self.warm = warm
+        self._entries: OrderedDict[EngineKey, _Entry] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # Engines are created one at a time, so memory growth is attributable
+        self._create_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: EngineKey) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.engine is not None
+
+    def _entry(self, key: EngineKey) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            entry = _Entry()
+            self._entries[key] = entry
+            self.misses += 1
+        # Requests for the same key wait on entry.ready meanwhile
+        self._create(key, entry)
+        return entry
+
+    def _create(self, key: EngineKey, entry: _Entry):
+        language, config = key
+        try:
+            with self._create_lock:
+                before = _resident_bytes()
+                engine = self.factory(language, **dict(config))
+                if self.warm is not None:
+                    self.warm(engine)
+                after = _resident_bytes()
+        except BaseException as e:
+            # Waiters see the error, and the next request tries again
+            entry.error = e
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry.ready.set()
+            return
+        if before is None or after is None or after <= before:
+            entry.size = DEFAULT_ENGINE_SIZE
+        else:
+            entry.size = after - before
+        entry.engine = engine
+        with self._lock:
+            if self._entries.get(key) is entry:
+                self._size += entry.size
+                self._evict(key)
+        entry.ready.set()
+
+    def _evict(self, keep: EngineKey):
+        for key in list(self._entries):
+            if self._size <= self.max_bytes:
+                return
+            entry = self._entries[key]
+            if key == keep or entry.engine is None:
+                continue
+            del self._entries[key]
+            self._size -= entry.size
+            self.evictions += 1
+
+    def _ready(self, language: str, config: dict) -> _Entry:
+        entry = self._entry(engine_key(language, **config))
+        entry.ready.wait()
+        if entry.error is not None:
+            raise entry.error
+        return entry
+
+    def load(self, language: str, **config):
+        """Create and warm up the engine for a key, unless it is pooled."""
+        return self._ready(language, config).engine
+
+    @contextmanager
+    def acquire(self, language: str, **config) -> Iterator[Any]:
+        """
+        Use the engine for a key, creating it on first use. The engine is
+        locked until the block exits.
+        """
+        entry = self._ready(language, config)
+        with entry.lock:
+            yield entry.engine
+
+    def preload(self, languages: list[str], **config) -> threading.Thread:
+        """Load and warm up engines in a background thread."""
+
+        def run():
+            for language in languages:
+                try:
+                    self.load(language, **config)
+                except Exception:
+                    # Loading is retried on first use, which reports the error
+                    pass
+
+        thread = threading.Thread(target=run, name="ocr-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        """Drop all engines and reset the metrics."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "engines": sum(e.engine is not None for e in self._entries.values()),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+engine_pool = EnginePool(
+    int(os.environ.get("NODETOOL_OCR_ENGINE_BYTES", DEFAULT_ENGINE_BYTES))
+)
+
+if os.environ.get("NODETOOL_OCR_PRELOAD"):
+    engine_pool.preload(
+        [
+            language.strip()
+            for language in os.environ["NODETOOL_OCR_PRELOAD"].split(",")
+            if language.strip()
+        ]
+    )
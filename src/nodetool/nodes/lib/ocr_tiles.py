@@ -0,0 +1,283 @@
+"""
+Tiled OCR for images larger than PaddleOCR's detection resolution.
+
+PaddleOCR downscales large inputs before detection, so small text on posters,
+blueprints and stitched scans disappears. recognize_tiled cuts the image into
+overlapping tiles laid out with make_grid, plus tiles aligned to the right and
+bottom edges where the grid doesn't reach them. The tiles are recognized in
+parallel by the OCR workers, and the boxes are moved back into image space.
+
+A line near a seam is found in both tiles that overlap there, whole or cut
+off at a tile edge. A line longer than the overlap is cut off in both tiles
+of a vertical seam, so pieces cut off at facing edges of neighbouring tiles
+in the same row are joined first: their boxes are united and their texts
+are joined where they repeat each other. Detections from different tiles
+are then suppressed greedily: boxes are ranked whole before cut off, then
+by area and score, and a box is dropped when its IoU with a kept box
+exceeds the threshold, or when it lies almost entirely inside one. The
+pairwise overlaps are computed at once with NumPy.
+"""
+
+import asyncio
+
+import numpy as np
+
+from nodetool.nodes.lib.grid import make_grid
+from nodetool.nodes.lib.ocr_engines import Line
+from nodetool.nodes.lib.ocr_workers import OCRWorkers
+
+Box = tuple[int, int, int, int]
+
+# Fraction of a box's area inside another box above which it is a fragment
+CONTAINED = 0.9
+# Distance in pixels to an inner tile edge below which a box counts as cut off
+EDGE_MARGIN = 2
+# Fraction of the lower of two pieces' heights they share to be in one row
+SAME_ROW = 0.5
+
+
+def _starts(size: int, tile: int, grid: list[int]) -> list[int]:
+    if grid[-1] + tile < size:
+        grid.append(size - tile)
+    return grid
+
+
+def tile_boxes(width: int, height: int, tile_size: int, overlap: int) -> list[Box]:
+    """Return (left, top, right, bottom) tiles that cover the whole image."""
+    if overlap >= tile_size:
+        raise ValueError("The tile overlap must be smaller than the tile size.")
+    tile_w, tile_h = min(tile_size, width), min(tile_size, height)
+    grid, _, _ = make_grid(
+        width, height, tile_w, tile_h, min(overlap, tile_w - 1, tile_h - 1)
+    )
+    xs = _starts(width, tile_w, [x for x, _ in grid[0]])
+    ys = _starts(height, tile_h, [row[0][1] for row in grid])
+    return [(x, y, x + tile_w, y + tile_h) for y in ys for x in xs]
+
+
+def _bounds(lines: list[Line]) -> np.ndarray:
+    corners = np.array([box for _, _, box in lines], float).reshape(-1, 4, 2)
+    return np.concatenate([corners.min(axis=1), corners.max(axis=1)], axis=1)
+
+
+def join_text(left: str, right: str, shared: float) -> str:
+    """
+    Join the texts of two pieces of a line, where shared is the fraction of
+    the right piece that the left one also covers.
+    """
+    expected = round(len(right) * shared)
+    # The longest repeated part wins, but a few repeated characters at the
+    # end of a word don't make an overlap that should hold many more
+    for size in range(min(len(left), len(right)), max(expected // 2, 1) - 1, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    # The readings differ, so drop the part of the right piece under the left
+    return left + right[expected:]
+
+
+def merge_pieces(
+    lines: list[Line], tiles: np.ndarray, regions: np.ndarray, sides: np.ndarray
+) -> tuple[list[Line], np.ndarray, np.ndarray]:
+    """
+    Join pieces of lines cut off at vertical seams. regions holds the
+    (left, top, right, bottom) tiles and sides whether each line touches the
+    left, top, right and bottom inner edge of its tile. A piece cut off on
+    the right is joined with the piece of a tile further right in the same
+    tile row that is cut off on the left, overlaps it and shares its row.
+    Return the lines, tiles and sides with joined lines in place of pieces.
+    """
+    pieces = np.flatnonzero(sides[:, 0] | sides[:, 2])
+    if len(pieces) < 2:
+        return lines, tiles, sides
+    bounds = _bounds([lines[index] for index in pieces])
+    tile = regions[tiles[pieces]]
+    height = bounds[:, 3] - bounds[:, 1]
+    shared_height = np.clip(
+        np.minimum(bounds[:, None, 3], bounds[None, :, 3])
+        - np.maximum(bounds[:, None, 1], bounds[None, :, 1]),
+        0,
+        None,
+    )
+    # Piece i is the left and piece j the right part of one line
+    joins = (
+        sides[pieces][:, None, 2]
+        & sides[pieces][None, :, 0]
+        & (tile[:, None, 1] == tile[None, :, 1])
+        & (tile[:, None, 0] < tile[None, :, 0])
+        & (bounds[:, None, 0] < bounds[None, :, 0])
+        & (bounds[None, :, 0] < bounds[:, None, 2])
+        & (shared_height > SAME_ROW * np.minimum(height[:, None], height[None, :]))
+    )
+
+    following = {}
+    taken = set()
+    for i in np.argsort(bounds[:, 0]):
+        candidates = [j for j in np.flatnonzero(joins[i]) if j not in taken]
+        if candidates:
+            j = max(candidates, key=lambda j: shared_height[i, j])
+            following[i] = j
+            taken.add(j)
+
+    merged = np.zeros(len(lines), bool)
+    joined_lines, joined_tiles, joined_sides = [], [], []
+    for i in following:
+        if i in taken:
+            continue
+        # Walk the chain of pieces from left to right
+        text, score, _ = lines[pieces[i]]
+        chain = [i]
+        while chain[-1] in following:
+            previous, piece = chain[-1], following[chain[-1]]
+            overlap = bounds[previous, 2] - bounds[piece, 0]
+            width = bounds[piece, 2] - bounds[piece, 0]
+            text = join_text(
+                text, lines[pieces[piece]][0], overlap / width if width else 0.0
+            )
+            score = min(score, lines[pieces[piece]][1])
+            chain.append(piece)
+        left, top = bounds[chain, :2].min(axis=0).tolist()
+        right, bottom = bounds[chain, 2:].max(axis=0).tolist()
+        corners = [[left, top], [right, top], [right, bottom], [left, bottom]]
+        joined_lines.append((text, score, corners))
+        joined_tiles.append(tiles[pieces[i]])
+        chain_sides = sides[pieces[chain]]
+        joined_sides.append(
+            [
+                chain_sides[0, 0],
+                chain_sides[:, 1].any(),
+                chain_sides[-1, 2],
+                chain_sides[:, 3].any(),
+            ]
+        )
+        merged[pieces[chain]] = True
+
+    if not joined_lines:
+        return lines, tiles, sides
+    rest = np.flatnonzero(~merged)
+    return (
+        [lines[index] for index in rest] + joined_lines,
+        np.concatenate([tiles[rest], joined_tiles]).astype(tiles.dtype),
+        np.concatenate([sides[rest], np.array(joined_sides, bool)]),
+    )
+
+
+def suppress_duplicates(
+    lines: list[Line],
+    tiles: np.ndarray,
+    cut: np.ndarray,
+    iou_threshold: float = 0.5,
+) -> list[int]:
+    """
+    Return the indices of the lines to keep, in ascending order. tiles holds
+    the tile index of each line and cut whether it touches an inner tile
+    edge. Only lines from different tiles suppress each other.
+    """
+    if not lines:
+        return []
+    bounds = _bounds(lines)
+    area = np.prod(bounds[:, 2:] - bounds[:, :2], axis=1)
+    scores = np.array([score for _, score, _ in lines])
+
+    lower = np.maximum(bounds[:, None, :2], bounds[None, :, :2])
+    upper = np.minimum(bounds[:, None, 2:], bounds[None, :, 2:])
+    intersection = np.prod(np.clip(upper - lower, 0, None), axis=2)
+    union = area[:, None] + area[None, :] - intersection
+    iou = np.divide(
+        intersection, union, out=np.zeros_like(intersection), where=union > 0
+    )
+    # Fraction of box i that lies inside box j
+    inside = np.divide(
+        intersection,
+        area[:, None],
+        out=np.zeros_like(intersection),
+        where=area[:, None] > 0,
+    )
+    duplicate = (iou > iou_threshold) | (inside > CONTAINED) | (inside.T > CONTAINED)
+    duplicate &= tiles[:, None] != tiles[None, :]
+
+    order = np.lexsort((-scores, -area, cut))
+    suppressed = np.zeros(len(lines), bool)
+    for index in order:
+        if not suppressed[index]:
+            suppressed |= duplicate[index]
+            suppressed[index] = False
+    return np.flatnonzero(~suppressed).tolist()
+
+
+async def recognize_tiled(
+    workers: OCRWorkers,
+    image: np.ndarray,
+    language: str,
+    tile_size: int,
+    overlap: int,
+    iou_threshold: float = 0.5,
+    **config,
+) -> list[Line]:
+    """Recognize a large image in overlapping tiles in parallel."""
+    height, width = image.shape[:2]
+    boxes = tile_boxes(width, height, tile_size, overlap)
+    jobs = [
+        asyncio.ensure_future(
+            workers.recognize(image[top:bottom, left:right], language, **config)
+        )
+        for left, top, right, bottom in boxes
+    ]
+    try:
+        results = await asyncio.gather(*jobs)
+    finally:
+        # After a failure the other tiles are cancelled, and waited for so
+        # they give their slots in the workers back
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+
+    lines: list[Line] = []
+    tiles = []
+    sides = []
+    for index, ((left, top, right, bottom), tile_lines) in enumerate(
+        zip(boxes, results)
+    ):
+        for text, score, corners in tile_lines:
+            xs = [x for x, _ in corners]
+            ys = [y for _, y in corners]
+            # Edges of the tile that are inside the image can cut lines off
+            sides.append(
+                (
+                    left > 0 and min(xs) <= EDGE_MARGIN,
+                    top > 0 and min(ys) <= EDGE_MARGIN,
+                    right < width and max(xs) >= right - left - EDGE_MARGIN,
+                    bottom < height and max(ys) >= bottom - top - EDGE_MARGIN,
+                )
+            )
+            tiles.append(index)
+            lines.append((text, score, [[x + left, y + top] for x, y in corners]))
+    if not lines:
+        return []
+    regions = np.array(boxes, float)
+    lines, tiles, sides = merge_pieces(
+        lines, np.array(tiles), regions, np.array(sides, bool)
+    )
+    cut = sides.any(axis=1)
+
+    # Only lines inside another tile can have duplicates, which keeps the
+    # pairwise matrices to the lines along the seams
+    bounds = _bounds(lines)
+    overlaps = (
+        (bounds[:, None, 0] < regions[None, :, 2])
+        & (bounds[:, None, 2] > regions[None, :, 0])
+        & (bounds[:, None, 1] < regions[None, :, 3])
+        & (bounds[:, None, 3] > regions[None, :, 1])
+    )
+    overlaps[np.arange(len(lines)), tiles] = False
+    seam = np.flatnonzero(overlaps.any(axis=1))
+    kept = np.ones(len(lines), bool)
+    kept[seam] = False
+    survivors = suppress_duplicates(
+        [lines[index] for index in seam], tiles[seam], cut[seam], iou_threshold
+    )
+    kept[seam[survivors]] = True
+
+    # Top to bottom, then left to right
+    kept = np.flatnonzero(kept)
+    order = kept[np.lexsort((bounds[kept, 0], bounds[kept, 1]))]
+    return [lines[index] for index in order]
@@ -0,0 +1,304 @@
+"""
+OCR inference in worker processes.
+
+PaddleOCR inference is CPU-bound and holds the calling thread for the whole
+run, so running it inside a node's async method blocks the event loop and
+every other node. OCRWorkers runs it in a process pool instead. Each worker
+keeps its own engine pool, see ocr_engines.
+
+Images are passed through shared memory: the pixels are copied once into a
+SharedMemory block that the worker maps as an array, instead of being
+pickled through the pool's pipe. Only box coordinates and text are sent
+back.
+
+Each pool admits at most max_pending images at a time, by default two per
+worker, so one image is ready while another is being recognized. Jobs
+beyond that wait before their images are copied into shared memory, which
+bounds both queued work and shared memory use. A batch larger than
+max_pending is admitted alone.
+
+Configure the default number of workers with ``NODETOOL_OCR_WORKERS``, 1 by
+default. Every worker loads its own models, so each one adds the memory of
+an engine. Pools are shared per number of workers, and at most MAX_POOLS of
+them are kept: the least recently used one is shut down once its running
+jobs are done.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable
+
+import numpy as np
+
+from nodetool.nodes.lib.ocr_engines import (
+    EngineKey,
+    Line,
+    engine_key,
+    engine_pool,
+    recognize,
+)
+
+
+def _default_workers() -> int:
+    try:
+        return max(int(os.environ.get("NODETOOL_OCR_WORKERS", "1")), 1)
+    except ValueError:
+        return 1
+
+
+DEFAULT_WORKERS = _default_workers()
+MAX_POOLS = 2
+# Seconds a worker waits for the others to pick up their load job
+LOAD_TIMEOUT = 30
+
+_barrier = None
+
+
+def _initialize_worker(factory: Callable[..., Any] | None, barrier):
+    global _barrier
+    _barrier = barrier
+    if factory is not None:
+        engine_pool.factory = factory
+
+
+def _load(language: str, config: dict) -> int:
+    # A worker waits here until every worker has taken a load job, so each
+    # of them gets exactly one. Waiting before loading keeps a worker whose
+    # load fails from holding up the others
+    try:
+        _barrier.wait(LOAD_TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+    engine_pool.load(language, **config)
+    return os.getpid()
+
+
+def _recognize(
+    name: str,
+    layouts: list[tuple[int, tuple[int, ...], str]],
+    language: str,
+    config: dict,
+) -> tuple[int, list[list[Line]]]:
+    memory = SharedMemory(name=name)
+    images = [
+        np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+        for offset, shape, dtype in layouts
+    ]
+    try:
+        with engine_pool.acquire(language, **config) as engine:
+            return os.getpid(), [recognize(engine, image) for image in images]
+    finally:
+        # Views on the buffer must be gone before it can be closed
+        del images
+        memory.close()
+
+
+def _write(memory: SharedMemory, images: list[np.ndarray], layouts: list):
+    # The views on the buffer are released on return, so it can be closed
+    for image, (offset, shape, dtype) in zip(images, layouts):
+        np.copyto(np.ndarray(shape, dtype, buffer=memory.buf, offset=offset), image)
+
+
+class _Admission:
+    """Admits jobs while the images they hold stay within a limit."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.pending = 0
+        self._changed = asyncio.Condition()
+
+    @asynccontextmanager
+    async def hold(self, count: int):
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: not self.pending or self.pending + count <= self.limit
+            )
+            self.pending += count
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self.pending -= count
+                self._changed.notify_all()
+
+
+class OCRWorkers:
+    """A process pool that runs OCR on images passed through shared memory."""
+
+    def __init__(
+        self,
+        workers: int = 0,
+        max_pending: int = 0,
+        factory: Callable[..., Any] | None = None,
+    ):
+        self.workers = workers or DEFAULT_WORKERS
+        self.max_pending = max_pending or 2 * self.workers
+        self.factory = factory
+        # Forking a process that runs inference threads can deadlock
+        self._context = multiprocessing.get_context("spawn")
+        self._barrier = self._context.Barrier(self.workers)
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._loading: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._active = 0
+        self._retired = False
+        # Process ids of the workers each key is loaded in
+        self.loaded: dict[EngineKey, set[int]] = {}
+
+    def _per_loop(self, locks: weakref.WeakKeyDictionary, create: Callable):
+        # asyncio primitives belong to one event loop
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in locks:
+                locks[loop] = create()
+            return locks[loop]
+
+    def _admission(self) -> _Admission:
+        return self._per_loop(self._slots, lambda: _Admission(self.max_pending))
+
+    def _drop_executor(self) -> ProcessPoolExecutor | None:
+        # Called with the lock held. New workers start without engines
+        executor, self._executor = self._executor, None
+        self.loaded.clear()
+        return executor
+
+    async def _run(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=self._context,
+                    initializer=_initialize_worker,
+                    initargs=(self.factory, self._barrier),
+                )
+            executor = self._executor
+            self._active += 1
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died, e.g. of running out of memory, so later jobs
+            # get new workers
+            with self._lock:
+                if self._executor is executor:
+                    self._drop_executor()
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+                idle = None
+                if self._retired and not self._active:
+                    idle = self._drop_executor()
+            if idle is not None:
+                idle.shutdown(wait=False)
+
+    def is_loaded(self, language: str, **config) -> bool:
+        """Whether every worker has loaded the engine for a key."""
+        key = engine_key(language, **config)
+        return len(self.loaded.get(key, ())) >= self.workers
+
+    async def load(self, language: str, **config):
+        """Load and warm up an engine in every worker."""
+        key = engine_key(language, **config)
+        # Load jobs rendezvous on one barrier, so they can't overlap
+        async with self._per_loop(self._loading, asyncio.Lock):
+            if self.is_loaded(language, **config):
+                return
+            if self._barrier.broken:
+                self._barrier.reset()
+            # Every job finishes before the next load can use the barrier
+            pids = await asyncio.gather(
+                *[self._run(_load, language, config) for _ in range(self.workers)],
+                return_exceptions=True,
+            )
+        self.loaded.setdefault(key, set()).update(
+            pid for pid in pids if isinstance(pid, int)
+        )
+        for error in pids:
+            if isinstance(error, BaseException):
+                raise error
+
+    async def recognize(self, image: np.ndarray, language: str, **config) -> list[Line]:
+        """Recognize the text lines of an (H, W[, C]) image in a worker."""
+        return (await self.recognize_batch([image], language, **config))[0]
+
+    async def recognize_batch(
+        self, images: list[np.ndarray], language: str, **config
+    ) -> list[list[Line]]:
+        """
+        Recognize the text lines of several images in one worker job. The
+        images share one shared memory block and each counts against
+        max_pending.
+        """
+        if not images:
+            return []
+        async with self._admission().hold(len(images)):
+            images = [np.ascontiguousarray(image) for image in images]
+            layouts = []
+            size = 0
+            for image in images:
+                layouts.append((size, image.shape, image.dtype.str))
+                # Keep every image aligned for vectorized reads
+                size += -(-image.nbytes // 64) * 64
+            memory = SharedMemory(create=True, size=max(size, 1))
+            try:
+                _write(memory, images, layouts)
+                pid, results = await self._run(
+                    _recognize, memory.name, layouts, language, config
+                )
+            finally:
+                memory.close()
+                memory.unlink()
+        # Workers load engines on first use, too
+        self.loaded.setdefault(engine_key(language, **config), set()).add(pid)
+        return results
+
+    def retire(self):
+        """
+        Shut the workers down once their running jobs are done. Jobs
+        submitted afterwards start new workers, which are retired likewise.
+        """
+        with self._lock:
+            self._retired = True
+            executor = None if self._active else self._drop_executor()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def shutdown(self):
+        with self._lock:
+            executor = self._drop_executor()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pools: OrderedDict[int, OCRWorkers] = OrderedDict()
+_pools_lock = threading.Lock()
+
+
+def ocr_workers(workers: int = 0) -> OCRWorkers:
+    """
+    Return a shared OCR worker pool with the given number of workers. Beyond
+    MAX_POOLS pools, the least recently used one is retired.
+    """
+    workers = workers or DEFAULT_WORKERS
+    with _pools_lock:
+        if workers in _pools:
+            _pools.move_to_end(workers)
+            return _pools[workers]
+        pool = _pools[workers] = OCRWorkers(workers)
+        retired = []
+        while len(_pools) > MAX_POOLS:
+            retired.append(_pools.popitem(last=False)[1])
+    for old in retired:
+        old.retire()
+    return pool
@@ -1,9 +1,13 @@
+from enum import Enum
 from nodetool.workflows.processing_context import ProcessingContext
 from nodetool.metadata.types import ImageRef
 from nodetool.workflows.base_node import BaseNode
+from nodetool.nodes.lib.pillow.decode import load_image
+from nodetool.nodes.lib.profiling import profiled
 from pydantic import Field
 import PIL.Image
 import PIL.ImageOps
+import numpy as np
 
 
 class Blend(BaseNode):
@@ -25,6 +29,7 @@ class Blend(BaseNode):
     )
     alpha: float = Field(default=0.5, ge=0.0, le=1.0, description="The mix ratio.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         if self.image1.is_empty():
             raise ValueError("The first image is not connected.")
@@ -33,7 +38,10 @@ class Blend(BaseNode):
             raise ValueError("The second image is not connected.")
 
         image1 = await context.image_to_pil(self.image1)
-        image2 = await context.image_to_pil(self.image2)
+        # image2 is fitted to image1, so it can be decoded at a reduced size
+        image2 = await load_image(
+            context, self.image2, mode="RGB", size_hint=image1.size
+        )
         if image1.size != image2.size:
             image2 = PIL.ImageOps.fit(image2, image1.size)
         image = PIL.Image.blend(image1, image2, self.alpha)
@@ -61,6 +69,7 @@ class Composite(BaseNode):
         default=ImageRef(), description="The mask to composite with."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         if self.image1.is_empty():
             raise ValueError("The first image is not connected.")
@@ -69,8 +78,12 @@ class Composite(BaseNode):
             raise ValueError("The second image is not connected.")
 
         image1 = await context.image_to_pil(self.image1)
-        image2 = await context.image_to_pil(self.image2)
-        mask = await context.image_to_pil(self.mask)
+        # image2 and the mask are fitted to image1, so they can be decoded at
+        # a reduced size
+        image2 = await load_image(
+            context, self.image2, mode="RGB", size_hint=image1.size
+        )
+        mask = await load_image(context, self.mask, mode="RGB", size_hint=image1.size)
         image1 = image1.convert("RGBA")
         image2 = image2.convert("RGBA")
         mask = mask.convert("RGBA")
@@ -80,3 +93,131 @@ class Composite(BaseNode):
             mask = PIL.ImageOps.fit(mask, image1.size)
         image = PIL.Image.composite(image1, image2, mask)
         return await context.image_from_pil(image)
+
+
+class WeightedBlend(BaseNode):
+    """
+    Blend any number of images with individual weights in a single pass.
+    blend, mix, average, stack, exposure
+
+    Use cases:
+    - Average multiple exposures or video frames
+    - Reduce noise by stacking similar images
+    - Mix several images with custom weights
+    """
+
+    images: list[ImageRef] = Field(default=[], description="The images to blend.")
+    weights: list[float] = Field(
+        default=[],
+        description="The weight of each image. Leave empty for equal weights. Weights are normalized to sum to one.",
+    )
+
+    @profiled
+    async def process(self, context: ProcessingContext) -> ImageRef:
+        if not self.images:
+            raise ValueError("No images provided for blending.")
+
+        weights = self.weights or [1.0] * len(self.images)
+        if len(weights) != len(self.images):
+            raise ValueError("The number of weights must match the number of images.")
+        total = sum(weights)
+        if total == 0:
+            raise ValueError("The weights must not sum to zero.")
+
+        # Accumulate in float32 so rounding happens once instead of per pair,
+        # keeping only one decoded image resident at a time.
+        size = None
+        accumulator = scratch = None
+        for image_ref, weight in zip(self.images, weights):
+            image = await context.image_to_pil(image_ref)
+            if size is None:
+                size = image.size
+            elif image.size != size:
+                image = PIL.ImageOps.fit(image, size)
+            pixels = np.asarray(image)
+            if accumulator is None:
+                accumulator = np.zeros(pixels.shape, dtype=np.float32)
+                scratch = np.empty_like(accumulator)
+            np.multiply(pixels, weight / total, out=scratch, dtype=np.float32)
+            accumulator += scratch
+            del image, pixels
+
+        assert accumulator is not None
+        np.rint(accumulator, out=accumulator)
+        np.clip(accumulator, 0, 255, out=accumulator)
+        image = PIL.Image.fromarray(accumulator.astype(np.uint8))
+        return await context.image_from_pil(image)
+
+
+class Transition(BaseNode):
+    """
+    Generate a crossfade between two images as a stream of frames.
+    blend, transition, crossfade, fade, animation, video
+
+    Use cases:
+    - Create transition clips between two shots
+    - Animate a fade between before and after images
+    - Produce frame sequences for video encoding
+    """
+
+    class Easing(str, Enum):
+        LINEAR = "linear"
+        EASE_IN = "ease_in"
+        EASE_OUT = "ease_out"
+        EASE_IN_OUT = "ease_in_out"
+
+    image1: ImageRef = Field(default=ImageRef(), description="The image to start from.")
+    image2: ImageRef = Field(default=ImageRef(), description="The image to end with.")
+    frames: int = Field(
+        default=30,
+        ge=2,
+        le=10000,
+        description="The number of frames, including the first and last image.",
+    )
+    easing: Easing = Field(
+        default=Easing.LINEAR, description="How the mix ratio progresses over time."
+    )
+
+    @classmethod
+    def return_type(cls):
+        return {
+            "frame": ImageRef,
+            "index": int,
+        }
+
+    def ease(self, t: float) -> float:
+        if self.easing == self.Easing.EASE_IN:
+            return t * t
+        if self.easing == self.Easing.EASE_OUT:
+            return 1 - (1 - t) * (1 - t)
+        if self.easing == self.Easing.EASE_IN_OUT:
+            return t * t * (3 - 2 * t)
+        return t
+
+    @profiled
+    async def gen_process(self, context: ProcessingContext):
+        if self.image1.is_empty():
+            raise ValueError("The first image is not connected.")
+
+        if self.image2.is_empty():
+            raise ValueError("The second image is not connected.")
+
+        # Decode, fit and convert both inputs once for all frames
+        image1 = await context.image_to_pil(self.image1)
+        image2 = await context.image_to_pil(self.image2)
+        if image1.size != image2.size:
+            image2 = PIL.ImageOps.fit(image2, image1.size)
+        start = np.asarray(image1, dtype=np.float32)
+        delta = np.asarray(image2, dtype=np.float32) - start
+        del image1, image2
+
+        buffer = np.empty_like(start)
+        for index in range(self.frames):
+            t = self.ease(index / (self.frames - 1))
+            np.multiply(delta, t, out=buffer)
+            buffer += start
+            np.rint(buffer, out=buffer)
+            # Each frame owns its pixels, as the encoded ref may keep them
+            frame = PIL.Image.fromarray(buffer.astype(np.uint8))
+            yield "frame", await context.image_from_pil(frame)
+            yield "index", index
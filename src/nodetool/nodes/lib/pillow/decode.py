@@ -0,0 +1,104 @@
+import asyncio
+import math
+from typing import IO
+
+import PIL.Image
+import PIL.ImageOps
+
+from nodetool.metadata.types import ImageRef
+from nodetool.workflows.processing_context import ProcessingContext
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+# Modes Image.reduce averages as intensities
+_REDUCIBLE_MODES = ("L", "LA", "RGB", "RGBA", "I", "F")
+
+
+def has_alpha(image: PIL.Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA", "La", "RGBa") or (
+        "transparency" in image.info
+    )
+
+
+def _reducible_mode(image: PIL.Image.Image) -> str:
+    if has_alpha(image):
+        return "RGBA"
+    if image.mode == "1":
+        return "L"
+    if image.mode.startswith("I;16"):
+        return "I"
+    return "RGB"
+
+
+def reduce_for_fit(image: PIL.Image.Image, size: tuple[int, int]) -> PIL.Image.Image:
+    """
+    Cheaply shrink a freshly opened image that will be fitted to size.
+
+    JPEG images are decoded at a reduced DCT scale using draft mode, other
+    formats are box-reduced by an integer factor. The result keeps at least
+    the resolution PIL.ImageOps.fit needs to cover size, so the final
+    resample only has to do the remaining fraction.
+    """
+    width, height = size
+    if image.getexif().get(0x0112) in _TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+    scale = max(width / image.width, height / image.height)
+    if scale > 0.5:
+        return image
+    needed = (math.ceil(image.width * scale), math.ceil(image.height * scale))
+
+    if image.format == "JPEG":
+        image.draft("RGB", needed)
+
+    factor = min(image.width // needed[0], image.height // needed[1])
+    if factor >= 2:
+        if image.mode not in _REDUCIBLE_MODES:
+            # Palette indices and bilevel pixels can't be averaged
+            image = image.convert(_reducible_mode(image))
+        image = image.reduce(factor)
+    return image
+
+
+def _is_encoded(image_ref: ImageRef) -> bool:
+    # Images produced in the graph are kept decoded under memory:// URIs
+    return bool(image_ref.data) or not (image_ref.uri or "").startswith("memory://")
+
+
+def _decode(
+    buffer: IO[bytes], mode: str | None, size_hint: tuple[int, int] | None
+) -> PIL.Image.Image:
+    buffer.seek(0)
+    image = PIL.Image.open(buffer)
+    if size_hint is not None:
+        image = reduce_for_fit(image, size_hint)
+    image.load()
+    image = PIL.ImageOps.exif_transpose(image)
+    if mode is None:
+        mode = "RGBA" if has_alpha(image) else "RGB"
+    if image.mode != mode:
+        image = image.convert(mode)
+    return image
+
+
+async def load_image(
+    context: ProcessingContext,
+    image_ref: ImageRef,
+    mode: str | None = None,
+    size_hint: tuple[int, int] | None = None,
+) -> PIL.Image.Image:
+    """
+    Decode an image, keeping its alpha channel.
+
+    context.image_to_pil always converts to RGB. This opens the asset directly
+    and converts it to the given mode, or to RGBA/RGB depending on whether the
+    image carries transparency when no mode is given.
+
+    When size_hint is given the image is decoded at reduced resolution if it
+    is much larger than needed to be fitted to that size. Images held in
+    memory are already decoded, so RGB ones are taken from the context as
+    they are. Decoding runs in a thread.
+    """
+    if mode == "RGB" and not _is_encoded(image_ref):
+        return await context.image_to_pil(image_ref)
+    buffer = await context.asset_to_io(image_ref)
+    return await asyncio.to_thread(_decode, buffer, mode, size_hint)
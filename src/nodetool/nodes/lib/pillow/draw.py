@@ -1,10 +1,22 @@
 from enum import Enum
+from typing import Literal
 import PIL.Image
 import PIL.ImageDraw
 import PIL.ImageFont
 from nodetool.workflows.processing_context import ProcessingContext
-from nodetool.metadata.types import FontRef, ImageRef, ColorRef
+from nodetool.metadata.types import BaseType, FontRef, ImageRef, ColorRef
 from nodetool.workflows.base_node import BaseNode
+from nodetool.nodes.lib.pillow.decode import load_image
+from nodetool.nodes.lib.pillow.noise import NoiseType, apply_noise, gaussian_noise
+from nodetool.nodes.lib.pillow.procedural import (
+    GradientType,
+    checkerboard,
+    gradient,
+    grid,
+    perlin_noise,
+)
+from nodetool.nodes.lib.pillow.text import draw_text, get_font, text_mask
+from nodetool.nodes.lib.profiling import profiled
 import numpy as np
 from pydantic import Field
 
@@ -25,11 +37,170 @@ class Background(BaseNode):
     height: int = Field(default=512, ge=1, le=4096)
     color: ColorRef = Field(default=ColorRef(value="#FFFFFF"))
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         img = PIL.Image.new("RGB", (self.width, self.height), self.color.value)
         return await context.image_from_pil(img)
 
 
+class Gradient(BaseNode):
+    """
+    Generate a linear, radial or conic gradient with multiple color stops.
+    image, gradient, background, linear, radial, conic, ramp
+
+    Use cases:
+    - Create gradient backgrounds of any size up to 16k
+    - Generate masks that fade across an image
+    - Build color ramps without rasterizing an SVG
+    """
+
+    gradient_type: GradientType = Field(
+        default=GradientType.LINEAR, description="The shape of the gradient."
+    )
+    width: int = Field(default=512, ge=1, le=16384)
+    height: int = Field(default=512, ge=1, le=16384)
+    colors: list[ColorRef] = Field(
+        default=[ColorRef(value="#000000"), ColorRef(value="#FFFFFF")],
+        description="The color stops.",
+    )
+    positions: list[float] = Field(
+        default=[],
+        description="Positions of the color stops between 0 and 1. Leave empty to space them evenly.",
+    )
+    angle: float = Field(
+        default=0.0,
+        description="Direction of linear gradients and start of conic gradients, in degrees clockwise from the x axis.",
+    )
+    center_x: float = Field(
+        default=0.5, description="Horizontal center of radial and conic gradients."
+    )
+    center_y: float = Field(
+        default=0.5, description="Vertical center of radial and conic gradients."
+    )
+    radius: float = Field(
+        default=1.0,
+        gt=0.0,
+        description="Radius of radial gradients, relative to the farthest corner.",
+    )
+
+    @profiled
+    async def process(self, context: ProcessingContext) -> ImageRef:
+        pixels = gradient(
+            self.gradient_type,
+            self.width,
+            self.height,
+            [str(color.value) for color in self.colors],
+            self.positions,
+            self.angle,
+            (self.center_x, self.center_y),
+            self.radius,
+        )
+        return await context.image_from_pil(PIL.Image.fromarray(pixels))
+
+
+class Checkerboard(BaseNode):
+    """
+    Generate a checkerboard pattern.
+    image, checkerboard, pattern, background, transparency
+
+    Use cases:
+    - Create transparency preview backgrounds
+    - Generate calibration and test patterns
+    - Build tiled backgrounds for designs
+    """
+
+    width: int = Field(default=512, ge=1, le=16384)
+    height: int = Field(default=512, ge=1, le=16384)
+    cell_size: int = Field(default=32, ge=1, le=4096, description="Size of a cell.")
+    color1: ColorRef = Field(default=ColorRef(value="#FFFFFF"))
+    color2: ColorRef = Field(default=ColorRef(value="#CCCCCC"))
+
+    @profiled
+    async def process(self, context: ProcessingContext) -> ImageRef:
+        pixels = checkerboard(
+            self.width,
+            self.height,
+            self.cell_size,
+            str(self.color1.value),
+            str(self.color2.value),
+        )
+        return await context.image_from_pil(PIL.Image.fromarray(pixels))
+
+
+class Grid(BaseNode):
+    """
+    Generate a pattern of evenly spaced grid lines.
+    image, grid, lines, pattern, background, guide
+
+    Use cases:
+    - Create graph paper and layout guides
+    - Generate test patterns for distortion checks
+    - Overlay alignment grids on designs
+    """
+
+    width: int = Field(default=512, ge=1, le=16384)
+    height: int = Field(default=512, ge=1, le=16384)
+    spacing: int = Field(
+        default=32, ge=1, le=4096, description="Distance between lines."
+    )
+    thickness: int = Field(default=1, ge=1, le=4096, description="Line thickness.")
+    line_color: ColorRef = Field(default=ColorRef(value="#000000"))
+    background: ColorRef = Field(default=ColorRef(value="#FFFFFF"))
+
+    @profiled
+    async def process(self, context: ProcessingContext) -> ImageRef:
+        pixels = grid(
+            self.width,
+            self.height,
+            self.spacing,
+            self.thickness,
+            str(self.line_color.value),
+            str(self.background.value),
+        )
+        return await context.image_from_pil(PIL.Image.fromarray(pixels))
+
+
+class PerlinNoise(BaseNode):
+    """
+    Generate fractal Perlin noise.
+    image, noise, perlin, fractal, procedural, texture, clouds
+
+    Use cases:
+    - Create organic textures such as clouds, marble or terrain
+    - Generate displacement and blend masks
+    - Add natural-looking variation to designs
+    """
+
+    width: int = Field(default=512, ge=1, le=16384)
+    height: int = Field(default=512, ge=1, le=16384)
+    scale: float = Field(
+        default=64.0, gt=0.0, description="Size of the coarsest noise features."
+    )
+    octaves: int = Field(default=4, ge=1, le=12, description="Number of noise layers.")
+    persistence: float = Field(
+        default=0.5, ge=0.0, le=1.0, description="Amplitude falloff per octave."
+    )
+    lacunarity: float = Field(
+        default=2.0, ge=1.0, le=4.0, description="Frequency growth per octave."
+    )
+    seed: int = Field(
+        default=-1, ge=-1, description="Random seed. -1 uses a random seed."
+    )
+
+    @profiled
+    async def process(self, context: ProcessingContext) -> ImageRef:
+        pixels = perlin_noise(
+            self.width,
+            self.height,
+            self.scale,
+            self.octaves,
+            self.persistence,
+            self.lacunarity,
+            self.seed,
+        )
+        return await context.image_from_pil(PIL.Image.fromarray(pixels))
+
+
 class RenderText(BaseNode):
     """
     This node allows you to add text to images.
@@ -63,21 +234,131 @@ class RenderText(BaseNode):
     align: TextAlignment = TextAlignment.LEFT
     image: ImageRef = Field(default=ImageRef(), description="The image to render on.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
-        draw = PIL.ImageDraw.Draw(image)
-        font_path = context.get_system_font_path(self.font.name)
-        font = PIL.ImageFont.truetype(font_path, self.size)
-        draw.text(
+        font = get_font(context, self.font.name, self.size)
+        draw_text(
+            image,
             (self.x, self.y),
             self.text,
-            font=font,
-            fill=self.color.value,
-            align=self.align.value,
+            font,
+            self.color.value,
+            self.align.value,
         )
         return await context.image_from_pil(image)
 
 
+class TextLabel(BaseType):
+    """A single text label for the Annotate Text node."""
+
+    type: Literal["text_label"] = "text_label"
+    text: str = ""
+    x: int = 0
+    y: int = 0
+    size: int = 12
+    color: ColorRef = ColorRef(value="#000000")
+    anchor: RenderText.TextAlignment = RenderText.TextAlignment.LEFT
+    background: ColorRef = ColorRef()
+    padding: int = 2
+
+
+class Label(BaseNode):
+    """
+    Describe a text label for the Annotate Text node.
+    text, label, caption, annotation
+
+    Use cases:
+    - Build label lists for annotating an image in one pass
+    - Caption detection boxes or OCR results
+    - Add text with a readable background box
+    """
+
+    text: str = Field(default="", description="The text of the label.")
+    x: int = Field(
+        default=0,
+        description="The x coordinate of the left edge, center or right edge, depending on the anchor.",
+    )
+    y: int = Field(default=0, description="The y coordinate of the top edge.")
+    size: int = Field(default=12, ge=1, le=512, description="The font size.")
+    color: ColorRef = Field(
+        default=ColorRef(value="#000000"), description="The font color."
+    )
+    anchor: RenderText.TextAlignment = Field(
+        default=RenderText.TextAlignment.LEFT,
+        description="Which part of the text is placed at x. Lines of multiline text are aligned to the same side.",
+    )
+    background: ColorRef = Field(
+        default=ColorRef(),
+        description="Color of a box drawn behind the text. Leave empty for no box.",
+    )
+    padding: int = Field(
+        default=2, ge=0, le=128, description="Padding of the background box."
+    )
+
+    @profiled
+    async def process(self, context: ProcessingContext) -> TextLabel:
+        return TextLabel(
+            text=self.text,
+            x=self.x,
+            y=self.y,
+            size=self.size,
+            color=self.color,
+            anchor=self.anchor,
+            background=self.background,
+            padding=self.padding,
+        )
+
+
+class AnnotateText(BaseNode):
+    """
+    Draw many text labels on an image in a single pass.
+    text, label, caption, annotation, batch, overlay
+
+    Use cases:
+    - Caption hundreds of detection or OCR boxes at once
+    - Replace long chains of Render Text nodes
+    - Add labels with background boxes for readability
+    """
+
+    image: ImageRef = Field(default=ImageRef(), description="The image to annotate.")
+    labels: list[TextLabel] = Field(
+        default=[], description="The labels, drawn in order."
+    )
+    font: FontRef = Field(
+        default=FontRef(name="DejaVuSans"), description="The font to use."
+    )
+
+    @profiled
+    async def process(self, context: ProcessingContext) -> ImageRef:
+        image = await context.image_to_pil(self.image)
+        draw = PIL.ImageDraw.Draw(image)
+        for label in self.labels:
+            if not label.text:
+                continue
+            font = get_font(context, self.font.name, label.size)
+            mask, (left, top) = text_mask(font, label.text, label.anchor.value)
+            if label.anchor == RenderText.TextAlignment.CENTER:
+                x = label.x - mask.width // 2
+            elif label.anchor == RenderText.TextAlignment.RIGHT:
+                x = label.x - mask.width
+            else:
+                x = label.x + left
+            y = label.y + top
+            if label.background.value:
+                draw.rectangle(
+                    (
+                        x - label.padding,
+                        y - label.padding,
+                        x + mask.width + label.padding - 1,
+                        y + mask.height + label.padding - 1,
+                    ),
+                    fill=label.background.value,
+                )
+            image.paste(label.color.value, (x, y), mask)
+        return await context.image_from_pil(image)
+
+
 class GaussianNoise(BaseNode):
     """
     This node creates and adds Gaussian noise to an image.
@@ -93,11 +374,55 @@ class GaussianNoise(BaseNode):
 
     mean: float = Field(default=0.0)
     stddev: float = Field(default=1.0)
-    width: int = Field(default=512, ge=1, le=1024)
-    height: int = Field(default=512, ge=1, le=1024)
+    width: int = Field(default=512, ge=1, le=16384)
+    height: int = Field(default=512, ge=1, le=16384)
+    seed: int = Field(
+        default=-1, ge=-1, description="Random seed. -1 uses a random seed."
+    )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
-        image = np.random.normal(self.mean, self.stddev, (self.height, self.width, 3))
-        image = (np.clip(image, 0, 1) * 255).astype(np.uint8)
-        image = PIL.Image.fromarray(image)
-        return await context.image_from_pil(image)
+        image = gaussian_noise(
+            self.width, self.height, self.mean, self.stddev, self.seed
+        )
+        return await context.image_from_pil(PIL.Image.fromarray(image))
+
+
+class AddNoise(BaseNode):
+    """
+    Add Gaussian, uniform, salt-and-pepper or Poisson noise to an image.
+    image, noise, gaussian, uniform, salt, pepper, poisson, grain, distortion
+
+    Use cases:
+    - Simulate sensor noise or film grain on photos
+    - Augment training data with reproducible noise
+    - Test the robustness of image-processing algorithms
+    """
+
+    image: ImageRef = Field(default=ImageRef(), description="The input image.")
+    noise_type: NoiseType = Field(
+        default=NoiseType.GAUSSIAN, description="The kind of noise to add."
+    )
+    amount: float = Field(
+        default=0.1,
+        ge=0.0,
+        le=1.0,
+        description="Noise strength: the standard deviation for gaussian and poisson noise, the range for uniform noise, the fraction of affected pixels for salt and pepper.",
+    )
+    seed: int = Field(
+        default=-1, ge=-1, description="Random seed. -1 uses a random seed."
+    )
+
+    @profiled
+    async def process(self, context: ProcessingContext) -> ImageRef:
+        image = await load_image(context, self.image)
+        pixels = np.asarray(image)
+        if image.mode == "RGBA":
+            # Keep the alpha channel untouched
+            noisy = pixels.copy()
+            noisy[..., :3] = apply_noise(
+                pixels[..., :3], self.noise_type, self.amount, self.seed
+            )
+        else:
+            noisy = apply_noise(pixels, self.noise_type, self.amount, self.seed)
+        return await context.image_from_pil(PIL.Image.fromarray(noisy, image.mode))
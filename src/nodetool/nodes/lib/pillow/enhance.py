@@ -7,6 +7,7 @@ import numpy as np
 from nodetool.metadata.types import ImageRef
 from nodetool.workflows.base_node import BaseNode
 from nodetool.workflows.processing_context import ProcessingContext
+from nodetool.nodes.lib.profiling import profiled
 from pydantic import Field
 
 
@@ -79,6 +80,7 @@ class AutoContrast(BaseNode):
         description="Represents the percentage of pixels to ignore at both the darkest and lightest ends of the histogram. A cutoff value of 5 means ignoring the darkest 5% and the lightest 5% of pixels, enhancing overall contrast by stretching the remaining pixel values across the full brightness range.",
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         img = PIL.ImageOps.autocontrast(image, cutoff=self.cutoff)
@@ -103,6 +105,7 @@ class Sharpness(BaseNode):
         default=1.0, description="Factor to adjust the contrast. 1.0 means no change."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = PIL.ImageEnhance.Sharpness(image).enhance(self.factor)
@@ -122,6 +125,7 @@ class Equalize(BaseNode):
 
     image: ImageRef = Field(default=ImageRef(), description="The image to equalize.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = PIL.ImageOps.equalize(image)
@@ -146,6 +150,7 @@ class Contrast(BaseNode):
         default=1.0, description="Factor to adjust the contrast. 1.0 means no change."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = PIL.ImageEnhance.Contrast(image).enhance(self.factor)
@@ -167,6 +172,7 @@ class EdgeEnhance(BaseNode):
         default=ImageRef(), description="The image to edge enhance."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         return await context.image_from_pil(image.filter(PIL.ImageFilter.EDGE_ENHANCE))
@@ -185,6 +191,7 @@ class Sharpen(BaseNode):
 
     image: ImageRef = Field(default=ImageRef(), description="The image to sharpen.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         return await context.image_from_pil(image.filter(PIL.ImageFilter.SHARPEN))
@@ -205,6 +212,7 @@ class RankFilter(BaseNode):
     size: int = Field(default=3, ge=1, le=512, description="Rank filter size.")
     rank: int = Field(default=3, ge=1, le=512, description="Rank filter rank.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         return await context.image_from_pil(
@@ -234,6 +242,7 @@ class UnsharpMask(BaseNode):
         default=3, ge=0, le=512, description="Unsharp mask threshold."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = image.filter(
@@ -260,6 +269,7 @@ class Brightness(BaseNode):
         default=1.0, description="Factor to adjust the brightness. 1.0 means no change."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         return await context.image_from_pil(
@@ -285,6 +295,7 @@ class Color(BaseNode):
         default=1.0, description="Factor to adjust the contrast. 1.0 means no change."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = PIL.ImageEnhance.Color(image).enhance(self.factor)
@@ -304,6 +315,7 @@ class Detail(BaseNode):
 
     image: ImageRef = Field(default=ImageRef(), description="The image to detail.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         return await context.image_from_pil(image.filter(PIL.ImageFilter.DETAIL))
@@ -329,6 +341,7 @@ class AdaptiveContrast(BaseNode):
         default=8, ge=1, le=64, description="Grid size for adaptive contrast."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         img = adaptive_contrast(
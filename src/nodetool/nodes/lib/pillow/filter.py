@@ -11,6 +11,8 @@ from nodetool.nodes.lib.pillow.enhance import (
 )
 from nodetool.metadata.types import ImageRef
 from nodetool.workflows.base_node import BaseNode
+from nodetool.nodes.lib.pillow.decode import load_image
+from nodetool.nodes.lib.profiling import profiled
 from pydantic import Field
 
 
@@ -28,6 +30,7 @@ class Invert(BaseNode):
         default=ImageRef(), description="The image to adjust the brightness for."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = PIL.ImageOps.invert(image)
@@ -49,6 +52,7 @@ class Solarize(BaseNode):
         default=128, ge=0, le=255, description="Threshold for solarization."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = PIL.ImageOps.solarize(image, threshold=self.threshold)
@@ -70,6 +74,7 @@ class Posterize(BaseNode):
         default=4, ge=1, le=8, description="Number of bits to posterize to."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = PIL.ImageOps.posterize(image, bits=self.bits)
@@ -90,6 +95,7 @@ class Expand(BaseNode):
     border: int = Field(default=0, ge=0, le=512, description="Border size.")
     fill: int = Field(default=0, ge=0, le=255, description="Fill color.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = PIL.ImageOps.expand(image, border=self.border, fill=self.fill)
@@ -109,6 +115,7 @@ class Blur(BaseNode):
     image: ImageRef = Field(default=ImageRef(), description="The image to blur.")
     radius: int = Field(default=2, ge=0, le=128, description="Blur radius.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = image.filter(PIL.ImageFilter.GaussianBlur(self.radius))
@@ -127,6 +134,7 @@ class Contour(BaseNode):
 
     image: ImageRef = Field(default=ImageRef(), description="The image to contour.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         return await context.image_from_pil(image.filter(PIL.ImageFilter.CONTOUR))
@@ -144,6 +152,7 @@ class Emboss(BaseNode):
 
     image: ImageRef = Field(default=ImageRef(), description="The image to emboss.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         return await context.image_from_pil(image.filter(PIL.ImageFilter.EMBOSS))
@@ -161,6 +170,7 @@ class FindEdges(BaseNode):
 
     image: ImageRef = Field(default=ImageRef(), description="The image to find edges.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         return await context.image_from_pil(image.filter(PIL.ImageFilter.FIND_EDGES))
@@ -178,6 +188,7 @@ class Smooth(BaseNode):
 
     image: ImageRef = Field(default=ImageRef(), description="The image to smooth.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         return await context.image_from_pil(image.filter(PIL.ImageFilter.SMOOTH))
@@ -199,6 +210,7 @@ class Canny(BaseNode):
         default=200, ge=0, le=255, description="High threshold."
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = canny_edge_detection(image, self.low_threshold, self.high_threshold)
@@ -217,6 +229,7 @@ class ConvertToGrayscale(BaseNode):
 
     image: ImageRef = Field(default=ImageRef(), description="The image to convert.")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         return await context.image_from_pil(image.convert("L"))
@@ -242,7 +255,89 @@ class GetChannel(BaseNode):
     )
     channel: ChannelEnum = ChannelEnum.RED
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
         image = await context.image_to_pil(self.image)
         res = image.getchannel(self.channel.value)
         return await context.image_from_pil(res)
+
+
+class SplitChannels(BaseNode):
+    """
+    Split an image into its red, green, blue and alpha channels.
+    image, color, channel, split, separate, alpha
+
+    - Process color channels independently in channel-mixing graphs
+    - Extract the transparency mask of an image
+    - Replace several Get Channel nodes with a single decode
+    """
+
+    image: ImageRef = Field(default=ImageRef(), description="The image to split.")
+
+    @classmethod
+    def return_type(cls):
+        return {
+            "red": ImageRef,
+            "green": ImageRef,
+            "blue": ImageRef,
+            "alpha": ImageRef,
+        }
+
+    @profiled
+    async def process(self, context: ProcessingContext):
+        if self.image.is_empty():
+            raise ValueError("The input image is not connected.")
+
+        image = await load_image(context, self.image)
+        if image.mode == "RGBA":
+            red, green, blue, alpha = image.split()
+        else:
+            red, green, blue = image.split()
+            alpha = PIL.Image.new("L", image.size, 255)
+
+        return {
+            "red": await context.image_from_pil(red),
+            "green": await context.image_from_pil(green),
+            "blue": await context.image_from_pil(blue),
+            "alpha": await context.image_from_pil(alpha),
+        }
+
+
+class MergeChannels(BaseNode):
+    """
+    Merge separate channel images into one color image.
+    image, color, channel, merge, combine, alpha
+
+    - Recombine channels after processing them independently
+    - Swap or reorder color channels
+    - Attach a transparency mask to an image
+    """
+
+    red: ImageRef = Field(default=ImageRef(), description="The red channel.")
+    green: ImageRef = Field(default=ImageRef(), description="The green channel.")
+    blue: ImageRef = Field(default=ImageRef(), description="The blue channel.")
+    alpha: ImageRef = Field(
+        default=ImageRef(),
+        description="The alpha channel. Leave empty for an opaque RGB image.",
+    )
+
+    @profiled
+    async def process(self, context: ProcessingContext) -> ImageRef:
+        refs = [self.red, self.green, self.blue]
+        if any(ref.is_empty() for ref in refs):
+            raise ValueError("The red, green and blue channels must be connected.")
+        if not self.alpha.is_empty():
+            refs.append(self.alpha)
+
+        images = [await context.image_to_pil(ref) for ref in refs]
+        size = images[0].size
+        bands = [
+            (
+                image.convert("L")
+                if image.size == size
+                else PIL.ImageOps.fit(image.convert("L"), size)
+            )
+            for image in images
+        ]
+        mode = "RGBA" if len(bands) == 4 else "RGB"
+        return await context.image_from_pil(PIL.Image.merge(mode, bands))
@@ -0,0 +1,114 @@
+"""
+Seeded, chunked noise generation.
+
+Noise is generated with np.random.Generator in float32, a block of rows at a
+time, and clipped and quantized in place into a preallocated uint8 output. The
+only full-size buffer is the output itself, so very large images stay cheap.
+Generators are consumed in a fixed chunk order, so a given seed always
+produces the same image.
+"""
+
+from enum import Enum
+
+import numpy as np
+
+# Number of float32 samples generated per chunk
+CHUNK_SAMPLES = 1 << 22
+
+
+class NoiseType(str, Enum):
+    GAUSSIAN = "gaussian"
+    UNIFORM = "uniform"
+    SALT_AND_PEPPER = "salt_and_pepper"
+    POISSON = "poisson"
+
+
+def make_rng(seed: int) -> np.random.Generator:
+    """Create a generator, using fresh entropy for negative seeds."""
+    return np.random.default_rng(None if seed < 0 else seed)
+
+
+def _row_chunks(height: int, row_size: int):
+    rows = max(1, CHUNK_SAMPLES // max(row_size, 1))
+    for top in range(0, height, rows):
+        yield top, min(top + rows, height)
+
+
+def _quantize(values: np.ndarray, out: np.ndarray) -> None:
+    np.rint(values, out=values)
+    np.clip(values, 0, 255, out=values)
+    out[...] = values
+
+
+def gaussian_noise(
+    width: int,
+    height: int,
+    mean: float = 0.0,
+    stddev: float = 1.0,
+    seed: int = -1,
+    channels: int = 3,
+) -> np.ndarray:
+    """
+    Generate an image of Gaussian noise with values in [0, 1] scaled to 8 bits.
+    Returns an array of shape (height, width, channels).
+    """
+    rng = make_rng(seed)
+    output = np.empty((height, width, channels), dtype=np.uint8)
+    for top, bottom in _row_chunks(height, width * channels):
+        chunk = rng.standard_normal((bottom - top, width, channels), np.float32)
+        chunk *= np.float32(stddev * 255)
+        chunk += np.float32(mean * 255)
+        _quantize(chunk, output[top:bottom])
+    return output
+
+
+def apply_noise(
+    pixels: np.ndarray,
+    noise_type: NoiseType,
+    amount: float,
+    seed: int = -1,
+) -> np.ndarray:
+    """
+    Apply noise to 8-bit pixels of shape (height, width[, channels]).
+
+    amount is the standard deviation relative to the full range for Gaussian
+    noise, the half-width of the range for uniform noise, the fraction of
+    affected pixels for salt-and-pepper noise, and the standard deviation at
+    mid-gray for Poisson noise.
+    """
+    rng = make_rng(seed)
+    output = np.empty_like(pixels)
+    height = pixels.shape[0]
+    row_size = pixels[0].size if height else 0
+    # Poisson noise: std(poisson(x * peak) / peak) == amount at x == 0.5
+    peak = 0.5 / max(amount, 1e-6) ** 2
+
+    for top, bottom in _row_chunks(height, row_size):
+        source = pixels[top:bottom]
+        if noise_type == NoiseType.SALT_AND_PEPPER:
+            out = output[top:bottom]
+            out[...] = source
+            # One draw per pixel, so all channels of a pixel flip together
+            draws = rng.random(source.shape[:2], np.float32)
+            out[draws < amount / 2] = 0
+            out[draws > 1 - amount / 2] = 255
+            continue
+
+        chunk = source.astype(np.float32)
+        if noise_type == NoiseType.GAUSSIAN:
+            noise = rng.standard_normal(source.shape, np.float32)
+            noise *= np.float32(amount * 255)
+            chunk += noise
+        elif noise_type == NoiseType.UNIFORM:
+            noise = rng.random(source.shape, np.float32)
+            noise -= np.float32(0.5)
+            noise *= np.float32(2 * amount * 255)
+            chunk += noise
+        elif noise_type == NoiseType.POISSON:
+            chunk *= np.float32(peak / 255)
+            chunk[...] = rng.poisson(chunk)
+            chunk *= np.float32(255 / peak)
+        else:
+            raise ValueError(f"Unsupported noise type: {noise_type}")
+        _quantize(chunk, output[top:bottom])
+    return output
@@ -0,0 +1,242 @@
+"""
+Procedural image generators.
+
+Gradients, checkerboards, grids and fractal Perlin noise are computed with
+NumPy broadcasting a block of rows at a time into a preallocated uint8 output,
+so even 16k images only need a few megabytes of scratch memory. Gradient
+colors are looked up in a precomputed table instead of being interpolated per
+pixel.
+"""
+
+import math
+from enum import Enum
+from typing import Callable
+
+import numpy as np
+import PIL.ImageColor
+
+from nodetool.nodes.lib.pillow.noise import make_rng
+
+# Number of pixels computed per chunk
+CHUNK_PIXELS = 1 << 20
+# Number of entries in a gradient color lookup table
+LUT_SIZE = 1024
+
+
+class GradientType(str, Enum):
+    LINEAR = "linear"
+    RADIAL = "radial"
+    CONIC = "conic"
+
+
+def parse_color(color: str) -> tuple[int, int, int]:
+    return PIL.ImageColor.getcolor(color, "RGB")  # type: ignore
+
+
+def _row_chunks(width: int, height: int):
+    rows = max(1, CHUNK_PIXELS // max(width, 1))
+    for top in range(0, height, rows):
+        bottom = min(top + rows, height)
+        ys = np.arange(top, bottom, dtype=np.float32)[:, None]
+        yield top, bottom, ys
+
+
+def gradient_lut(colors: list[str], positions: list[float] | None = None):
+    """
+    Build a (LUT_SIZE, 3) uint8 color table for the given stops.
+    Stops are evenly spaced when no positions are given.
+    """
+    if not colors:
+        raise ValueError("A gradient needs at least one color.")
+    rgb = np.array([parse_color(color) for color in colors], dtype=np.float32)
+    if positions:
+        if len(positions) != len(colors):
+            raise ValueError("Each gradient color needs a position.")
+        stops = np.clip(np.array(positions, dtype=np.float32), 0, 1)
+        order = np.argsort(stops, kind="stable")
+        stops, rgb = stops[order], rgb[order]
+    else:
+        stops = np.linspace(0, 1, len(colors), dtype=np.float32)
+    t = np.linspace(0, 1, LUT_SIZE, dtype=np.float32)
+    lut = np.stack([np.interp(t, stops, rgb[:, c]) for c in range(3)], axis=1)
+    return np.rint(lut).astype(np.uint8)
+
+
+def gradient(
+    kind: GradientType,
+    width: int,
+    height: int,
+    colors: list[str],
+    positions: list[float] | None = None,
+    angle: float = 0.0,
+    center: tuple[float, float] = (0.5, 0.5),
+    radius: float = 1.0,
+) -> np.ndarray:
+    """
+    Render a linear, radial or conic gradient as an (height, width, 3) array.
+
+    angle is in degrees, clockwise from the positive x axis. center is relative
+    to the image size. For radial gradients radius is relative to the distance
+    from the center to the farthest corner.
+    """
+    lut = gradient_lut(colors, positions)
+    theta = math.radians(angle)
+    cx, cy = center[0] * width, center[1] * height
+    xs = np.arange(width, dtype=np.float32)[None, :] + np.float32(0.5)
+
+    if kind == GradientType.LINEAR:
+        dx, dy = math.cos(theta), math.sin(theta)
+        corners = [x * dx + y * dy for x in (0, width) for y in (0, height)]
+        start, span = min(corners), max(max(corners) - min(corners), 1e-6)
+
+        def position(ys):
+            return ((xs * dx - start) + ys * dy) / np.float32(span)
+
+    elif kind == GradientType.RADIAL:
+        farthest = max(
+            math.hypot(x - cx, y - cy) for x in (0, width) for y in (0, height)
+        )
+        scale = np.float32(1 / max(farthest * radius, 1e-6))
+
+        def position(ys):
+            return np.hypot(xs - cx, ys - cy) * scale
+
+    elif kind == GradientType.CONIC:
+
+        def position(ys):
+            turns = (np.arctan2(ys - cy, xs - cx) - theta) / np.float32(2 * math.pi)
+            return np.mod(turns, 1)
+
+    else:
+        raise ValueError(f"Unsupported gradient type: {kind}")
+
+    return _render_lut(width, height, lut, position)
+
+
+def _render_lut(
+    width: int,
+    height: int,
+    lut: np.ndarray,
+    position: Callable[[np.ndarray], np.ndarray],
+) -> np.ndarray:
+    output = np.empty((height, width, 3), dtype=np.uint8)
+    for top, bottom, ys in _row_chunks(width, height):
+        t = position(ys + np.float32(0.5))
+        t = np.clip(t * (LUT_SIZE - 1), 0, LUT_SIZE - 1, out=t)
+        output[top:bottom] = lut[np.rint(t).astype(np.intp)]
+    return output
+
+
+def checkerboard(
+    width: int, height: int, cell_size: int, color1: str, color2: str
+) -> np.ndarray:
+    """Render a checkerboard of square cells as an (height, width, 3) array."""
+    palette = np.array([parse_color(color1), parse_color(color2)], dtype=np.uint8)
+    columns = np.arange(width) // cell_size
+    # Every row is one of two patterns, so rows are copied rather than computed
+    patterns = np.stack([palette[columns & 1], palette[(columns + 1) & 1]])
+    output = np.empty((height, width, 3), dtype=np.uint8)
+    for top, bottom, _ in _row_chunks(width, height):
+        output[top:bottom] = patterns[(np.arange(top, bottom) // cell_size) & 1]
+    return output
+
+
+def grid(
+    width: int,
+    height: int,
+    spacing: int,
+    thickness: int,
+    line_color: str,
+    background: str,
+) -> np.ndarray:
+    """Render grid lines every spacing pixels as an (height, width, 3) array."""
+    palette = np.array([parse_color(background), parse_color(line_color)], np.uint8)
+    vertical = np.arange(width) % spacing < thickness
+    # Rows either cross vertical lines only or are entirely on a horizontal line
+    patterns = np.stack(
+        [palette[vertical.view(np.uint8)], np.broadcast_to(palette[1], (width, 3))]
+    )
+    output = np.empty((height, width, 3), dtype=np.uint8)
+    for top, bottom, _ in _row_chunks(width, height):
+        horizontal = np.arange(top, bottom) % spacing < thickness
+        output[top:bottom] = patterns[horizontal.view(np.uint8)]
+    return output
+
+
+def _fade(t: np.ndarray) -> np.ndarray:
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def _perlin(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    perm: np.ndarray,
+    gx: np.ndarray,
+    gy: np.ndarray,
+) -> np.ndarray:
+    # xs is a single row and ys a single column, so only the final gradient
+    # lookup and the interpolation run on the full block
+    x0, y0 = np.floor(xs), np.floor(ys)
+    fx, fy = xs - x0, ys - y0
+    xi = x0.astype(np.intp) & 255
+    yi = y0.astype(np.intp) & 255
+
+    def corner(ox, oy):
+        # gx and gy are already permuted, saving the outer permutation lookup
+        hashed = (perm[(xi + ox) & 255] + (yi + oy)) & 255
+        return gx[hashed] * (fx - ox) + gy[hashed] * (fy - oy)
+
+    u, v = _fade(fx), _fade(fy)
+    top = corner(0, 0) + u * (corner(1, 0) - corner(0, 0))
+    bottom = corner(0, 1) + u * (corner(1, 1) - corner(0, 1))
+    return top + v * (bottom - top)
+
+
+def perlin_noise(
+    width: int,
+    height: int,
+    scale: float = 64.0,
+    octaves: int = 4,
+    persistence: float = 0.5,
+    lacunarity: float = 2.0,
+    seed: int = -1,
+) -> np.ndarray:
+    """
+    Render fractal Perlin noise as an (height, width) grayscale array.
+    scale is the size of the coarsest noise cell in pixels.
+    """
+    rng = make_rng(seed)
+    layers = []
+    frequency, amplitude, total = 1 / scale, 1.0, 0.0
+    for _ in range(octaves):
+        angles = rng.random(256, dtype=np.float32) * np.float32(2 * math.pi)
+        perm = rng.permutation(256)
+        gx, gy = np.cos(angles)[perm], np.sin(angles)[perm]
+        # Random offsets so octaves don't share lattice points
+        offset = rng.random(2, dtype=np.float32) * 256
+        layers.append((frequency, amplitude, perm, gx, gy, offset))
+        total += amplitude
+        frequency *= lacunarity
+        amplitude *= persistence
+
+    # Perlin noise with unit gradients lies within [-sqrt(1/2), sqrt(1/2)]
+    normalize = np.float32(0.5 / (total * math.sqrt(0.5)))
+    xs = np.arange(width, dtype=np.float32)[None, :]
+    output = np.empty((height, width), dtype=np.uint8)
+    for top, bottom, ys in _row_chunks(width, height):
+        value = np.zeros((bottom - top, width), dtype=np.float32)
+        for frequency, amplitude, perm, gx, gy, offset in layers:
+            value += np.float32(amplitude) * _perlin(
+                xs * np.float32(frequency) + offset[0],
+                ys * np.float32(frequency) + offset[1],
+                perm,
+                gx,
+                gy,
+            )
+        value *= normalize
+        value += np.float32(0.5)
+        value *= 255
+        np.rint(value, out=value)
+        np.clip(value, 0, 255, out=value)
+        output[top:bottom] = value
+    return output
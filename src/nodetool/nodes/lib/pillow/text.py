@@ -0,0 +1,151 @@
+"""
+Process-wide caches for text rendering.
+
+Parsing a TrueType file costs far more than drawing a short label, so fonts
+are cached by (path, size) for the lifetime of the process. Rendered strings
+are additionally kept in an atlas of coverage masks, bounded by their total
+bytes, so repeated labels are blitted instead of rasterized again. The atlas caches whole strings rather
+than single glyphs, which keeps kerning and shaping identical to ImageDraw.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+import PIL.Image
+import PIL.ImageDraw
+import PIL.ImageFont
+
+from nodetool.workflows.processing_context import ProcessingContext
+
+FONT_CACHE_SIZE = 64
+ATLAS_CACHE_BYTES = 64 * 1024 * 1024
+
+_font_paths: dict[str, str] = {}
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def load_font(path: str, size: int) -> PIL.ImageFont.FreeTypeFont:
+    """Load a TrueType font, cached by path and size."""
+    return PIL.ImageFont.truetype(path, size)
+
+
+def get_font(
+    context: ProcessingContext, name: str, size: int
+) -> PIL.ImageFont.FreeTypeFont:
+    """Resolve a system font by name and load it at the given size."""
+    path = _font_paths.get(name)
+    if path is None:
+        path = context.get_system_font_path(name)
+        _font_paths[name] = path
+    return load_font(path, size)
+
+
+Mask = tuple[PIL.Image.Image, tuple[int, int]]
+
+
+class MaskAtlas:
+    """
+    LRU cache of rendered string masks, bounded by their total bytes. Masks
+    larger than the budget are not cached.
+    """
+
+    def __init__(self, max_bytes: int = ATLAS_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._masks: OrderedDict[tuple, Mask] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Mask | None:
+        with self._lock:
+            entry = self._masks.get(key)
+            if entry is not None:
+                self._masks.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, entry: Mask):
+        size = entry[0].width * entry[0].height
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._masks.pop(key, None)
+            if previous is not None:
+                self._size -= previous[0].width * previous[0].height
+            self._masks[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (evicted, _) = self._masks.popitem(last=False)
+                self._size -= evicted.width * evicted.height
+
+    def clear(self):
+        with self._lock:
+            self._masks.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._masks),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+mask_atlas = MaskAtlas()
+
+
+def text_mask(font: PIL.ImageFont.FreeTypeFont, text: str, align: str = "left") -> Mask:
+    """
+    Rasterize a string to a coverage mask, or take it from the atlas.
+    Returns the mask and its offset from the text anchor.
+    """
+    key = (font, text, align)
+    entry = mask_atlas.get(key)
+    if entry is None:
+        entry = _render_mask(font, text, align)
+        mask_atlas.put(key, entry)
+    return entry
+
+
+def _render_mask(font: PIL.ImageFont.FreeTypeFont, text: str, align: str) -> Mask:
+    measure = PIL.ImageDraw.Draw(PIL.Image.new("L", (1, 1)))
+    bbox = measure.textbbox((0, 0), text, font=font, align=align)
+    # Multiline alignment can produce fractional boxes
+    left, top = math.floor(bbox[0]), math.floor(bbox[1])
+    right, bottom = math.ceil(bbox[2]), math.ceil(bbox[3])
+    mask = PIL.Image.new("L", (max(right - left, 1), max(bottom - top, 1)))
+    PIL.ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255, align=align)
+    return mask, (left, top)
+
+
+def draw_text(
+    image: PIL.Image.Image,
+    xy: tuple[int, int],
+    text: str,
+    font: PIL.ImageFont.FreeTypeFont,
+    fill: Any,
+    align: str = "left",
+    use_atlas: bool = True,
+) -> None:
+    """
+    Draw text onto an image in place.
+
+    With use_atlas the string's coverage mask is taken from the atlas and
+    blended with the fill color, otherwise the text is drawn with ImageDraw.
+    """
+    if not use_atlas:
+        PIL.ImageDraw.Draw(image).text(xy, text, font=font, fill=fill, align=align)
+        return
+    if not text:
+        return
+    mask, (left, top) = text_mask(font, text, align)
+    image.paste(fill, (xy[0] + left, xy[1] + top), mask)
+
+
+def clear_caches() -> None:
+    """Drop all cached fonts, font paths and rendered strings."""
+    _font_paths.clear()
+    load_font.cache_clear()
+    mask_atlas.clear()
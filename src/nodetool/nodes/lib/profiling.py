@@ -0,0 +1,302 @@
+"""
+Per-node phase timing for the nodes in this package.
+
+Profiling is off by default and costs a single flag check per node execution.
+Enable it with the ``NODETOOL_IMAGE_PROFILE`` environment variable or by
+calling ``enable()``. While enabled, every node decorated with ``profiled``
+records the time spent in three phases:
+
+- ``decode``: ``context.image_to_pil``, ``image_to_numpy`` and ``asset_to_io``
+- ``encode``: ``context.image_from_pil`` and ``image_from_numpy``
+- ``compute``: everything else the node does
+
+together with the memory of the process when the node finishes: ``rss``,
+the resident memory, and ``peak_rss``, the highest resident memory the
+process has reached so far, which includes allocation spikes between
+measurements. When ``tracemalloc`` is already tracing, ``peak_traced`` is
+the traced allocation peak during the node. All of them are process-wide:
+nodes running at the same time share the process, so their memory shows up
+in each other's measurements. Measurements are aggregated into per-node
+histograms (see ``snapshot`` and ``dump``) and handed to any registered
+sinks. Setting ``NODETOOL_IMAGE_PROFILE=updates`` additionally
+posts a ``NodeUpdate`` with status ``"profiled"`` for every execution.
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from nodetool.workflows.types import NodeUpdate
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+DECODE = "decode"
+COMPUTE = "compute"
+ENCODE = "encode"
+TOTAL = "total"
+PHASES = (DECODE, COMPUTE, ENCODE, TOTAL)
+
+_DECODE_METHODS = ("image_to_pil", "image_to_numpy", "asset_to_io")
+_ENCODE_METHODS = ("image_from_pil", "image_from_numpy")
+
+_env = os.environ.get("NODETOOL_IMAGE_PROFILE", "").lower()
+_enabled = _env not in ("", "0", "false", "no")
+_post_updates = _env == "updates"
+_sinks: list[Callable[[dict[str, Any]], None]] = []
+_histograms: dict[str, dict[str, "Histogram"]] = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    """
+    Histogram with power-of-two buckets.
+    Values are stored in microseconds for durations and bytes for memory.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets: dict[int, int] = {}
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        bucket = int(value).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            # Bucket upper bounds mapped to counts, e.g. {"<1024": 3}
+            "buckets": {
+                f"<{1 << bucket}": count
+                for bucket, count in sorted(self.buckets.items())
+            },
+        }
+
+
+def enable(post_updates: bool = False):
+    """Turn profiling on, optionally posting a NodeUpdate per execution."""
+    global _enabled, _post_updates
+    _enabled = True
+    _post_updates = post_updates
+
+
+def disable():
+    global _enabled, _post_updates
+    _enabled = False
+    _post_updates = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def add_sink(sink: Callable[[dict[str, Any]], None]):
+    """Register a callable that receives the profile dict of every execution."""
+    _sinks.append(sink)
+
+
+def remove_sink(sink: Callable[[dict[str, Any]], None]):
+    _sinks.remove(sink)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def snapshot() -> dict[str, dict[str, dict[str, Any]]]:
+    """Return the aggregated histograms keyed by node type and metric."""
+    with _lock:
+        return {
+            node_type: {name: hist.to_dict() for name, hist in metrics.items()}
+            for node_type, metrics in _histograms.items()
+        }
+
+
+def dump(path: str) -> dict[str, dict[str, dict[str, Any]]]:
+    """Write the aggregated histograms as JSON to the given path."""
+    data = snapshot()
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+    return data
+
+
+def _peak_resident_bytes() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _resident_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _TimedContext:
+    """
+    Proxy for a ProcessingContext that accumulates the time spent in
+    decode and encode calls. All other attributes are delegated.
+    Overlapping calls (e.g. gathered encodes) are summed.
+    """
+
+    def __init__(self, context: Any):
+        self._context = context
+        self.timings = {DECODE: 0.0, ENCODE: 0.0}
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._context, name)
+        if name in _DECODE_METHODS:
+            return self._wrap(attr, DECODE)
+        if name in _ENCODE_METHODS:
+            return self._wrap(attr, ENCODE)
+        return attr
+
+    def _wrap(self, method: Callable, phase: str) -> Callable:
+        @functools.wraps(method)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self.timings[phase] += time.perf_counter() - start
+
+        return timed
+
+
+class _Measurement:
+    def __init__(self, node: Any, context: Any):
+        self.node = node
+        self.context = _TimedContext(context)
+        self.elapsed = 0.0
+        self.traced_start = 0
+        if tracemalloc.is_tracing():
+            # The peak is process-wide, so it includes concurrent nodes
+            tracemalloc.reset_peak()
+            self.traced_start = tracemalloc.get_traced_memory()[0]
+
+    def finish(self, real_context: Any):
+        decode = self.context.timings[DECODE]
+        encode = self.context.timings[ENCODE]
+        profile = {
+            "node_id": self.node.id,
+            "node_type": self.node.get_node_type(),
+            DECODE: decode,
+            COMPUTE: max(self.elapsed - decode - encode, 0.0),
+            ENCODE: encode,
+            TOTAL: self.elapsed,
+        }
+        for key, value in (
+            ("rss", _resident_bytes()),
+            ("peak_rss", _peak_resident_bytes()),
+        ):
+            if value is not None:
+                profile[key] = value
+        if tracemalloc.is_tracing():
+            profile["peak_traced"] = max(
+                tracemalloc.get_traced_memory()[1] - self.traced_start, 0
+            )
+        _record(profile)
+        if _post_updates:
+            real_context.post_message(
+                NodeUpdate(
+                    node_id=self.node.id,
+                    node_name=self.node.get_title(),
+                    node_type=profile["node_type"],
+                    status="profiled",
+                    result=profile,
+                )
+            )
+        for sink in list(_sinks):
+            sink(profile)
+
+
+def _record(profile: dict[str, Any]):
+    with _lock:
+        metrics = _histograms.setdefault(profile["node_type"], {})
+        for key, value in profile.items():
+            if key in PHASES:
+                value = value * 1e6
+            elif key not in ("rss", "peak_rss", "peak_traced"):
+                continue
+            metrics.setdefault(key, Histogram()).add(value)
+
+
+def profiled(fn: Callable) -> Callable:
+    """
+    Decorate a node's ``process`` or ``gen_process`` method with phase timing.
+    For generators only the time spent producing items is counted, not the
+    time the consumer holds the generator suspended.
+    """
+    if inspect.isasyncgenfunction(fn):
+
+        @functools.wraps(fn)
+        async def gen_wrapper(self, context):
+            if not _enabled:
+                gen = fn(self, context)
+                try:
+                    async for item in gen:
+                        yield item
+                finally:
+                    # Run the node's cleanup when the consumer stops early
+                    await gen.aclose()
+                return
+            measurement = _Measurement(self, context)
+            gen = fn(self, measurement.context)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = await gen.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        measurement.elapsed += time.perf_counter() - start
+                    yield item
+            finally:
+                await gen.aclose()
+                measurement.finish(context)
+
+        return gen_wrapper
+
+    @functools.wraps(fn)
+    async def wrapper(self, context):
+        if not _enabled:
+            return await fn(self, context)
+        measurement = _Measurement(self, context)
+        start = time.perf_counter()
+        try:
+            return await fn(self, measurement.context)
+        finally:
+            measurement.elapsed = time.perf_counter() - start
+            measurement.finish(context)
+
+    return wrapper
+
+
+if _enabled and os.environ.get("NODETOOL_IMAGE_PROFILE_DUMP"):
+    atexit.register(dump, os.environ["NODETOOL_IMAGE_PROFILE_DUMP"])
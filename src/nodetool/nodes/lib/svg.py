@@ -1,10 +1,31 @@
+import asyncio
+import functools
+import math
 from enum import Enum
-import io
-import PIL.Image
+from typing import Literal
 from pydantic import Field
 from nodetool.workflows.base_node import BaseNode
 from nodetool.workflows.processing_context import ProcessingContext
-from nodetool.metadata.types import ColorRef, ImageRef, SVGRef, SVGElement
+from nodetool.metadata.types import BaseType, ColorRef, ImageRef, SVGRef, SVGElement
+from nodetool.nodes.lib.profiling import profiled
+from nodetool.nodes.lib.svg_animate import Animator, Easing, frame_times
+from nodetool.nodes.lib.svg_atlas import build_atlas
+from nodetool.nodes.lib.svg_optimize import optimize_content
+from nodetool.nodes.lib.svg_serialize import serialize_document
+from nodetool.nodes.lib.svg_simplify import (
+    simplify_content,
+    simplify_path_data,
+    simplify_points,
+)
+from nodetool.nodes.lib.svg_render import (
+    DEFAULT_WORKERS,
+    cancel_pending,
+    rasterize,
+    rasterize_tiled,
+    render_documents,
+    render_template,
+    run_in_pool,
+)
 
 
 class RectNode(BaseNode):
@@ -25,6 +46,7 @@ class RectNode(BaseNode):
     def get_title(cls) -> str:
         return "Rectangle"
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
         attributes = {
             "x": str(self.x),
@@ -55,6 +77,7 @@ class CircleNode(BaseNode):
     def get_title(cls) -> str:
         return "Circle"
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
         attributes = {
             "cx": str(self.cx),
@@ -85,6 +108,7 @@ class EllipseNode(BaseNode):
     def get_title(cls) -> str:
         return "Ellipse"
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
         attributes = {
             "cx": str(self.cx),
@@ -117,6 +141,7 @@ class LineNode(BaseNode):
     def get_title(cls) -> str:
         return "Line"
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
         attributes = {
             "x1": str(self.x1),
@@ -139,14 +164,23 @@ class PolygonNode(BaseNode):
     fill: ColorRef = Field(default=ColorRef(value="#000000"), description="Fill color")
     stroke: ColorRef = Field(default=ColorRef(value="none"), description="Stroke color")
     stroke_width: int = Field(default=1, description="Stroke width")
+    simplify: float = Field(
+        default=0,
+        ge=0,
+        description="Drop points closer than this to the simplified outline, in user units. 0 keeps all points.",
+    )
 
     @classmethod
     def get_title(cls) -> str:
         return "Polygon"
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
+        points = self.points
+        if self.simplify:
+            points = simplify_points(points, self.simplify)
         attributes = {
-            "points": self.points,
+            "points": points,
             "fill": str(self.fill),
             "stroke": str(self.stroke),
             "stroke-width": str(self.stroke_width),
@@ -164,10 +198,19 @@ class PathNode(BaseNode):
     fill: ColorRef = Field(default=ColorRef(value="#000000"), description="Fill color")
     stroke: ColorRef = Field(default=ColorRef(value="none"), description="Stroke color")
     stroke_width: int = Field(default=1, description="Stroke width")
+    simplify: float = Field(
+        default=0,
+        ge=0,
+        description="Drop points closer than this to the simplified outline, in user units. 0 keeps all points.",
+    )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
+        path_data = self.path_data
+        if self.simplify:
+            path_data = simplify_path_data(path_data, self.simplify)
         attributes = {
-            "d": self.path_data,
+            "d": path_data,
             "fill": str(self.fill),
             "stroke": str(self.stroke),
             "stroke-width": str(self.stroke_width),
@@ -202,6 +245,7 @@ class Text(BaseNode):
         default=SVGTextAnchor.START, description="Text anchor position"
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
         print(self)
         attributes = {
@@ -223,6 +267,7 @@ class GaussianBlur(BaseNode):
 
     std_deviation: float = Field(default=3.0, description="Standard deviation for blur")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
         filter_id = "filter_gaussian_blur"
         return SVGElement(
@@ -250,6 +295,7 @@ class DropShadow(BaseNode):
         default=ColorRef(value="#000000"), description="Color for shadow"
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
         filter_id = "filter_drop_shadow"
         return SVGElement(
@@ -309,22 +355,16 @@ class Document(BaseNode):
     width: int = Field(default=800, ge=1, le=4096, description="Document width")
     height: int = Field(default=600, ge=1, le=4096, description="Document height")
     viewBox: str = Field(default="0 0 800 600", description="SVG viewBox attribute")
+    optimize: bool = Field(
+        default=False,
+        description="Dedupe definitions, strip default attributes and merge shapes before serializing",
+    )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGRef:
-        if isinstance(self.content, list):
-            content_str = "\n".join(str(element) for element in self.content)
-        else:
-            content_str = str(self.content)
-
-        svg_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<svg xmlns="http://www.w3.org/2000/svg" 
-     width="{self.width}" 
-     height="{self.height}" 
-     viewBox="{self.viewBox}">
-    {content_str}
-</svg>"""
-
-        return SVGRef(data=svg_content.encode("utf-8"))
+        content = optimize_content(self.content) if self.optimize else self.content
+        svg = serialize_document(content, self.width, self.height, self.viewBox)
+        return SVGRef(data=svg)
 
 
 class SVGToImage(BaseNode):
@@ -351,36 +391,352 @@ class SVGToImage(BaseNode):
     scale: int = Field(
         default=1, ge=1, le=10, description="Scale factor for rasterization"
     )
+    tile_size: int = Field(
+        default=0,
+        ge=0,
+        le=8192,
+        description="Render in tiles of this many pixels in parallel worker processes. 0 renders in one pass.",
+    )
+    optimize: bool = Field(
+        default=False,
+        description="Dedupe definitions, strip default attributes and merge shapes before serializing",
+    )
+    simplify: float = Field(
+        default=0,
+        ge=0,
+        description="Drop polygon and path points closer than this to the simplified outline, in output pixels. 0 keeps all points.",
+    )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> ImageRef:
-        # Create SVG document
-        if isinstance(self.content, list):
-            content_str = "\n".join(str(element) for element in self.content)
+        content = self.content
+        if self.simplify:
+            content = simplify_content(
+                content,
+                self.simplify,
+                self.width,
+                self.height,
+                self.viewBox,
+                self.scale,
+            )
+        content = optimize_content(content) if self.optimize else content
+        width, height = self.width * self.scale, self.height * self.scale
+        if self.tile_size and max(width, height) > self.tile_size:
+            # Huge outputs are assembled from tiles, bypassing the raster cache
+            pixels = await rasterize_tiled(
+                content, width, height, self.viewBox, self.tile_size
+            )
+            return await context.image_from_numpy(pixels)
+
+        svg = serialize_document(content, self.width, self.height, self.viewBox)
+        # Repeated documents are served from the raster cache, and primitive
+        # shapes are drawn without cairosvg
+        image = rasterize(
+            svg, self.width, self.height, self.scale, content, self.viewBox
+        )
+        return await context.image_from_pil(image)
+
+
+class BatchSVGToImage(BaseNode):
+    """
+    Rasterize many SVG documents, or one template with many bindings, in parallel.
+    svg, batch, raster, template, parallel
+
+    Use cases:
+    - Render thousands of personalized badges or icons
+    - Fill an SVG template with rows of data and rasterize each result
+    - Stream rendered images to downstream nodes as they finish
+    """
+
+    @classmethod
+    def get_title(cls) -> str:
+        return "Batch SVG to Image"
+
+    documents: list[SVGRef] = Field(
+        default=[], description="SVG documents to rasterize."
+    )
+    template: SVGRef = Field(
+        default=SVGRef(),
+        description="SVG document with $name placeholders. Used instead of documents when connected.",
+    )
+    bindings: list[dict[str, str]] = Field(
+        default=[], description="Values for the template placeholders, one per image."
+    )
+    width: int = Field(default=800, ge=1, le=4096, description="Output width")
+    height: int = Field(default=600, ge=1, le=4096, description="Output height")
+    scale: int = Field(
+        default=1, ge=1, le=10, description="Scale factor for rasterization"
+    )
+    ordered: bool = Field(
+        default=True,
+        description="Emit images in input order. Otherwise images are emitted as soon as they are rendered.",
+    )
+    workers: int = Field(
+        default=0,
+        ge=0,
+        le=64,
+        description="Chunks rendered at once in the shared SVG process pool. 0 uses the whole pool, sized by NODETOOL_SVG_WORKERS.",
+    )
+
+    @classmethod
+    def return_type(cls):
+        return {"image": ImageRef, "index": int}
+
+    async def _read(self, context: ProcessingContext, ref: SVGRef) -> bytes:
+        if isinstance(ref.data, bytes):
+            return ref.data
+        return (await context.asset_to_io(ref)).read()
+
+    @profiled
+    async def gen_process(self, context: ProcessingContext):
+        workers = self.workers or DEFAULT_WORKERS
+        if not self.template.is_empty():
+            template = (await self._read(context, self.template)).decode("utf-8")
+            items = self.bindings
+            render = functools.partial(render_template, template)
         else:
-            content_str = str(self.content)
-
-        svg_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<svg xmlns="http://www.w3.org/2000/svg" 
-     width="{self.width}" 
-     height="{self.height}" 
-     viewBox="{self.viewBox}">
-    {content_str}
-</svg>"""
-
-        import cairosvg
-
-        # Convert to PNG using cairosvg
-        png_data = cairosvg.svg2png(
-            bytestring=svg_content.encode("utf-8"),
-            output_width=self.width,
-            output_height=self.height,
-            scale=self.scale,
+            items = [await self._read(context, ref) for ref in self.documents]
+            render = render_documents
+
+        # A few chunks per worker balance the load, while each chunk ships
+        # the template to a worker only once
+        chunk_size = max(1, math.ceil(len(items) / (workers * 4)))
+        slots = asyncio.Semaphore(workers)
+
+        async def render_chunk(start: int):
+            chunk = items[start : start + chunk_size]
+            async with slots:
+                images = await run_in_pool(
+                    render, chunk, self.width, self.height, self.scale
+                )
+            return start, images
+
+        tasks = [
+            asyncio.ensure_future(render_chunk(start))
+            for start in range(0, len(items), chunk_size)
+        ]
+        try:
+            for task in tasks if self.ordered else asyncio.as_completed(tasks):
+                start, images = await task
+                for offset, pixels in enumerate(images):
+                    yield "image", await context.image_from_numpy(pixels)
+                    yield "index", start + offset
+        finally:
+            # The consumer may stop early, or a chunk may fail
+            cancel_pending(tasks)
+
+
+class SVGTrack(BaseType):
+    """Keyframes of one attribute of an SVG element, for the SVG Animation node."""
+
+    type: Literal["svg_track"] = "svg_track"
+    target: str = ""
+    attribute: str = ""
+    times: list[float] = []
+    values: list[str] = []
+    easing: Easing = Easing.LINEAR
+
+
+class Track(BaseNode):
+    """
+    Describe keyframes of one attribute of an SVG element for the SVG Animation node.
+    svg, animation, keyframe, track, tween
+
+    Use cases:
+    - Move, rotate or scale an element over time
+    - Fade or recolor shapes between keyframes
+    - Build track lists for animating a document
+    """
+
+    @classmethod
+    def get_title(cls) -> str:
+        return "SVG Track"
+
+    target: str = Field(default="", description="The id of the animated element.")
+    attribute: str = Field(
+        default="",
+        description="The animated attribute, or one of translate_x, translate_y, rotate, scale_x and scale_y.",
+    )
+    times: list[float] = Field(
+        default=[], description="Keyframe times in seconds, in ascending order."
+    )
+    values: list[str] = Field(
+        default=[],
+        description="Attribute values at the keyframe times. Numbers and colors are interpolated.",
+    )
+    easing: Easing = Field(
+        default=Easing.LINEAR, description="Easing between keyframes."
+    )
+
+    @profiled
+    async def process(self, context: ProcessingContext) -> SVGTrack:
+        if len(self.times) != len(self.values):
+            raise ValueError("Each keyframe time needs a value.")
+        return SVGTrack(
+            target=self.target,
+            attribute=self.attribute,
+            times=self.times,
+            values=self.values,
+            easing=self.easing,
         )
 
-        assert isinstance(png_data, bytes)
 
-        image = PIL.Image.open(io.BytesIO(png_data))
-        return await context.image_from_pil(image)
+class Animation(BaseNode):
+    """
+    Render frames of SVG content animated by keyframed tracks.
+    svg, animation, keyframe, frames, raster
+
+    Use cases:
+    - Render animated logos, charts and overlays frame by frame
+    - Stream frames to a video encoder
+    - Preview motion graphics built from SVG nodes
+    """
+
+    @classmethod
+    def get_title(cls) -> str:
+        return "SVG Animation"
+
+    content: str | SVGElement | list[SVGElement] = Field(
+        default=[], description="SVG content. Animated elements need an id."
+    )
+    tracks: list[SVGTrack] = Field(default=[], description="Keyframed tracks.")
+    duration: float = Field(
+        default=1.0, gt=0, le=3600, description="Duration in seconds"
+    )
+    fps: float = Field(default=24.0, gt=0, le=240, description="Frames per second")
+    width: int = Field(default=800, ge=1, le=4096, description="Document width")
+    height: int = Field(default=600, ge=1, le=4096, description="Document height")
+    viewBox: str = Field(default="0 0 800 600", description="SVG viewBox attribute")
+    scale: int = Field(
+        default=1, ge=1, le=10, description="Scale factor for rasterization"
+    )
+
+    @classmethod
+    def return_type(cls):
+        return {"image": ImageRef, "index": int}
+
+    @profiled
+    async def gen_process(self, context: ProcessingContext):
+        # Static layers are rendered once, animated layers for each frame
+        animator = Animator(
+            self.content,
+            self.tracks,
+            self.width,
+            self.height,
+            self.viewBox,
+            self.scale,
+        )
+        for index, t in enumerate(frame_times(self.duration, self.fps)):
+            yield "image", await context.image_from_pil(animator.frame(t))
+            yield "index", index
+
+
+class SpriteAtlas(BaseNode):
+    """
+    Pack many SVG elements into one sprite atlas and rasterize it in one render.
+    svg, sprite, atlas, icons, pack
+
+    Use cases:
+    - Render hundreds of icons in one pass instead of one document each
+    - Build texture atlases for games and web pages
+    - Produce a coordinate index for slicing sprites later
+    """
+
+    @classmethod
+    def get_title(cls) -> str:
+        return "SVG Sprite Atlas"
+
+    sprites: list[SVGElement] = Field(
+        default=[],
+        description="One element per sprite, usually a group. Sized <svg> elements keep their own size and viewBox.",
+    )
+    sprite_width: int = Field(
+        default=64, ge=1, le=4096, description="Width of sprites without a size"
+    )
+    sprite_height: int = Field(
+        default=64, ge=1, le=4096, description="Height of sprites without a size"
+    )
+    viewBox: str = Field(
+        default="0 0 64 64", description="viewBox of sprites without a size"
+    )
+    padding: int = Field(
+        default=1, ge=0, le=256, description="Space between sprites in the atlas"
+    )
+    scale: int = Field(
+        default=1, ge=1, le=10, description="Scale factor for rasterization"
+    )
+
+    @classmethod
+    def return_type(cls):
+        return {"atlas": ImageRef, "index": list[dict[str, int]]}
+
+    @profiled
+    async def process(self, context: ProcessingContext):
+        if not self.sprites:
+            raise ValueError("No sprites provided for the atlas.")
+        content, (width, height), boxes = build_atlas(
+            self.sprites,
+            (self.sprite_width, self.sprite_height),
+            self.viewBox,
+            self.padding,
+        )
+        view_box = f"0 0 {width} {height}"
+        svg = serialize_document(content, width, height, view_box)
+        image = rasterize(svg, width, height, self.scale, content, view_box)
+        index = [
+            {
+                "x": left * self.scale,
+                "y": top * self.scale,
+                "width": (right - left) * self.scale,
+                "height": (bottom - top) * self.scale,
+            }
+            for left, top, right, bottom in boxes
+        ]
+        return {"atlas": await context.image_from_pil(image), "index": index}
+
+
+class SliceAtlas(BaseNode):
+    """
+    Slice sprites out of an atlas made by the SVG Sprite Atlas node.
+    svg, sprite, atlas, slice, crop
+
+    Use cases:
+    - Extract single icons from a rendered atlas
+    - Stream only the sprites a workflow needs
+    """
+
+    @classmethod
+    def get_title(cls) -> str:
+        return "Slice Sprite Atlas"
+
+    atlas: ImageRef = Field(default=ImageRef(), description="The atlas image.")
+    index: list[dict[str, int]] = Field(
+        default=[], description="The coordinate index of the atlas."
+    )
+    sprites: list[int] = Field(
+        default=[], description="Positions of the sprites to slice. Empty slices all."
+    )
+
+    @classmethod
+    def return_type(cls):
+        return {"image": ImageRef, "index": int}
+
+    @profiled
+    async def gen_process(self, context: ProcessingContext):
+        atlas = await context.image_to_pil(self.atlas)
+        for position in self.sprites or range(len(self.index)):
+            if not 0 <= position < len(self.index):
+                raise ValueError(f"Sprite {position} is not in the atlas index.")
+            entry = self.index[position]
+            box = (
+                entry["x"],
+                entry["y"],
+                entry["x"] + entry["width"],
+                entry["y"] + entry["height"],
+            )
+            # Each sprite is copied out of the atlas only when it is emitted
+            yield "image", await context.image_from_pil(atlas.crop(box))
+            yield "index", position
 
 
 class Gradient(BaseNode):
@@ -420,6 +776,7 @@ class Gradient(BaseNode):
         default=ColorRef(value="#FFFFFF"), description="End color of gradient"
     )
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
         gradient_id = f"gradient_{self.gradient_type.value}"
 
@@ -481,6 +838,7 @@ class Transform(BaseNode):
     scale_x: float = Field(default=1, description="X scale factor")
     scale_y: float = Field(default=1, description="Y scale factor")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
         if not self.content:
             return SVGElement()
@@ -518,6 +876,7 @@ class ClipPath(BaseNode):
     )
     content: SVGElement = Field(default=None, description="SVG element to clip")
 
+    @profiled
     async def process(self, context: ProcessingContext) -> SVGElement:
         if not self.clip_content or not self.content:
             return SVGElement()
@@ -0,0 +1,251 @@
+"""
+Keyframed animation of SVGElement trees.
+
+Tracks set attributes of elements with an id over time. The translate_x,
+translate_y, rotate, scale_x and scale_y channels compose a transform like the
+Transform node builds it, appended to the element's own transform. Numbers
+and colors are interpolated between keyframes, other values are held.
+
+An Animator splits the content into layers of consecutive top-level items.
+Layers without animated elements are rendered once and cached, including the
+background below the first animated item. Animated layers keep their element
+objects between frames, so a FragmentCache only re-serializes the elements
+that changed, and only those layers are rasterized again for each frame.
+"""
+
+import math
+from enum import Enum
+from typing import Any, Sequence
+
+import PIL.Image
+import PIL.ImageColor
+
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_optimize import DEFINITIONS
+from nodetool.nodes.lib.svg_render import rasterize
+from nodetool.nodes.lib.svg_serialize import Content, FragmentCache, serialize_document
+
+TRANSFORM_CHANNELS = ("translate_x", "translate_y", "rotate", "scale_x", "scale_y")
+
+
+class Easing(str, Enum):
+    LINEAR = "linear"
+    EASE_IN = "ease_in"
+    EASE_OUT = "ease_out"
+    EASE_IN_OUT = "ease_in_out"
+    STEP = "step"
+
+
+def ease(easing: Easing, u: float) -> float:
+    if easing == Easing.EASE_IN:
+        return u * u
+    if easing == Easing.EASE_OUT:
+        return 1 - (1 - u) * (1 - u)
+    if easing == Easing.EASE_IN_OUT:
+        return u * u * (3 - 2 * u)
+    if easing == Easing.STEP:
+        return 0.0
+    return u
+
+
+def _number(value: float) -> str:
+    return format(value, ".6g")
+
+
+def _parse(value: Any) -> float | tuple[int, ...] | None:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return PIL.ImageColor.getrgb(value)
+    except ValueError:
+        return None
+
+
+def interpolate(start: Any, end: Any, u: float) -> str:
+    """Interpolate numbers and colors, or hold the start value."""
+    a, b = _parse(start), _parse(end)
+    if isinstance(a, float) and isinstance(b, float):
+        return _number(a + (b - a) * u)
+    if isinstance(a, tuple) and isinstance(b, tuple) and len(a) == len(b) == 3:
+        channels = [round(x + (y - x) * u) for x, y in zip(a, b)]
+        return "#{:02x}{:02x}{:02x}".format(*channels)
+    return str(start)
+
+
+def sample(times: Sequence[float], values: Sequence[Any], easing: Easing, t: float):
+    """The value of a keyframed track at time t."""
+    if not times:
+        raise ValueError("An animation track needs at least one keyframe.")
+    if len(times) != len(values):
+        raise ValueError("Each keyframe time needs a value.")
+    if t <= times[0]:
+        return interpolate(values[0], values[0], 0)
+    for index in range(1, len(times)):
+        if t < times[index]:
+            span = times[index] - times[index - 1]
+            u = ease(easing, (t - times[index - 1]) / span) if span > 0 else 1.0
+            return interpolate(values[index - 1], values[index], u)
+    return interpolate(values[-1], values[-1], 0)
+
+
+def compose_transform(base: str, channels: dict[str, float]) -> str:
+    transforms = [base] if base else []
+    translate_x = channels.get("translate_x", 0.0)
+    translate_y = channels.get("translate_y", 0.0)
+    if translate_x != 0 or translate_y != 0:
+        transforms.append(f"translate({_number(translate_x)},{_number(translate_y)})")
+    rotate = channels.get("rotate", 0.0)
+    if rotate != 0:
+        transforms.append(f"rotate({_number(rotate)})")
+    scale_x, scale_y = channels.get("scale_x", 1.0), channels.get("scale_y", 1.0)
+    if scale_x != 1 or scale_y != 1:
+        transforms.append(f"scale({_number(scale_x)},{_number(scale_y)})")
+    return " ".join(transforms)
+
+
+def _index(element: SVGElement, elements: dict[str, SVGElement]):
+    id = element.attributes.get("id")
+    if id:
+        elements.setdefault(id, element)
+    for child in element.children:
+        _index(child, elements)
+
+
+def _references(svg: bytes) -> bool:
+    return b"url(#" in svg or b'href="#' in svg
+
+
+class Animator:
+    """
+    Renders frames of content animated by tracks. Tracks are objects with
+    target, attribute, times, values and easing, like SVGTrack.
+    """
+
+    def __init__(
+        self,
+        content: Content,
+        tracks: Sequence[Any],
+        width: int,
+        height: int,
+        view_box: str,
+        scale: float = 1,
+    ):
+        self.width, self.height, self.view_box, self.scale = (
+            width,
+            height,
+            view_box,
+            scale,
+        )
+        self.tracks = tracks
+        self.fragments = FragmentCache()
+        # Frames mutate attributes, so the input elements are copied once
+        items = content if isinstance(content, list) else [content]
+        items = [
+            item.model_copy(deep=True) if isinstance(item, SVGElement) else item
+            for item in items
+        ]
+        # Layers rendered alone still need the definitions they reference
+        self.definitions = [
+            item
+            for item in items
+            if isinstance(item, SVGElement)
+            and (item.name in DEFINITIONS or item.name == "defs")
+        ]
+
+        self.targets: dict[str, SVGElement] = {}
+        owners = []
+        for item in items:
+            elements: dict[str, SVGElement] = {}
+            if isinstance(item, SVGElement):
+                _index(item, elements)
+            owners.append(elements)
+            for id, element in elements.items():
+                self.targets.setdefault(id, element)
+        targeted = {track.target for track in tracks}
+        missing = targeted - self.targets.keys()
+        if missing:
+            raise ValueError(f"Unknown animation target: {sorted(missing)[0]}")
+        for track in tracks:
+            if track.attribute == "transform":
+                raise ValueError(
+                    "Animate transforms with the translate_x, translate_y, "
+                    "rotate, scale_x and scale_y channels."
+                )
+        self.base_transforms = {
+            id: self.targets[id].attributes.get("transform", "") for id in targeted
+        }
+
+        # Consecutive items form a layer while they are all static or all
+        # animated; static layers are rendered on first use
+        self.layers: list[tuple[bool, list]] = []
+        for item, elements in zip(items, owners):
+            animated = not targeted.isdisjoint(elements)
+            if self.layers and self.layers[-1][0] == animated:
+                self.layers[-1][1].append(item)
+            else:
+                self.layers.append((animated, [item]))
+        self._static: dict[int, PIL.Image.Image] = {}
+
+    def _render(
+        self,
+        items: list,
+        fragments: FragmentCache | None = None,
+        cache: bool = True,
+    ):
+        svg = serialize_document(
+            items, self.width, self.height, self.view_box, fragments
+        )
+        if _references(svg) and self.definitions:
+            items = [d for d in self.definitions if d not in items] + items
+            svg = serialize_document(
+                items, self.width, self.height, self.view_box, fragments
+            )
+        return rasterize(
+            svg, self.width, self.height, self.scale, items, self.view_box, cache
+        )
+
+    def apply(self, t: float):
+        """Set the animated attributes to their values at time t."""
+        channels: dict[str, dict[str, float]] = {}
+        for track in self.tracks:
+            value = sample(track.times, track.values, track.easing, t)
+            if track.attribute in TRANSFORM_CHANNELS:
+                channels.setdefault(track.target, {})[track.attribute] = float(value)
+            else:
+                self.targets[track.target].attributes[track.attribute] = value
+        for id, values in channels.items():
+            transform = compose_transform(self.base_transforms[id], values)
+            attributes = self.targets[id].attributes
+            if transform:
+                attributes["transform"] = transform
+            else:
+                attributes.pop("transform", None)
+
+    def frame(self, t: float) -> PIL.Image.Image:
+        """Render the frame at time t."""
+        self.apply(t)
+        size = (round(self.width * self.scale), round(self.height * self.scale))
+        image = None
+        for index, (animated, items) in enumerate(self.layers):
+            if animated:
+                # Animated layers differ every frame, so caching them would
+                # only evict reusable entries from the raster cache
+                layer = self._render(items, self.fragments, cache=False)
+            else:
+                if index not in self._static:
+                    self._static[index] = self._render(items)
+                layer = self._static[index]
+            if image is None:
+                # convert copies, so the cached background isn't drawn over
+                image = layer.convert("RGBA")
+            else:
+                image.alpha_composite(layer.convert("RGBA"))
+        return image if image is not None else PIL.Image.new("RGBA", size)
+
+
+def frame_times(duration: float, fps: float) -> list[float]:
+    return [index / fps for index in range(max(1, math.ceil(duration * fps)))]
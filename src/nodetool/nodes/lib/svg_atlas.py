@@ -0,0 +1,141 @@
+"""
+Sprite atlas layout for SVGElement groups.
+
+Each sprite becomes a nested <svg> viewport at its place in one atlas
+document, so the whole atlas is serialized and rasterized once instead of
+once per sprite. Nested viewports clip their sprite and map its viewBox like
+a standalone document would.
+
+Places are found by shelf packing: sprites are sorted by decreasing height
+and put on the first shelf with room left, or on a new shelf below. The
+atlas is about as wide as the square root of the total sprite area.
+"""
+
+import math
+import re
+
+from nodetool.metadata.types import SVGElement
+
+Box = tuple[int, int, int, int]
+
+_REFERENCE = re.compile(r"url\(\s*#([^)\s]+)\s*\)")
+
+
+def pack_rectangles(
+    sizes: list[tuple[int, int]], padding: int = 0
+) -> tuple[list[tuple[int, int]], tuple[int, int]]:
+    """
+    Place rectangles without overlap, at least padding apart.
+    Returns the top-left corner of each rectangle and the size of the atlas.
+    """
+    if not sizes:
+        return [], (0, 0)
+    area = sum((w + padding) * (h + padding) for w, h in sizes)
+    width = max(max(w for w, _ in sizes), math.ceil(math.sqrt(area)))
+
+    # Each shelf is [top, height, used width]
+    shelves: list[list[int]] = []
+    positions: list[tuple[int, int]] = [(0, 0)] * len(sizes)
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    for index in order:
+        w, h = sizes[index]
+        for shelf in shelves:
+            x = shelf[2] + padding if shelf[2] else 0
+            if x + w <= width and h <= shelf[1]:
+                positions[index] = (x, shelf[0])
+                shelf[2] = x + w
+                break
+        else:
+            top = shelves[-1][0] + shelves[-1][1] + padding if shelves else 0
+            shelves.append([top, h, w])
+            positions[index] = (0, top)
+    used_width = max(shelf[2] for shelf in shelves)
+    height = shelves[-1][0] + shelves[-1][1]
+    return positions, (used_width, height)
+
+
+def _own_size(element: SVGElement) -> tuple[int, int] | None:
+    if element.name != "svg":
+        return None
+    try:
+        width = float(element.attributes["width"])
+        height = float(element.attributes["height"])
+    except (KeyError, ValueError):
+        return None
+    if not (0 < width < math.inf and 0 < height < math.inf):
+        return None
+    return math.ceil(width), math.ceil(height)
+
+
+def _ids(element: SVGElement, ids: set[str]):
+    if "id" in element.attributes:
+        ids.add(element.attributes["id"])
+    for child in element.children:
+        _ids(child, ids)
+
+
+def _rename(element: SVGElement, names: dict[str, str]) -> SVGElement:
+    attributes = {}
+    for key, value in element.attributes.items():
+        if key == "id":
+            value = names.get(value, value)
+        elif key in ("href", "xlink:href"):
+            if value.startswith("#"):
+                value = "#" + names.get(value[1:], value[1:])
+        else:
+            value = _REFERENCE.sub(
+                lambda m: f"url(#{names.get(m.group(1), m.group(1))})", value
+            )
+        attributes[key] = value
+    children = [_rename(child, names) for child in element.children]
+    return element.model_copy(update={"attributes": attributes, "children": children})
+
+
+def build_atlas(
+    sprites: list[SVGElement],
+    sprite_size: tuple[int, int],
+    view_box: str,
+    padding: int = 1,
+) -> tuple[list[SVGElement], tuple[int, int], list[Box]]:
+    """
+    Lay out sprites in one document.
+
+    A sprite that is an <svg> element with a width and height keeps its size
+    and viewBox; other elements get sprite_size and view_box. Ids defined by
+    more than one sprite are suffixed in the later sprites, and references
+    to them are rewritten, so definitions don't clash.
+
+    Returns the atlas content, its size and each sprite's (left, top, right,
+    bottom) box in atlas units.
+    """
+    own_sizes = [_own_size(sprite) for sprite in sprites]
+    sizes = [own or sprite_size for own in own_sizes]
+    positions, size = pack_rectangles(sizes, padding)
+
+    seen: set[str] = set()
+    content = []
+    boxes = []
+    for index, (sprite, own, (w, h), (x, y)) in enumerate(
+        zip(sprites, own_sizes, sizes, positions)
+    ):
+        ids: set[str] = set()
+        _ids(sprite, ids)
+        names = {id: f"{id}-{index}" for id in ids & seen}
+        seen |= ids
+        if names:
+            sprite = _rename(sprite, names)
+        placement = {"x": str(x), "y": str(y), "width": str(w), "height": str(h)}
+        if own is not None:
+            # Sized <svg> sprites are placed as they are
+            attributes = {**sprite.attributes, **placement}
+            content.append(sprite.model_copy(update={"attributes": attributes}))
+        else:
+            content.append(
+                SVGElement(
+                    name="svg",
+                    attributes={**placement, "viewBox": view_box},
+                    children=[sprite],
+                )
+            )
+        boxes.append((x, y, x + w, y + h))
+    return content, size, boxes
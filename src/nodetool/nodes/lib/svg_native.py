@@ -0,0 +1,503 @@
+"""
+Native rasterizer for documents made only of primitive shapes.
+
+Documents built from the rect, circle, ellipse, line and polygon nodes, and the
+straight-line paths the optimizer merges them into, don't need cairosvg's XML
+parsing, CSS resolution and cairo surface setup. Each shape is converted to
+polygon rings in output pixels and filled with a vectorized nonzero scanline
+pass over SAMPLE_ROWS rows per pixel, one band of rows at a time, then
+composited over the canvas within the shape's bounding box. Rects are covered
+exactly and circles from the distance to their center.
+
+primitive_shapes returns None for anything it can't draw like
+cairosvg, such as transforms, rounded rects, curves, joins and caps other than
+butt, gradients and filters, and callers fall back to cairosvg.
+"""
+
+import math
+import re
+
+import numpy as np
+import PIL.ImageColor
+
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_serialize import Content
+
+# Sample rows per pixel. Spans along each row are covered exactly.
+SAMPLE_ROWS = 16
+# Number of samples computed per band
+CHUNK_SAMPLES = 1 << 22
+# Largest distance in pixels between a circle and its polygon
+FLATNESS = 0.01
+# Largest total bounding box area in pixels drawn natively. Blending in NumPy
+# costs more per pixel than cairo, which wins for large areas of overdraw.
+MAX_PAINTED_PIXELS = 1 << 23
+
+_ATTRIBUTES = {
+    "rect": {"x", "y", "width", "height"},
+    "circle": {"cx", "cy", "r"},
+    "ellipse": {"cx", "cy", "rx", "ry"},
+    "line": {"x1", "y1", "x2", "y2"},
+    "polygon": {"points"},
+    "path": {"d"},
+}
+_PAINT = {
+    "fill",
+    "fill-opacity",
+    "fill-rule",
+    "stroke",
+    "stroke-width",
+    "stroke-opacity",
+    "opacity",
+}
+# Attributes that don't affect painting, such as ids set for animation tracks
+_IGNORED = {"id"}
+_PATH_TOKEN = re.compile(r"([MmLlHhVvZz])|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)")
+
+# A shape is a list of rings, each an (n, 2) array of user coordinates
+Rings = list[np.ndarray]
+# A paint operation: its kind, rings, RGBA color with alpha in [0, 1] and
+# whether the even-odd rule applies. BOXES are axis-aligned rects, the first
+# painted and the others cut out of it. DISCS are (center, (outer, inner))
+# rings of circles, where an inner radius of 0 fills the circle.
+Operation = tuple[str, Rings, tuple[int, int, int, float], bool]
+POLYGONS, BOXES, DISCS = "polygons", "boxes", "discs"
+# Smallest radius in pixels drawn as a disc rather than a polygon
+MIN_DISC_RADIUS = 2.0
+
+
+class Unsupported(Exception):
+    pass
+
+
+def _number(attributes: dict[str, str], key: str, default: float = 0.0) -> float:
+    try:
+        value = float(attributes.get(key, default))
+    except ValueError:
+        raise Unsupported(key) from None
+    if not math.isfinite(value):
+        raise Unsupported(key)
+    return value
+
+
+def _paint(attributes: dict[str, str], key: str, default: str):
+    """The solid RGB color of a paint, or None for none."""
+    value = attributes.get(key, default).strip()
+    if value == "none":
+        return None
+    try:
+        color = PIL.ImageColor.getrgb(value)
+    except ValueError:
+        raise Unsupported(key) from None
+    if len(color) == 4:
+        raise Unsupported(key)
+    return color
+
+
+def _angles(radius: float) -> np.ndarray:
+    """Angles that split a circle of radius pixels into chords within FLATNESS."""
+    if radius <= FLATNESS:
+        segments = 8
+    else:
+        segments = math.ceil(math.pi / math.acos(1 - FLATNESS / radius))
+    return np.linspace(0, 2 * math.pi, min(max(segments, 8), 4096), endpoint=False)
+
+
+def _ellipse(cx: float, cy: float, rx: float, ry: float, scale: float) -> np.ndarray:
+    t = _angles(max(rx, ry) * scale)
+    return np.stack([cx + rx * np.cos(t), cy + ry * np.sin(t)], axis=1)
+
+
+def _ellipse_stroke(
+    cx: float, cy: float, rx: float, ry: float, width: float, scale: float
+) -> Rings:
+    half = width / 2
+    if half >= min(rx, ry) ** 2 / max(rx, ry):
+        # The inner offset curve would fold over itself
+        raise Unsupported("stroke-width")
+    t = _angles((max(rx, ry) + half) * scale)
+    center = np.stack([cx + rx * np.cos(t), cy + ry * np.sin(t)], axis=1)
+    normal = np.stack([ry * np.cos(t), rx * np.sin(t)], axis=1)
+    normal /= np.hypot(normal[:, :1], normal[:, 1:])
+    return [center + half * normal, (center - half * normal)[::-1]]
+
+
+def _rect(x: float, y: float, width: float, height: float) -> np.ndarray:
+    return np.array(
+        [[x, y], [x + width, y], [x + width, y + height], [x, y + height]], float
+    )
+
+
+def _segment(start, end, width: float) -> np.ndarray | None:
+    (x1, y1), (x2, y2) = start, end
+    length = math.hypot(x2 - x1, y2 - y1)
+    if length == 0:
+        return None
+    nx, ny = (y1 - y2) / length * width / 2, (x2 - x1) / length * width / 2
+    return np.array(
+        [[x1 + nx, y1 + ny], [x2 + nx, y2 + ny], [x2 - nx, y2 - ny], [x1 - nx, y1 - ny]]
+    )
+
+
+def _subpaths(d: str) -> list[list[tuple[float, float]]]:
+    """Parse path data made of straight lines into lists of points."""
+    tokens = _PATH_TOKEN.findall(d)
+    if "".join(c or n for c, n in tokens) != re.sub(r"[\s,]", "", d):
+        raise Unsupported("d")
+    subpaths: list[list[tuple[float, float]]] = []
+    x = y = 0.0
+    command = ""
+    index = 0
+    closed = False
+
+    def take():
+        nonlocal index
+        if index >= len(tokens) or tokens[index][0]:
+            raise Unsupported("d")
+        index += 1
+        return float(tokens[index - 1][1])
+
+    while index < len(tokens):
+        if tokens[index][0]:
+            command = tokens[index][0]
+            index += 1
+            if command in "Zz":
+                if subpaths:
+                    x, y = subpaths[-1][0]
+                    closed = True
+                continue
+        elif not command or command in "Zz":
+            raise Unsupported("d")
+        relative = command.islower()
+        kind = command.upper()
+        if kind in "ML":
+            dx, dy = take(), take()
+            x, y = (x + dx, y + dy) if relative else (dx, dy)
+            if kind == "M":
+                subpaths.append([])
+                closed = False
+                # Further pairs after a moveto are linetos
+                command = "l" if relative else "L"
+        elif kind == "H":
+            value = take()
+            x = x + value if relative else value
+        else:
+            value = take()
+            y = y + value if relative else value
+        if not subpaths:
+            raise Unsupported("d")
+        if closed:
+            # Drawing after a closepath starts a new subpath at its start
+            subpaths.append([subpaths[-1][0]])
+            closed = False
+        subpaths[-1].append((x, y))
+    return subpaths
+
+
+def _operations(element: SVGElement, scale: float) -> list[Operation]:
+    name, attributes = element.name, element.attributes
+    if name not in _ATTRIBUTES or element.children or element.content:
+        raise Unsupported(name)
+    unknown = set(attributes) - _ATTRIBUTES[name] - _PAINT - _IGNORED
+    if unknown:
+        raise Unsupported(", ".join(sorted(unknown)))
+
+    fill = None if name == "line" else _paint(attributes, "fill", "#000000")
+    stroke = _paint(attributes, "stroke", "none")
+    stroke_width = _number(attributes, "stroke-width", 1)
+    if stroke_width <= 0:
+        stroke = None
+    opacity = _number(attributes, "opacity", 1)
+    if fill is not None and stroke is not None and opacity != 1:
+        # Group opacity over overlapping fill and stroke
+        raise Unsupported("opacity")
+    rule = attributes.get("fill-rule", "nonzero").strip()
+    if rule not in ("nonzero", "evenodd"):
+        raise Unsupported("fill-rule")
+
+    kind = POLYGONS
+    fills: Rings = []
+    strokes: Rings = []
+    if name == "rect":
+        kind = BOXES
+        x, y = _number(attributes, "x"), _number(attributes, "y")
+        width, height = _number(attributes, "width"), _number(attributes, "height")
+        if width <= 0 or height <= 0:
+            return []
+        fills = [_rect(x, y, width, height)]
+        if stroke is not None:
+            half = stroke_width / 2
+            strokes = [_rect(x - half, y - half, width + 2 * half, height + 2 * half)]
+            if width > stroke_width and height > stroke_width:
+                inner = _rect(x + half, y + half, width - 2 * half, height - 2 * half)
+                strokes.append(inner[::-1])
+    elif name in ("circle", "ellipse"):
+        cx, cy = _number(attributes, "cx"), _number(attributes, "cy")
+        if name == "circle":
+            rx = ry = _number(attributes, "r")
+        else:
+            rx, ry = _number(attributes, "rx"), _number(attributes, "ry")
+        if rx <= 0 or ry <= 0:
+            return []
+        if name == "circle" and rx * scale >= MIN_DISC_RADIUS:
+            # Coverage of circles is computed from the distance to the center
+            kind = DISCS
+            half = stroke_width / 2
+            fills = [np.array([[cx, cy], [rx, 0]])]
+            strokes = [np.array([[cx, cy], [rx + half, max(rx - half, 0)]])]
+        else:
+            fills = [_ellipse(cx, cy, rx, ry, scale)]
+            if stroke is not None:
+                strokes = _ellipse_stroke(cx, cy, rx, ry, stroke_width, scale)
+    elif name == "line":
+        start = (_number(attributes, "x1"), _number(attributes, "y1"))
+        end = (_number(attributes, "x2"), _number(attributes, "y2"))
+        quad = _segment(start, end, stroke_width)
+        strokes = [quad] if quad is not None else []
+    else:
+        if name == "polygon":
+            try:
+                values = [
+                    float(v) for v in attributes["points"].replace(",", " ").split()
+                ]
+            except (KeyError, ValueError):
+                raise Unsupported("points") from None
+            if len(values) % 2:
+                raise Unsupported("points")
+            subpaths = [list(zip(values[::2], values[1::2]))]
+            if stroke is not None:
+                raise Unsupported("stroke")
+        else:
+            d = attributes.get("d", "")
+            subpaths = _subpaths(d)
+            if stroke is not None:
+                if "z" in d.lower():
+                    raise Unsupported("stroke")
+                # Only single segments, which have no joins, are stroked
+                for points in subpaths:
+                    if len(points) != 2:
+                        raise Unsupported("stroke")
+                    quad = _segment(points[0], points[1], stroke_width)
+                    if quad is not None:
+                        strokes.append(quad)
+        fills = [np.array(points, float) for points in subpaths if len(points) > 2]
+
+    operations: list[Operation] = []
+    if fill is not None and fills:
+        alpha = opacity * _number(attributes, "fill-opacity", 1)
+        operations.append((kind, fills, (*fill, alpha), rule == "evenodd"))
+    if stroke is not None and strokes:
+        alpha = opacity * _number(attributes, "stroke-opacity", 1)
+        operations.append((kind, strokes, (*stroke, alpha), False))
+    return operations
+
+
+def primitive_shapes(content: Content, scale: float = 1) -> list[Operation] | None:
+    """
+    Convert content to paint operations, or return None if it contains
+    anything other than primitive shapes with solid paint. scale is the size
+    of a user unit in output pixels, which sets how finely circles are split.
+    """
+    items = content if isinstance(content, list) else [content]
+    operations = []
+    try:
+        for item in items:
+            if not isinstance(item, SVGElement):
+                return None
+            operations.extend(_operations(item, scale))
+    except Unsupported:
+        return None
+    return operations
+
+
+def _coverage(
+    rings: list[np.ndarray],
+    evenodd: bool,
+    top: int,
+    bottom: int,
+    left: int,
+    right: int,
+) -> np.ndarray:
+    """
+    Compute the fraction of each pixel of a box inside the rings, sampling
+    SAMPLE_ROWS rows per pixel and covering each row's spans exactly.
+    """
+    ss = SAMPLE_ROWS
+    rows, columns = (bottom - top) * ss, right - left
+    starts = np.concatenate(rings)
+    ends = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+    x0, y0 = starts[:, 0] - left, (starts[:, 1] - top) * ss
+    x1, y1 = ends[:, 0] - left, (ends[:, 1] - top) * ss
+    direction = np.where(y1 > y0, 1, -1)
+    # Edges cross the sample rows whose centers lie in [min y, max y)
+    first = np.clip(np.ceil(np.minimum(y0, y1) - 0.5), 0, rows).astype(np.intp)
+    last = np.clip(np.ceil(np.maximum(y0, y1) - 0.5), 0, rows).astype(np.intp)
+    counts = last - first
+    edge = np.repeat(np.arange(len(counts)), counts)
+    row = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    row += first[edge]
+    y = row + 0.5
+    x = x0[edge] + (y - y0[edge]) * (x1[edge] - x0[edge]) / (y1[edge] - y0[edge])
+
+    order = np.lexsort((x, row))
+    row, x, winding = row[order], x[order], direction[edge][order]
+    # Windings sum to zero over each row, so a running sum is per row
+    winding = np.cumsum(winding)
+    inside = winding % 2 == 1 if evenodd else winding != 0
+    span = np.flatnonzero(inside[:-1])
+
+    # A span [a, b) covers pixel p by h(a) - h(b), where h(e) is the part of p
+    # right of e: 0 left of e, 1 - frac(e) at floor(e) and 1 right of it.
+    # Steps are summed per pixel row and accumulated along it, then the
+    # partially covered pixels are added on top.
+    ends = np.clip(np.concatenate([x[span], x[span + 1]]), 0, columns)
+    weight = np.repeat(np.array([1 / ss, -1 / ss]), len(span))
+    pixel = np.minimum(np.floor(ends), columns - 1)
+    index = np.tile(row[span] // ss, 2) * (columns + 1) + pixel.astype(np.intp)
+    size = (bottom - top) * (columns + 1)
+    steps = np.bincount(index + 1, weight, size).reshape(-1, columns + 1)
+    partial = np.bincount(index, weight * (pixel + 1 - ends), size)
+    cover = np.cumsum(steps, axis=1)
+    cover += partial.reshape(-1, columns + 1)
+    return cover[:, :columns].astype(np.float32)
+
+
+def _box_coverage(
+    boxes: list[tuple[float, float, float, float, int]],
+    top: int,
+    bottom: int,
+    left: int,
+    right: int,
+) -> np.ndarray:
+    """Exact coverage of axis-aligned boxes, added or cut out by their sign."""
+    coverage = np.zeros((bottom - top, right - left), dtype=np.float32)
+    xs = np.arange(left, right, dtype=np.float32)
+    ys = np.arange(top, bottom, dtype=np.float32)
+    for x0, y0, x1, y1, sign in boxes:
+        columns = np.clip(np.minimum(xs + 1, x1) - np.maximum(xs, x0), 0, 1)
+        rows = np.clip(np.minimum(ys + 1, y1) - np.maximum(ys, y0), 0, 1)
+        coverage += sign * rows[:, None] * columns[None, :]
+    return coverage
+
+
+def _disc_coverage(
+    center: np.ndarray,
+    radii: np.ndarray,
+    top: int,
+    bottom: int,
+    left: int,
+    right: int,
+) -> np.ndarray:
+    """Coverage of a circle or circular ring from the distance to its center."""
+    xs = np.arange(left, right, dtype=np.float32) + np.float32(0.5 - center[0])
+    ys = np.arange(top, bottom, dtype=np.float32) + np.float32(0.5 - center[1])
+    distance = np.hypot(xs[None, :], ys[:, None])
+    outer, inner = radii
+    coverage = np.clip(np.float32(outer + 0.5) - distance, 0, 1)
+    if inner > 0:
+        coverage -= np.clip(np.float32(inner + 0.5) - distance, 0, 1)
+    return coverage
+
+
+def _div255(values: np.ndarray) -> np.ndarray:
+    """Divide uint16 values by 255 with rounding, in place."""
+    values += 128
+    values += values >> 8
+    values >>= 8
+    return values
+
+
+def _composite(region: np.ndarray, coverage: np.ndarray, color) -> None:
+    """Composite a solid color through pixel coverage over premultiplied BGRA."""
+    *rgb, alpha = color
+    source_alpha = np.rint(np.clip(coverage, 0, 1) * (alpha * 255)).astype(np.uint16)
+    paint = np.array([rgb[2], rgb[1], rgb[0], 255], np.uint16)
+    result = _div255(source_alpha[..., None] * paint)
+    result += _div255(region * (255 - source_alpha)[..., None])
+    np.minimum(result, 255, out=result)
+    region[...] = result
+
+
+def render_shapes(
+    operations: list[Operation],
+    width: int,
+    height: int,
+    view_box: tuple[float, float, float, float],
+) -> np.ndarray:
+    """
+    Paint operations onto a transparent width x height canvas, mapping the
+    view box like the default preserveAspectRatio of xMidYMid meet. The
+    canvas is premultiplied BGRA, the layout of a cairo ARGB32 surface, and
+    colors are blended in 8 bits like cairo blends them.
+    """
+    vx, vy, vw, vh = view_box
+    s = min(width / vw, height / vh)
+    offset = np.array([(width - vw * s) / 2 - vx * s, (height - vh * s) / 2 - vy * s])
+    canvas = np.zeros((height, width, 4), dtype=np.uint8)
+    for kind, rings, color, evenodd in operations:
+        if color[3] <= 0:
+            continue
+        if kind == DISCS:
+            (cx, cy), radii = rings[0]
+            center = np.array([cx, cy]) * s + offset
+            radii = radii * s
+            points = np.array([center - radii[0] - 1, center + radii[0] + 1])
+        else:
+            rings = [ring * s + offset for ring in rings if len(ring) > 1]
+            if not rings:
+                continue
+            points = np.concatenate(rings)
+        left = max(math.floor(points[:, 0].min()), 0)
+        right = min(math.ceil(points[:, 0].max()), width)
+        top = max(math.floor(points[:, 1].min()), 0)
+        bottom = min(math.ceil(points[:, 1].max()), height)
+        if left >= right or top >= bottom:
+            continue
+        region = canvas[top:bottom, left:right]
+        if kind == DISCS:
+            coverage = _disc_coverage(center, radii, top, bottom, left, right)
+            _composite(region, coverage, color)
+        elif kind == BOXES:
+            signed = [
+                (*ring.min(axis=0), *ring.max(axis=0), -1 if index else 1)
+                for index, ring in enumerate(rings)
+            ]
+            coverage = _box_coverage(signed, top, bottom, left, right)
+            _composite(region, coverage, color)
+        else:
+            band = max(1, CHUNK_SAMPLES // ((right - left) * SAMPLE_ROWS))
+            for band_top in range(top, bottom, band):
+                band_bottom = min(band_top + band, bottom)
+                coverage = _coverage(rings, evenodd, band_top, band_bottom, left, right)
+                _composite(canvas[band_top:band_bottom, left:right], coverage, color)
+    return canvas
+
+
+def render_primitives(
+    content: Content,
+    width: int,
+    height: int,
+    view_box: tuple[float, float, float, float],
+) -> np.ndarray | None:
+    """
+    Render primitive-only content to a width x height premultiplied BGRA
+    array, or return None if it needs cairosvg or covers more than
+    MAX_PAINTED_PIXELS.
+    """
+    _, _, vw, vh = view_box
+    s = min(width / vw, height / vh)
+    operations = primitive_shapes(content, s)
+    if operations is None:
+        return None
+    area = 0.0
+    for kind, rings, _, _ in operations:
+        if kind == DISCS:
+            extent = np.full(2, 2 * rings[0][1, 0])
+        else:
+            points = np.concatenate(rings)
+            extent = points.max(axis=0) - points.min(axis=0)
+        extent = np.minimum(extent, (vw, vh))
+        area += extent[0] * extent[1] * s * s
+    if area > MAX_PAINTED_PIXELS:
+        return None
+    return render_shapes(operations, width, height, view_box)
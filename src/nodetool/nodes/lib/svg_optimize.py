@@ -0,0 +1,360 @@
+"""
+Optimization pass over SVGElement trees before serialization.
+
+Documents built from the SVG nodes repeat identical filter definitions, carry
+presentation attributes that restate inherited or initial values and contain
+long runs of single-shape elements. optimize_content returns an equivalent content
+list that is smaller to serialize and cheaper for cairosvg to parse and draw:
+
+- definitions (filters, gradients, clip paths, ...) with identical content are
+  emitted once and references to dropped ids are rewritten
+- identity transforms and attributes equal to the inherited value are removed
+- adjacent rects, lines and paths that paint identically are merged into one
+  path, and attribute-less groups are unwrapped
+
+Input elements are never modified. Raw markup strings and stylesheets can
+change inheritance in ways the pass can't see, so with either present only
+identity transforms are collapsed.
+"""
+
+import math
+import re
+
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_serialize import Content, write_element
+
+DEFINITIONS = {
+    "clipPath",
+    "filter",
+    "linearGradient",
+    "marker",
+    "mask",
+    "pattern",
+    "radialGradient",
+    "symbol",
+}
+
+# Initial values of inherited properties. None marks a value the pass can't
+# know, such as inside definitions that inherit from where they are used.
+INITIAL_STATE = {
+    "fill": "#000000",
+    "fill-opacity": "1",
+    "fill-rule": "nonzero",
+    "stroke": "none",
+    "stroke-dasharray": "none",
+    "stroke-dashoffset": "0",
+    "stroke-linecap": "butt",
+    "stroke-linejoin": "miter",
+    "stroke-miterlimit": "4",
+    "stroke-opacity": "1",
+    "stroke-width": "1",
+}
+UNKNOWN_STATE = dict.fromkeys(INITIAL_STATE)
+
+# Defaults of properties that are not inherited
+_NOT_INHERITED = {"opacity": "1"}
+_STROKE_PROPERTIES = [key for key in INITIAL_STATE if key.startswith("stroke-")]
+_COLOR_ALIASES = {"black": "#000000", "#000": "#000000", "white": "#ffffff"}
+
+_GEOMETRY = {
+    "rect": ("x", "y", "width", "height"),
+    "line": ("x1", "y1", "x2", "y2"),
+    "path": ("d",),
+}
+# Attributes that make an element paint on its own or be referenced
+_UNMERGEABLE = (
+    "id",
+    "class",
+    "style",
+    "opacity",
+    "filter",
+    "mask",
+    "clip-path",
+    "marker-start",
+    "marker-mid",
+    "marker-end",
+    "rx",
+    "ry",
+    "pathLength",
+)
+
+_TRANSFORM = re.compile(r"\s*([a-zA-Z]+)\s*\(([^)]*)\)\s*,?")
+_REFERENCE = re.compile(r"url\(\s*#([^)\s]+)\s*\)")
+
+
+def _same(value: str, other: str | None) -> bool:
+    if other is None:
+        return False
+    value, other = value.strip().lower(), other.strip().lower()
+    value = _COLOR_ALIASES.get(value, value)
+    other = _COLOR_ALIASES.get(other, other)
+    if value == other:
+        return True
+    try:
+        return float(value) == float(other)
+    except ValueError:
+        return False
+
+
+def _is_identity(function: str, values: list[float]) -> bool:
+    if function == "translate":
+        return all(v == 0 for v in values)
+    if function == "scale":
+        return all(v == 1 for v in values)
+    if function in ("rotate", "skewX", "skewY"):
+        return bool(values) and values[0] % 360 == 0
+    if function == "matrix":
+        return values == [1, 0, 0, 1, 0, 0]
+    return False
+
+
+def collapse_transform(transform: str) -> str:
+    """Remove identity functions from a transform list."""
+    kept = []
+    end = 0
+    for match in _TRANSFORM.finditer(transform):
+        if match.start() != end:
+            return transform
+        end = match.end()
+        function, arguments = match.groups()
+        try:
+            values = [float(v) for v in arguments.replace(",", " ").split()]
+        except ValueError:
+            return transform
+        if not _is_identity(function, values):
+            kept.append(match.group(0).strip().rstrip(",").strip())
+    if end != len(transform):
+        return transform
+    return " ".join(kept)
+
+
+def _number(value: float) -> str:
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _path_data(element: SVGElement) -> str | None:
+    attributes = element.attributes
+    if element.name == "path":
+        d = attributes.get("d", "").strip()
+        # A leading relative moveto would become relative to the previous
+        # subpath once concatenated
+        return d if d[:1] == "M" else None
+    try:
+        values = [float(attributes.get(key, "0")) for key in _GEOMETRY[element.name]]
+    except ValueError:
+        return None
+    if not all(math.isfinite(v) for v in values):
+        return None
+    if element.name == "rect":
+        x, y, width, height = values
+        if width <= 0 or height <= 0:
+            return None
+        return (
+            f"M{_number(x)},{_number(y)}h{_number(width)}"
+            f"v{_number(height)}h{_number(-width)}z"
+        )
+    x1, y1, x2, y2 = values
+    return f"M{_number(x1)},{_number(y1)}L{_number(x2)},{_number(y2)}"
+
+
+def _paints(value: str | None) -> bool | None:
+    """Whether a paint is a solid color, False for none, None if unknown."""
+    if value is None or value.strip().startswith("url("):
+        return None
+    return value.strip() != "none"
+
+
+def _merge_key(element: SVGElement, state: dict[str, str | None]):
+    """Key under which adjacent elements paint identically as one path."""
+    if element.name not in _GEOMETRY or element.children or element.content:
+        return None
+    attributes = element.attributes
+    if any(key in attributes for key in _UNMERGEABLE):
+        return None
+    effective = {**state, **{k: v for k, v in attributes.items() if k in state}}
+    fill = False if element.name == "line" else _paints(effective["fill"])
+    stroke = _paints(effective["stroke"])
+    if fill is None or stroke is None:
+        return None
+    if fill:
+        # Filled rects all wind clockwise, so their union is the same under
+        # nonzero. Strokes would be painted after all fills, so they must be off.
+        if element.name != "rect" or stroke:
+            return None
+        if not _same("1", effective["fill-opacity"]):
+            return None
+        if not _same("nonzero", effective["fill-rule"]):
+            return None
+    elif stroke:
+        # Overlapping strokes must not blend, and dashes restart per subpath
+        if not _same("1", effective["stroke-opacity"]):
+            return None
+        if not _same("none", effective["stroke-dasharray"]):
+            return None
+    geometry = _GEOMETRY[element.name]
+    rest = {k: v for k, v in attributes.items() if k not in geometry}
+    if element.name == "line":
+        rest = {k: v for k, v in rest.items() if not k.startswith("fill")}
+    return element.name == "line", tuple(sorted(rest.items()))
+
+
+def _merge(items: list, state: dict[str, str | None]) -> list:
+    merged = []
+    run: list[tuple[SVGElement, str]] = []
+    run_key = None
+
+    def flush():
+        if len(run) == 1:
+            merged.append(run[0][0])
+        elif run:
+            has_lines, rest = run_key
+            attributes = dict(rest)
+            if has_lines:
+                attributes["fill"] = "none"
+            attributes["d"] = " ".join(d for _, d in run)
+            merged.append(SVGElement(name="path", attributes=attributes))
+        run.clear()
+
+    for item in items:
+        key = _merge_key(item, state) if isinstance(item, SVGElement) else None
+        d = _path_data(item) if key is not None else None
+        if d is None:
+            flush()
+            merged.append(item)
+            run_key = None
+            continue
+        if key != run_key:
+            flush()
+            run_key = key
+        run.append((item, d))
+    flush()
+    return merged
+
+
+def _signature(element: SVGElement) -> str:
+    parts: list[str] = []
+    attributes = {k: v for k, v in element.attributes.items() if k != "id"}
+    write_element(parts, element.model_copy(update={"attributes": attributes}))
+    return "".join(parts)
+
+
+def _walk(items):
+    for item in items:
+        if isinstance(item, SVGElement):
+            yield item
+            yield from _walk(item.children)
+
+
+class _Optimizer:
+    def __init__(self, items: list, restricted: bool):
+        self.restricted = restricted
+        self.aliases: dict[str, str] = {}
+        self.emitted: set[str] = set()
+        self.ambiguous: set[str] = set()
+        if restricted:
+            return
+        signatures: dict[str, str] = {}
+        canonical: dict[str, str] = {}
+        for element in _walk(items):
+            ref = element.attributes.get("id")
+            if element.name not in DEFINITIONS or not ref:
+                continue
+            signature = _signature(element)
+            if signatures.setdefault(ref, signature) != signature:
+                # Conflicting definitions share an id; leave them alone
+                self.ambiguous.add(ref)
+            canonical.setdefault(signature, ref)
+        for ref, signature in signatures.items():
+            target = canonical[signature]
+            if ref != target and not {ref, target} & self.ambiguous:
+                self.aliases[ref] = target
+
+    def _rewrite(self, key: str, value: str) -> str:
+        if not self.aliases:
+            return value
+        if key in ("href", "xlink:href"):
+            if value.startswith("#") and value[1:] in self.aliases:
+                return "#" + self.aliases[value[1:]]
+            return value
+        return _REFERENCE.sub(
+            lambda m: f"url(#{self.aliases.get(m.group(1), m.group(1))})", value
+        )
+
+    def items(self, items: list, state: dict[str, str | None]) -> list:
+        output = []
+        for item in items:
+            if not isinstance(item, SVGElement):
+                output.append(item)
+                continue
+            element = self.element(item, state)
+            if element is None:
+                continue
+            if element.name == "g" and not element.attributes and not self.restricted:
+                output.extend(element.children)
+            else:
+                output.append(element)
+        if self.restricted:
+            return output
+        return _merge(output, state)
+
+    def element(
+        self, element: SVGElement, state: dict[str, str | None]
+    ) -> SVGElement | None:
+        attributes = dict(element.attributes)
+        if "transform" in attributes:
+            attributes["transform"] = collapse_transform(attributes["transform"])
+            if not attributes["transform"]:
+                del attributes["transform"]
+        if self.restricted:
+            children = self.items(element.children, state)
+            return element.model_copy(
+                update={"attributes": attributes, "children": children}
+            )
+
+        ref = attributes.get("id")
+        if element.name in DEFINITIONS and ref and ref not in self.ambiguous:
+            if ref in self.aliases or ref in self.emitted:
+                return None
+            self.emitted.add(ref)
+
+        attributes = {key: self._rewrite(key, v) for key, v in attributes.items()}
+        for key, default in _NOT_INHERITED.items():
+            if key in attributes and _same(default, attributes[key]):
+                del attributes[key]
+        # Elements with an id can be drawn through <use>, where they inherit
+        # from the use site instead of their parent
+        if not ref and element.name not in DEFINITIONS:
+            for key, inherited in state.items():
+                if key in attributes and _same(attributes[key], inherited):
+                    del attributes[key]
+
+        if "style" in attributes or ref or element.name in DEFINITIONS:
+            # Definitions inherit from where they are used, and styles and
+            # referenced elements can't be reasoned about
+            child_state = UNKNOWN_STATE
+        else:
+            child_state = {
+                **state,
+                **{k: v for k, v in attributes.items() if k in state},
+            }
+        children = self.items(element.children, child_state)
+        if not children and child_state["stroke"] == "none":
+            # Stroke properties of an element that isn't stroked are no-ops
+            for key in _STROKE_PROPERTIES:
+                attributes.pop(key, None)
+        if element.name == "defs" and not children:
+            return None
+        return element.model_copy(
+            update={"attributes": attributes, "children": children}
+        )
+
+
+def optimize_content(content: Content) -> list[str | SVGElement]:
+    """Return an optimized copy of document content."""
+    items = content if isinstance(content, list) else [content]
+    restricted = any(not isinstance(item, SVGElement) for item in items) or any(
+        element.name == "style" for element in _walk(items)
+    )
+    optimizer = _Optimizer(items, restricted)
+    return optimizer.items(items, INITIAL_STATE)
@@ -0,0 +1,464 @@
+"""
+SVG rasterization helpers shared by the SVG nodes.
+
+Rendered images are kept in a bounded, process-wide cache keyed by a hash of
+the serialized document and the output size and scale, so repeated icons and
+badges in templated workflows are rasterized once. The cache has an in-memory
+LRU tier bounded by decoded pixel bytes and an optional on-disk tier of PNG
+files shared between processes.
+
+Configure it with environment variables:
+
+- ``NODETOOL_SVG_CACHE_BYTES``: memory budget, 256 MB by default, 0 disables
+- ``NODETOOL_SVG_CACHE_DIR``: directory of the on-disk tier, unset disables
+- ``NODETOOL_SVG_WORKERS``: processes of the pool shared by batch and tiled
+  rendering, up to 4 by default. The memory budget is split between them
+
+Documents made only of primitive shapes are drawn without cairosvg, see
+svg_native. Very large outputs can be rendered in tiles, see rasterize_tiled.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import string
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import numpy as np
+import PIL.Image
+
+from nodetool.nodes.lib.svg_native import render_primitives
+from nodetool.nodes.lib.svg_serialize import (
+    DOCUMENT_FOOTER,
+    Content,
+    document_header,
+    write_content,
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, str(default)))
+    except ValueError:
+        return default
+
+
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+DEFAULT_WORKERS = max(_env_int("NODETOOL_SVG_WORKERS", 0), 0) or min(
+    4, os.cpu_count() or 1
+)
+# Pixels each tile overlaps its neighbours by when rendering in tiles
+TILE_MARGIN = 16
+
+_ATTRIBUTE_ENTITIES = {'"': "&quot;", "'": "&apos;"}
+
+
+def cache_key(svg: bytes, width: int, height: int, scale: float) -> str:
+    digest = hashlib.sha256(svg)
+    digest.update(f"|{width}x{height}@{scale}".encode())
+    return digest.hexdigest()
+
+
+def _image_bytes(image: PIL.Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+class RasterCache:
+    """
+    Bounded LRU cache of rasterized SVG documents.
+
+    Cached images are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self._images: OrderedDict[str, PIL.Image.Image] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / key[:2] / f"{key}.png"
+
+    def get(self, key: str) -> PIL.Image.Image | None:
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                image = PIL.Image.open(path)
+                image.load()
+            except (OSError, ValueError):
+                pass
+            else:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, image)
+                return image
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, image: PIL.Image.Image, png: bytes | None = None):
+        """
+        Store a rendered image. png, if given, is written to the on-disk tier
+        as is, otherwise the image is encoded.
+        """
+        self._remember(key, image)
+        if self.directory is None:
+            return
+        if png is None:
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", compress_level=1)
+            png = buffer.getvalue()
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write atomically, so concurrent processes never read partial files
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(png)
+        os.replace(tmp, path)
+
+    def _remember(self, key: str, image: PIL.Image.Image):
+        size = _image_bytes(image)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._images:
+                self._size -= _image_bytes(self._images.pop(key))
+            self._images[key] = image
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._size -= _image_bytes(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop the in-memory tier and reset the metrics."""
+        with self._lock:
+            self._images.clear()
+            self._size = 0
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._images),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+raster_cache = RasterCache(
+    _env_int("NODETOOL_SVG_CACHE_BYTES", DEFAULT_CACHE_BYTES),
+    os.environ.get("NODETOOL_SVG_CACHE_DIR") or None,
+)
+
+
+def _unpremultiply_table() -> np.ndarray:
+    # table[alpha << 8 | value] == round(value * 255 / alpha), like cairo's
+    # own PNG writer computes it
+    alpha = np.arange(256, dtype=np.uint32)[:, None]
+    value = np.arange(256, dtype=np.uint32)[None, :]
+    with np.errstate(divide="ignore"):
+        table = (value * 255 + alpha // 2) // np.maximum(alpha, 1)
+    table[0] = 0
+    return np.minimum(table, 255).astype(np.uint8).ravel()
+
+
+_UNPREMULTIPLY = _unpremultiply_table()
+
+
+def unpremultiply_bgra(pixels: np.ndarray) -> np.ndarray:
+    """
+    Convert premultiplied BGRA pixels, the memory layout of cairo's ARGB32
+    surfaces on little-endian machines, to straight RGBA.
+    """
+    output = np.empty(pixels.shape, dtype=np.uint8)
+    alpha = pixels[..., 3]
+    output[..., 3] = alpha
+    if alpha.min() == 255:
+        # Opaque pixels need no division
+        output[..., :3] = pixels[..., 2::-1]
+        return output
+    index = alpha.astype(np.uint16) << 8
+    for target, source in ((0, 2), (1, 1), (2, 0)):
+        np.take(_UNPREMULTIPLY, index | pixels[..., source], out=output[..., target])
+    return output
+
+
+def render_pixels(svg: bytes, width: int, height: int) -> np.ndarray:
+    """
+    Render an SVG document into an in-memory cairo surface of width x height
+    pixels and return its pixels as straight RGBA, without encoding a PNG.
+    """
+    from cairosvg.parser import Tree
+    from cairosvg.surface import PNGSurface
+
+    surface = PNGSurface(
+        Tree(bytestring=svg), None, 96, output_width=width, output_height=height
+    )
+    cairo_surface = surface.cairo
+    cairo_surface.flush()
+    stride = cairo_surface.get_stride()
+    surface_height = cairo_surface.get_height()
+    # View the surface memory in place; rows may be padded to the stride
+    buffer = np.frombuffer(
+        cairo_surface.get_data(), dtype=np.uint8, count=stride * surface_height
+    )
+    pixels = buffer.reshape(surface_height, stride // 4, 4)
+    pixels = unpremultiply_bgra(pixels[:, : cairo_surface.get_width()])
+    surface.finish()
+    return pixels
+
+
+def rasterize(
+    svg: bytes,
+    width: int,
+    height: int,
+    scale: float = 1,
+    content: Content | None = None,
+    view_box: str | None = None,
+    cache: bool = True,
+) -> PIL.Image.Image:
+    """
+    Rasterize an SVG document with cairosvg to width x height pixels times
+    scale, using the raster cache unless cache is False.
+    If the content and viewBox the document was serialized from are given and
+    the content is made of primitive shapes only, it is drawn natively instead.
+    The returned image may be shared and must not be modified.
+    """
+    if cache:
+        key = cache_key(svg, width, height, scale)
+        image = raster_cache.get(key)
+        if image is not None:
+            return image
+
+    size = round(width * scale), round(height * scale)
+    surface = None
+    if content is not None and view_box is not None:
+        try:
+            surface = render_primitives(content, *size, parse_view_box(view_box))
+        except ValueError:
+            pass
+    if surface is not None:
+        pixels = unpremultiply_bgra(surface)
+    else:
+        pixels = render_pixels(svg, *size)
+    image = PIL.Image.fromarray(pixels)
+    if cache:
+        raster_cache.put(key, image)
+    return image
+
+
+def parse_view_box(view_box: str) -> tuple[float, float, float, float]:
+    try:
+        x, y, width, height = (float(v) for v in view_box.replace(",", " ").split())
+    except ValueError:
+        raise ValueError(f"Invalid viewBox: {view_box!r}") from None
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Invalid viewBox: {view_box!r}")
+    return x, y, width, height
+
+
+def tile_windows(
+    view_box: str,
+    width: int,
+    height: int,
+    tile_size: int,
+    margin: int = TILE_MARGIN,
+) -> list[tuple[tuple[int, int, int, int], tuple[int, int, int, int], str]]:
+    """
+    Split a width x height output into tiles of at most tile_size pixels.
+
+    Returns (box, render_box, window) per tile: the output box the tile
+    fills, the larger box it is rendered at, which overlaps its neighbours by
+    margin pixels so blurs and strokes near the seams see their surroundings,
+    and the viewBox of the document that renders render_box. The viewBox is
+    mapped like the default preserveAspectRatio of xMidYMid meet.
+    """
+    vx, vy, vw, vh = parse_view_box(view_box)
+    s = min(width / vw, height / vh)
+    ox, oy = (width - vw * s) / 2, (height - vh * s) / 2
+    tiles = []
+    for top in range(0, height, tile_size):
+        bottom = min(top + tile_size, height)
+        for left in range(0, width, tile_size):
+            right = min(left + tile_size, width)
+            rl, rt = max(left - margin, 0), max(top - margin, 0)
+            rr, rb = min(right + margin, width), min(bottom + margin, height)
+            window = (
+                f"{vx + (rl - ox) / s!r} {vy + (rt - oy) / s!r} "
+                f"{(rr - rl) / s!r} {(rb - rt) / s!r}"
+            )
+            tiles.append(((left, top, right, bottom), (rl, rt, rr, rb), window))
+    return tiles
+
+
+def render_tile(svg: bytes, width: int, height: int) -> np.ndarray:
+    """Render one tile document. Runs in tile worker processes, uncached."""
+    return render_pixels(svg, width, height)
+
+
+async def rasterize_tiled(
+    content: Content,
+    width: int,
+    height: int,
+    view_box: str,
+    tile_size: int,
+    workers: int = 0,
+) -> np.ndarray:
+    """
+    Rasterize content to a width x height RGBA array in tiles rendered in
+    parallel worker processes.
+
+    Each tile is the same document body with a viewBox window of its area, so
+    no process ever allocates a surface larger than a tile plus its margins.
+    Tiles are cropped and written straight into the preallocated output.
+    Content sized in percentages of the viewport renders relative to each
+    window, so such documents should be rendered in one pass. At most
+    workers tiles are rendered at once.
+    """
+    parts: list[str] = []
+    write_content(parts, content)
+    body = "".join(parts) + DOCUMENT_FOOTER
+
+    output = np.empty((height, width, 4), dtype=np.uint8)
+    slots = asyncio.Semaphore(workers or DEFAULT_WORKERS)
+
+    async def render(box, render_box, window):
+        left, top, right, bottom = box
+        rl, rt, rr, rb = render_box
+        svg = (document_header(rr - rl, rb - rt, window) + body).encode("utf-8")
+        async with slots:
+            pixels = await run_in_pool(render_tile, svg, rr - rl, rb - rt)
+        # Drop the margins, which only exist to render the seams correctly
+        output[top:bottom, left:right] = pixels[
+            top - rt : bottom - rt, left - rl : right - rl
+        ]
+
+    tasks = [
+        asyncio.ensure_future(render(*tile))
+        for tile in tile_windows(view_box, width, height, tile_size)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        cancel_pending(tasks)
+    return output
+
+
+def fill_template(template: str, binding: dict[str, str]) -> bytes:
+    """
+    Substitute $name placeholders in an SVG template.
+    Values are XML-escaped, so they can be used in text and attributes.
+    """
+    values = {
+        key: escape(str(value), _ATTRIBUTE_ENTITIES) for key, value in binding.items()
+    }
+    try:
+        return string.Template(template).substitute(values).encode("utf-8")
+    except KeyError as e:
+        raise ValueError(f"Missing template variable: {e.args[0]}") from e
+
+
+def render_documents(
+    documents: list[bytes], width: int, height: int, scale: float
+) -> list[np.ndarray]:
+    """Rasterize documents to RGBA arrays. Runs in batch worker processes."""
+    return [np.asarray(rasterize(svg, width, height, scale)) for svg in documents]
+
+
+def render_template(
+    template: str,
+    bindings: list[dict[str, str]],
+    width: int,
+    height: int,
+    scale: float,
+) -> list[np.ndarray]:
+    """
+    Fill and rasterize a template once per binding. Runs in batch worker
+    processes.
+    """
+    return [
+        np.asarray(rasterize(fill_template(template, binding), width, height, scale))
+        for binding in bindings
+    ]
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _initialize_worker(workers: int):
+    # The workers share the memory budget, and a forked worker starts
+    # without the parent's cached images
+    raster_cache.max_bytes //= workers
+    raster_cache.clear()
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool shared by batch and tiled rendering. Each of its
+    processes keeps its own raster cache with an equal share of the memory
+    budget, so the pool is sized once, with NODETOOL_SVG_WORKERS, and nodes
+    limit how many jobs they submit instead.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=DEFAULT_WORKERS,
+                initializer=_initialize_worker,
+                initargs=(DEFAULT_WORKERS,),
+            )
+        return _pool
+
+
+async def run_in_pool(fn, *args):
+    """
+    Run fn in the shared process pool. When a worker dies, e.g. of running
+    out of memory, the broken pool is replaced for later calls.
+    """
+    global _pool
+    pool = process_pool()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def cancel_pending(tasks: list[asyncio.Future]):
+    """Cancel tasks that haven't finished, so queued jobs don't run for nothing."""
+    for task in tasks:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,147 @@
+"""
+Streaming serialization of SVGElement trees.
+
+Elements are appended to one flat list of string parts that is joined once,
+instead of being built from nested f-strings that copy every subtree again at
+each nesting level. An element is written as its start tag with the
+attributes in insertion order, its text content unless it is None, its
+children and its end tag, with no whitespace in between. Top-level items go
+on separate lines of a document with a fixed header.
+
+Callers that serialize the same element objects repeatedly, such as animation
+loops, can pass a FragmentCache. Elements are mutable, so a cached fragment is
+only reused while the element is the same object and its name, attributes,
+content and children still match the state recorded with the fragment.
+"""
+
+import threading
+from collections import OrderedDict
+
+from nodetool.metadata.types import SVGElement
+
+Content = str | SVGElement | list[str | SVGElement]
+
+DEFAULT_FRAGMENTS = 10_000
+
+
+def write_element(parts: list[str], element: SVGElement) -> None:
+    """Append the serialized element and its children to parts."""
+    parts.append(f"<{element.name} ")
+    parts.append(
+        " ".join([f'{key}="{value}"' for key, value in element.attributes.items()])
+    )
+    parts.append(">")
+    if element.content is not None:
+        parts.append(element.content)
+    for child in element.children:
+        write_element(parts, child)
+    parts.append(f"</{element.name}>")
+
+
+def _state(element: SVGElement) -> tuple:
+    return (
+        element.name,
+        dict(element.attributes),
+        element.content,
+        [(child, _state(child)) for child in element.children],
+    )
+
+
+def _unchanged(element: SVGElement, state: tuple) -> bool:
+    name, attributes, content, children = state
+    if (
+        element.name != name
+        or element.attributes != attributes
+        or element.content != content
+        or len(element.children) != len(children)
+    ):
+        return False
+    return all(
+        child is previous and _unchanged(child, child_state)
+        for child, (previous, child_state) in zip(element.children, children)
+    )
+
+
+class FragmentCache:
+    """Bounded LRU cache of serialized elements, keyed by element identity."""
+
+    def __init__(self, max_entries: int = DEFAULT_FRAGMENTS):
+        self.max_entries = max_entries
+        self._fragments: OrderedDict[int, tuple[SVGElement, tuple, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, element: SVGElement) -> str:
+        key = id(element)
+        with self._lock:
+            entry = self._fragments.get(key)
+        # The entry keeps the element alive, so its id can't be reused
+        if entry is not None and entry[0] is element and _unchanged(element, entry[1]):
+            with self._lock:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+            return entry[2]
+
+        parts: list[str] = []
+        write_element(parts, element)
+        text = "".join(parts)
+        with self._lock:
+            self.misses += 1
+            self._fragments[key] = (element, _state(element), text)
+            self._fragments.move_to_end(key)
+            while len(self._fragments) > self.max_entries:
+                self._fragments.popitem(last=False)
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+            self.hits = self.misses = 0
+
+
+def document_header(width: int | float, height: int | float, viewBox: str) -> str:
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<svg xmlns="http://www.w3.org/2000/svg"\n'
+        f'     width="{width}"\n'
+        f'     height="{height}"\n'
+        f'     viewBox="{viewBox}">\n'
+        "    "
+    )
+
+
+DOCUMENT_FOOTER = "\n</svg>"
+
+
+def write_content(
+    parts: list[str], content: Content, fragments: FragmentCache | None = None
+) -> None:
+    """Append the serialized content, one top-level item per line."""
+    items = content if isinstance(content, list) else [content]
+    for index, item in enumerate(items):
+        if index:
+            parts.append("\n")
+        if not isinstance(item, SVGElement):
+            parts.append(str(item))
+        elif fragments is not None:
+            parts.append(fragments.get(item))
+        else:
+            write_element(parts, item)
+
+
+def serialize_document(
+    content: Content,
+    width: int,
+    height: int,
+    viewBox: str,
+    fragments: FragmentCache | None = None,
+) -> bytes:
+    """
+    Serialize content into a complete SVG document, encoded as UTF-8.
+    The result can be passed to cairosvg or stored in an SVGRef as is.
+    """
+    parts = [document_header(width, height, viewBox)]
+    write_content(parts, content, fragments)
+    parts.append(DOCUMENT_FOOTER)
+    return "".join(parts).encode("utf-8")
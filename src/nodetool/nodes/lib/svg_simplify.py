@@ -0,0 +1,276 @@
+"""
+Simplification of polygon points and straight-line path data.
+
+Generated contours often carry far more points than the output resolution
+can show, and cairosvg's render time grows with the point count. Points are
+dropped with the Ramer-Douglas-Peucker algorithm, vectorized over NumPy
+arrays: each pass measures every remaining point against the chord of its
+segment at once and splits all segments whose farthest point is further than
+the tolerance, so the number of Python-level iterations is the recursion
+depth rather than the number of points.
+
+Path data with curves or arcs is left unchanged. simplify_content applies a
+tolerance in output pixels to whole documents; elements whose user units
+don't map to output pixels like the document's, such as transformed
+elements, nested viewports and definitions, are left unchanged.
+"""
+
+import re
+
+import numpy as np
+
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_optimize import DEFINITIONS
+from nodetool.nodes.lib.svg_render import parse_view_box
+from nodetool.nodes.lib.svg_serialize import Content
+
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_NUMBERS = re.compile(_NUMBER)
+_NUMBER_LIST = re.compile(rf"(?:[\s,]*{_NUMBER})*[\s,]*")
+# Any letter but the exponent marker starts a command
+_COMMANDS = re.compile(r"([A-DF-Za-df-z])")
+
+# The command that continues each command when its letter is left out
+_CONTINUATION = {
+    "M": "L",
+    "m": "l",
+    "L": "L",
+    "l": "l",
+    "H": "H",
+    "h": "h",
+    "V": "V",
+    "v": "v",
+}
+
+# Elements whose children are in other user units or are never painted as is
+_OPAQUE = DEFINITIONS | {"defs", "svg"}
+
+
+def simplify_polyline(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Return the points of an (n, 2) polyline that Ramer-Douglas-Peucker keeps.
+    Dropped points are at most tolerance away from the simplified polyline.
+    The first and last points are always kept.
+    """
+    n = len(points)
+    if n < 3:
+        return points
+    keep = np.zeros(n, bool)
+    keep[[0, -1]] = True
+    # done[i] marks the segment starting at kept point i as final
+    done = np.zeros(n, bool)
+    squared = tolerance * tolerance
+    while True:
+        kept = np.flatnonzero(keep)
+        starts, ends = kept[:-1], kept[1:]
+        pending = ~done[starts] & (ends - starts > 1)
+        if not pending.any():
+            break
+        starts, ends = starts[pending], ends[pending]
+
+        # Indices of all interior points of the pending segments, concatenated
+        counts = ends - starts - 1
+        offsets = np.cumsum(counts) - counts
+        segment = np.repeat(np.arange(len(starts)), counts)
+        index = np.arange(counts.sum()) - offsets[segment] + starts[segment] + 1
+
+        a, b = points[starts][segment], points[ends][segment]
+        ab = b - a
+        length = np.einsum("ij,ij->i", ab, ab)
+        t = np.einsum("ij,ij->i", points[index] - a, ab)
+        t = np.clip(np.divide(t, length, out=np.zeros_like(t), where=length > 0), 0, 1)
+        offset = points[index] - (a + t[:, None] * ab)
+        distance = np.einsum("ij,ij->i", offset, offset)
+
+        farthest = np.maximum.reduceat(distance, offsets)
+        split = farthest > squared
+        done[starts[~split]] = True
+        # The first point at the largest distance of each splitting segment
+        hits = np.flatnonzero((distance == farthest[segment]) & split[segment])
+        _, first = np.unique(segment[hits], return_index=True)
+        keep[index[hits[first]]] = True
+    return points[keep]
+
+
+def simplify_ring(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Simplify a closed ring of points given without the closing point."""
+    if len(points) < 4:
+        return points
+    closed = np.concatenate([points, points[:1]])
+    return simplify_polyline(closed, tolerance)[:-1]
+
+
+def _format(points: np.ndarray) -> list[str]:
+    return [f"{x:.10g},{y:.10g}" for x, y in points.tolist()]
+
+
+def _parse_numbers(text: str) -> np.ndarray | None:
+    try:
+        # Numbers separated by whitespace or commas, as generated contours are
+        numbers = np.array(text.replace(",", " ").split(), float)
+        # float also accepts nan, inf and underscores, which SVG doesn't
+        if np.isfinite(numbers).all() and "_" not in text:
+            return numbers
+    except ValueError:
+        pass
+    # Numbers may also run together, as in "1-2.5.5"
+    if not _NUMBER_LIST.fullmatch(text):
+        return None
+    return np.array(_NUMBERS.findall(text), float)
+
+
+def simplify_points(points: str, tolerance: float, closed: bool = True) -> str:
+    """Simplify a points attribute, or return it unchanged if it is malformed."""
+    numbers = _parse_numbers(points)
+    if numbers is None or len(numbers) % 2:
+        return points
+    xy = numbers.reshape(-1, 2)
+    simplified = (
+        simplify_ring(xy, tolerance) if closed else simplify_polyline(xy, tolerance)
+    )
+    if len(simplified) == len(xy):
+        return points
+    return " ".join(_format(simplified))
+
+
+def _subpaths(d: str) -> list[tuple[np.ndarray, bool]] | None:
+    """Parse path data of straight lines into (points, closed) subpaths."""
+    parts = _COMMANDS.split(d)
+    if parts[0].strip():
+        return None
+    # Runs of commands that continue the previous one are parsed together,
+    # so "M0,0 L1,1 L2,2" costs one parse like "M0,0 1,1 2,2"
+    commands: list[tuple[str, list[str]]] = []
+    for command, body in zip(parts[1::2], parts[2::2]):
+        if commands and _CONTINUATION.get(commands[-1][0]) == command:
+            commands[-1][1].append(body)
+        else:
+            commands.append((command, [body]))
+
+    subpaths: list[tuple[list[np.ndarray], list[bool]]] = []
+    current = np.zeros(2)
+    start = current
+    for command, bodies in commands:
+        body = " ".join(bodies)
+        kind = command.upper()
+        if kind not in "MLHVZ":
+            return None
+        numbers = _parse_numbers(body)
+        if numbers is None:
+            return None
+        if kind == "Z":
+            if len(numbers) or not subpaths:
+                return None
+            subpaths[-1][1][0] = True
+            current = start
+            continue
+        if not len(numbers):
+            return None
+        relative = command.islower()
+        if kind in "ML":
+            if len(numbers) % 2:
+                return None
+            points = numbers.reshape(-1, 2)
+            if relative:
+                points = current + np.cumsum(points, axis=0)
+        else:
+            axis = 0 if kind == "H" else 1
+            values = current[axis] + np.cumsum(numbers) if relative else numbers
+            points = np.repeat(current[None], len(values), axis=0)
+            points[:, axis] = values
+        if kind == "M":
+            subpaths.append(([points], [False]))
+            start = points[0]
+        elif not subpaths:
+            return None
+        elif subpaths[-1][1][0]:
+            # Drawing after a closepath starts a new subpath at its start
+            subpaths.append(([start[None], points], [False]))
+        else:
+            subpaths[-1][0].append(points)
+        current = points[-1]
+    return [(np.concatenate(chunks), closed[0]) for chunks, closed in subpaths]
+
+
+def simplify_path_data(d: str, tolerance: float) -> str:
+    """
+    Simplify path data made of M, L, H, V and Z commands. Other path data is
+    returned unchanged.
+    """
+    subpaths = _subpaths(d)
+    if subpaths is None:
+        return d
+    before = sum(len(points) for points, _ in subpaths)
+    parts = []
+    after = 0
+    for points, closed in subpaths:
+        if closed and len(points) > 1 and (points[0] == points[-1]).all():
+            # An explicit closing point is kept by the polyline pass
+            points = simplify_polyline(points, tolerance)
+        elif closed:
+            points = simplify_ring(points, tolerance)
+        else:
+            points = simplify_polyline(points, tolerance)
+        after += len(points)
+        coordinates = _format(points)
+        parts.append("M" + coordinates[0])
+        if len(coordinates) > 1:
+            parts.append("L" + " ".join(coordinates[1:]))
+        if closed:
+            parts.append("Z")
+    if after == before:
+        return d
+    return " ".join(parts)
+
+
+def simplify_element(element: SVGElement, tolerance: float) -> SVGElement:
+    """Return a copy of an element with simplified points or path data."""
+    attributes = element.attributes
+    if element.name in ("polygon", "polyline") and "points" in attributes:
+        points = simplify_points(
+            attributes["points"], tolerance, element.name == "polygon"
+        )
+        if points is not attributes["points"]:
+            attributes = {**attributes, "points": points}
+    elif element.name == "path" and "d" in attributes:
+        d = simplify_path_data(attributes["d"], tolerance)
+        if d is not attributes["d"]:
+            attributes = {**attributes, "d": d}
+    if attributes is element.attributes:
+        return element
+    return element.model_copy(update={"attributes": attributes})
+
+
+def _simplify(element: SVGElement, tolerance: float) -> SVGElement:
+    if "transform" in element.attributes or element.name in _OPAQUE:
+        return element
+    element = simplify_element(element, tolerance)
+    children = [
+        _simplify(child, tolerance) if isinstance(child, SVGElement) else child
+        for child in element.children
+    ]
+    if all(new is old for new, old in zip(children, element.children)):
+        return element
+    return element.model_copy(update={"children": children})
+
+
+def simplify_content(
+    content: Content,
+    tolerance: float,
+    width: int,
+    height: int,
+    view_box: str,
+    scale: float = 1,
+) -> list[str | SVGElement]:
+    """
+    Simplify the shapes of document content, with the tolerance given in
+    output pixels. Input elements are never modified.
+    """
+    _, _, vw, vh = parse_view_box(view_box)
+    pixels_per_unit = min(width / vw, height / vh) * scale
+    tolerance = tolerance / pixels_per_unit
+    items = content if isinstance(content, list) else [content]
+    return [
+        _simplify(item, tolerance) if isinstance(item, SVGElement) else item
+        for item in items
+    ]
@@ -1,7 +1,7 @@
 import pytest
 from io import BytesIO
 from PIL import Image
-from nodetool.nodes.lib.pillow import Blend, Composite
+from nodetool.nodes.lib.pillow import Blend, Composite, Transition, WeightedBlend
 from nodetool.workflows.processing_context import ProcessingContext
 from nodetool.metadata.types import ImageRef, NPArray, FolderRef
 from nodetool.nodes.nodetool.image import (
@@ -39,6 +39,7 @@ dummy_image = ImageRef(data=buffer.getvalue())
         (Paste(image=dummy_image, paste=dummy_image, left=0, top=0), ImageRef),
         (Blend(image1=dummy_image, image2=dummy_image, alpha=0.5), ImageRef),
         (Composite(image1=dummy_image, image2=dummy_image, mask=dummy_image), ImageRef),
+        (WeightedBlend(images=[dummy_image, dummy_image, dummy_image]), ImageRef),
     ],
 )
 async def test_image_nodes(context: ProcessingContext, node, expected_type):
@@ -47,3 +48,115 @@ async def test_image_nodes(context: ProcessingContext, node, expected_type):
         assert isinstance(result, expected_type)
     except Exception as e:
         pytest.fail(f"Error processing {node.__class__.__name__}: {str(e)}")
+
+
+@pytest.mark.asyncio
+async def test_weighted_blend_averages(context: ProcessingContext):
+    blue = BytesIO()
+    Image.new("RGB", (50, 50), color="blue").save(blue, format="PNG")
+    blue_image = ImageRef(data=blue.getvalue())
+
+    result = await WeightedBlend(
+        images=[dummy_image, blue_image], weights=[1.0, 1.0]
+    ).process(context)
+    image = await context.image_to_pil(result)
+    assert image.size == (100, 100)
+    assert image.getpixel((0, 0)) == (128, 0, 128)
+
+
+@pytest.mark.asyncio
+async def test_transition_frames(context: ProcessingContext):
+    blue = BytesIO()
+    Image.new("RGB", (50, 50), color="blue").save(blue, format="PNG")
+    node = Transition(
+        image1=dummy_image,
+        image2=ImageRef(data=blue.getvalue()),
+        frames=5,
+        easing=Transition.Easing.EASE_IN_OUT,
+    )
+
+    frames = [
+        value async for slot, value in node.gen_process(context) if slot == "frame"
+    ]
+    assert len(frames) == 5
+    first = await context.image_to_pil(frames[0])
+    middle = await context.image_to_pil(frames[2])
+    last = await context.image_to_pil(frames[-1])
+    assert first.size == (100, 100)
+    assert first.getpixel((0, 0)) == (255, 0, 0)
+    assert middle.getpixel((0, 0)) == (128, 0, 128)
+    assert last.getpixel((0, 0)) == (0, 0, 255)
+
+
+@pytest.mark.asyncio
+async def test_blend_reduces_large_input(context: ProcessingContext):
+    large = BytesIO()
+    Image.new("RGB", (2000, 1600), color="blue").save(large, format="JPEG")
+    result = await Blend(
+        image1=dummy_image, image2=ImageRef(data=large.getvalue()), alpha=1.0
+    ).process(context)
+    image = await context.image_to_pil(result)
+    assert image.size == (100, 100)
+    red, green, blue = image.getpixel((50, 50))
+    assert red < 8 and green < 8 and blue > 247
+
+
+@pytest.mark.asyncio
+async def test_composite_reduces_large_palette_inputs(context: ProcessingContext):
+    palette = BytesIO()
+    Image.new("RGB", (1000, 1000), "blue").convert("P").save(palette, format="PNG")
+    bilevel = BytesIO()
+    Image.new("1", (1000, 1000), 1).save(bilevel, format="PNG")
+    result = await Composite(
+        image1=dummy_image,
+        image2=ImageRef(data=palette.getvalue()),
+        mask=ImageRef(data=bilevel.getvalue()),
+    ).process(context)
+    image = await context.image_to_pil(result)
+    assert image.size == (100, 100)
+    assert image.getpixel((50, 50)) == (255, 0, 0)
+
+
+def test_reduce_for_fit_keeps_cover_resolution():
+    from nodetool.nodes.lib.pillow.decode import reduce_for_fit
+
+    large = BytesIO()
+    Image.new("RGB", (4000, 3000), color="blue").save(large, format="JPEG")
+    image = reduce_for_fit(Image.open(large), (900, 700))
+    assert image.size == (1000, 750)
+
+    png = Image.new("RGB", (1001, 999))
+    assert reduce_for_fit(png, (300, 300)).size == (334, 333)
+    assert reduce_for_fit(png, (600, 600)) is png
+
+
+@pytest.mark.asyncio
+async def test_images_in_memory_are_not_reencoded():
+    from nodetool.nodes.lib.pillow.decode import load_image
+
+    stored = Image.new("RGB", (40, 30), "green")
+
+    class MemoryContext:
+        async def image_to_pil(self, ref):
+            return stored
+
+        async def asset_to_io(self, ref):
+            raise AssertionError("memory images are taken as they are")
+
+    ref = ImageRef(uri="memory://1")
+    image = await load_image(MemoryContext(), ref, mode="RGB", size_hint=(10, 10))
+    assert image is stored
+
+
+def test_reduce_for_fit_palette_and_bilevel():
+    from nodetool.nodes.lib.pillow.decode import reduce_for_fit
+
+    palette = Image.new("RGB", (1000, 1000), "red").convert("P")
+    palette.info["transparency"] = 0
+    reduced = reduce_for_fit(palette, (100, 100))
+    assert (reduced.mode, reduced.size) == ("RGBA", (100, 100))
+
+    bilevel = Image.new("1", (1000, 1000), 1)
+    reduced = reduce_for_fit(bilevel, (100, 100))
+    assert (reduced.mode, reduced.size) == ("L", (100, 100))
+    assert reduced.getpixel((50, 50)) == 255
@@ -0,0 +1,101 @@
+import weakref
+
+import numpy as np
+import pytest
+from io import BytesIO
+from pydantic import ValidationError
+from PIL import Image
+from nodetool.workflows.processing_context import ProcessingContext
+from nodetool.metadata.types import ImageRef
+from nodetool.nodes.lib.pillow import layers as module
+from nodetool.nodes.lib.pillow.layers import (
+    BlendMode,
+    ImageLayer,
+    Layer,
+    LayerStack,
+    composite_layer,
+)
+
+
+def image_ref(mode: str, size: tuple[int, int], color) -> ImageRef:
+    buffer = BytesIO()
+    Image.new(mode, size, color=color).save(buffer, format="PNG")
+    return ImageRef(data=buffer.getvalue())
+
+
+@pytest.mark.asyncio
+async def test_layer_stack(context: ProcessingContext):
+    background = await Layer(
+        image=image_ref("RGB", (100, 100), (200, 100, 50))
+    ).process(context)
+    overlay = await Layer(
+        image=image_ref("RGBA", (50, 50), (128, 255, 0, 255)),
+        mask=image_ref("L", (50, 50), 255),
+        mode=BlendMode.MULTIPLY,
+        x=25,
+        y=25,
+    ).process(context)
+
+    result = await LayerStack(layers=[background, overlay]).process(context)
+    image = await context.image_to_pil(result)
+    assert image.size == (100, 100)
+    assert image.getpixel((0, 0)) == (200, 100, 50)
+    assert image.getpixel((50, 50)) == (100, 100, 0)
+
+
+def test_normal_mode_matches_alpha_composite():
+    backdrop = Image.new("RGBA", (40, 30), (10, 200, 30, 180))
+    source = Image.new("RGBA", (20, 20), (250, 20, 90, 100))
+    reference = backdrop.copy()
+    reference.alpha_composite(source, (5, 5))
+
+    canvas = np.zeros((30, 40, 4), np.uint8)
+    composite_layer(canvas, backdrop, None, ImageLayer(), tile_size=16)
+    composite_layer(canvas, source, None, ImageLayer(x=5, y=5), tile_size=16)
+    result = Image.fromarray(canvas)
+    for a, b in zip(result.getdata(), reference.getdata()):
+        assert all(abs(x - y) <= 1 for x, y in zip(a, b))
+
+
+@pytest.mark.parametrize(
+    "mode, expected",
+    [
+        (BlendMode.SCREEN, (228, 255, 50)),
+        (BlendMode.OVERLAY, (200, 200, 0)),
+        (BlendMode.ADD, (255, 255, 50)),
+    ],
+)
+def test_blend_modes(mode, expected):
+    backdrop = Image.new("RGBA", (4, 4), (200, 100, 50, 255))
+    source = Image.new("RGBA", (4, 4), (128, 255, 0, 255))
+    canvas = np.zeros((4, 4, 4), np.uint8)
+    composite_layer(canvas, backdrop, None, ImageLayer())
+    composite_layer(canvas, source, None, ImageLayer(mode=mode))
+    assert tuple(canvas[0, 0]) == (*expected, 255)
+
+
+def test_layer_opacity_is_bounded():
+    with pytest.raises(ValidationError):
+        ImageLayer(opacity=1.5)
+
+
+@pytest.mark.asyncio
+async def test_layers_are_decoded_one_at_a_time(
+    context: ProcessingContext, monkeypatch
+):
+    decoded = []
+    most = 0
+
+    async def load_image(context, ref, mode=None):
+        nonlocal most
+        image = Image.new("RGBA", (64, 64), (255, 0, 0, 128))
+        decoded.append(weakref.ref(image))
+        most = max(most, sum(ref() is not None for ref in decoded))
+        return image
+
+    monkeypatch.setattr(module, "load_image", load_image)
+    stack = [ImageLayer(image=ImageRef(uri="x"), x=i * 8 - 16) for i in range(6)]
+    result = await LayerStack(layers=stack).process(context)
+    assert most == 1
+    image = await context.image_to_pil(result)
+    assert image.getpixel((0, 0))[:3] == (255, 0, 0)
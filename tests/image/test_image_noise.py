@@ -0,0 +1,61 @@
+import pytest
+import numpy as np
+from io import BytesIO
+from PIL import Image
+from nodetool.workflows.processing_context import ProcessingContext
+from nodetool.metadata.types import ImageRef
+from nodetool.nodes.lib.pillow import noise
+from nodetool.nodes.lib.pillow.draw import AddNoise, GaussianNoise
+from nodetool.nodes.lib.pillow.noise import NoiseType, apply_noise, gaussian_noise
+
+
+def test_gaussian_noise_is_seeded():
+    first = gaussian_noise(64, 48, mean=0.5, stddev=0.1, seed=7)
+    second = gaussian_noise(64, 48, mean=0.5, stddev=0.1, seed=7)
+    assert first.shape == (48, 64, 3)
+    assert first.dtype == np.uint8
+    assert np.array_equal(first, second)
+    assert abs(first.mean() / 255 - 0.5) < 0.01
+    assert abs(first.std() / 255 - 0.1) < 0.01
+
+
+def test_noise_is_chunked(monkeypatch):
+    expected = apply_noise(
+        np.full((40, 30, 3), 128, np.uint8), NoiseType.UNIFORM, 0.2, 3
+    )
+    monkeypatch.setattr(noise, "CHUNK_SAMPLES", 30 * 3 * 7)
+    chunked = apply_noise(
+        np.full((40, 30, 3), 128, np.uint8), NoiseType.UNIFORM, 0.2, 3
+    )
+    assert chunked.shape == expected.shape
+    assert abs(float(chunked.mean()) - float(expected.mean())) < 2
+
+
+@pytest.mark.parametrize("noise_type", list(NoiseType))
+def test_apply_noise(noise_type):
+    pixels = np.full((100, 100, 3), 128, np.uint8)
+    noisy = apply_noise(pixels, noise_type, 0.1, seed=1)
+    assert noisy.dtype == np.uint8
+    assert abs(noisy.mean() - 128) < 3
+    assert noisy.std() > 5
+    assert np.array_equal(pixels, np.full((100, 100, 3), 128, np.uint8))
+
+
+def test_salt_and_pepper_fraction():
+    pixels = np.full((200, 200), 128, np.uint8)
+    noisy = apply_noise(pixels, NoiseType.SALT_AND_PEPPER, 0.2, seed=1)
+    assert abs((noisy != 128).mean() - 0.2) < 0.01
+
+
+@pytest.mark.asyncio
+async def test_noise_nodes(context: ProcessingContext):
+    buffer = BytesIO()
+    Image.new("RGBA", (50, 40), (100, 150, 200, 77)).save(buffer, format="PNG")
+    node = AddNoise(image=ImageRef(data=buffer.getvalue()), amount=0.2, seed=5)
+    first = await context.image_to_pil(await node.process(context))
+    second = await context.image_to_pil(await node.process(context))
+    assert first.size == (50, 40)
+    assert np.array_equal(np.asarray(first), np.asarray(second))
+
+    result = await GaussianNoise(width=2048, height=16, seed=1).process(context)
+    assert (await context.image_to_pil(result)).size == (2048, 16)
@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+from nodetool.workflows.processing_context import ProcessingContext
+from nodetool.metadata.types import ImageRef
+from nodetool.nodes.lib.pillow import procedural
+from nodetool.nodes.lib.pillow.draw import Checkerboard, Gradient, Grid, PerlinNoise
+from nodetool.nodes.lib.pillow.procedural import (
+    GradientType,
+    checkerboard,
+    gradient,
+    grid,
+    perlin_noise,
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "node",
+    [
+        Gradient(width=64, height=32, gradient_type=GradientType.RADIAL),
+        Checkerboard(width=64, height=32, cell_size=8),
+        Grid(width=64, height=32, spacing=8),
+        PerlinNoise(width=64, height=32, scale=16, seed=1),
+    ],
+)
+async def test_procedural_nodes(context: ProcessingContext, node):
+    result = await node.process(context)
+    assert isinstance(result, ImageRef)
+    assert (await context.image_to_pil(result)).size == (64, 32)
+
+
+def test_linear_gradient_stops():
+    pixels = gradient(
+        GradientType.LINEAR,
+        100,
+        10,
+        ["#FF0000", "#00FF00", "#0000FF"],
+        positions=[0.0, 0.25, 1.0],
+    )
+    assert pixels.shape == (10, 100, 3)
+    assert pixels[5, 0, 0] > 240
+    assert pixels[5, 25, 1] > 240
+    assert pixels[5, 99, 2] > 240
+
+
+def test_radial_and_conic_gradients():
+    radial = gradient(GradientType.RADIAL, 101, 101, ["white", "black"])
+    assert radial[50, 50].tolist() == [255, 255, 255]
+    assert radial[0, 0].max() < 5
+
+    conic = gradient(GradientType.CONIC, 101, 101, ["white", "black"])
+    # A quarter turn clockwise from the x axis is a quarter of the ramp
+    assert abs(int(conic[90, 50, 0]) - 191) <= 3
+
+
+def test_chunked_output_matches(monkeypatch):
+    expected = gradient(GradientType.CONIC, 64, 48, ["red", "blue", "red"])
+    noise = perlin_noise(64, 48, 16, seed=3)
+    monkeypatch.setattr(procedural, "CHUNK_PIXELS", 64 * 5)
+    assert np.array_equal(
+        gradient(GradientType.CONIC, 64, 48, ["red", "blue", "red"]), expected
+    )
+    assert np.array_equal(perlin_noise(64, 48, 16, seed=3), noise)
+
+
+def test_checkerboard_and_grid():
+    board = checkerboard(40, 40, 10, "white", "black")
+    assert board[0, 0].tolist() == [255, 255, 255]
+    assert board[0, 10].tolist() == [0, 0, 0]
+    assert board[10, 10].tolist() == [255, 255, 255]
+
+    lines = grid(40, 40, 10, 2, "red", "white")
+    assert lines[1, 5].tolist() == [255, 0, 0]
+    assert lines[5, 11].tolist() == [255, 0, 0]
+    assert lines[5, 5].tolist() == [255, 255, 255]
+
+
+def test_perlin_noise_range():
+    noise = perlin_noise(128, 128, 32, octaves=3, seed=1)
+    assert noise.dtype == np.uint8
+    assert 100 < noise.mean() < 155
+    assert noise.std() > 10
@@ -0,0 +1,95 @@
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pytest
+import PIL.Image
+import PIL.ImageDraw
+
+from nodetool.metadata.types import ColorRef, ImageRef
+from nodetool.workflows.processing_context import ProcessingContext
+from nodetool.nodes.lib.pillow.draw import AnnotateText, Label, RenderText, TextLabel
+from nodetool.nodes.lib.pillow.text import MaskAtlas, draw_text, load_font, text_mask
+
+FONT_PATH = str(Path(__file__).parent / "DejaVuSans.ttf")
+
+
+def test_load_font_is_cached():
+    assert load_font(FONT_PATH, 20) is load_font(FONT_PATH, 20)
+    assert load_font(FONT_PATH, 20) is not load_font(FONT_PATH, 21)
+
+
+def test_atlas_matches_image_draw():
+    font = load_font(FONT_PATH, 17)
+    for text, align in [("Hello, AVA!", "left"), ("Two\nlines here", "center")]:
+        expected = PIL.Image.new("RGB", (200, 80), "white")
+        PIL.ImageDraw.Draw(expected).text(
+            (-3, 10), text, font=font, fill="#ff0000", align=align
+        )
+        result = PIL.Image.new("RGB", (200, 80), "white")
+        draw_text(result, (-3, 10), text, font, "#ff0000", align)
+        assert np.array_equal(np.asarray(result), np.asarray(expected))
+
+
+def test_text_mask_is_reused():
+    font = load_font(FONT_PATH, 12)
+    assert text_mask(font, "label") is text_mask(font, "label")
+
+
+def test_mask_atlas_is_bounded_by_bytes():
+    atlas = MaskAtlas(max_bytes=250)
+    mask = PIL.Image.new("L", (10, 10))
+    for key in "abc":
+        atlas.put((key,), (mask, (0, 0)))
+    assert atlas.get(("a",)) is None
+    assert atlas.stats()["bytes"] == 200
+    atlas.put(("large",), (PIL.Image.new("L", (20, 20)), (0, 0)))
+    assert atlas.get(("large",)) is None
+    assert atlas.stats()["entries"] == 2
+
+
+def image_ref(size: tuple[int, int], color) -> ImageRef:
+    buffer = BytesIO()
+    PIL.Image.new("RGB", size, color=color).save(buffer, format="PNG")
+    return ImageRef(data=buffer.getvalue())
+
+
+@pytest.mark.asyncio
+async def test_annotate_text_matches_render_text(context: ProcessingContext):
+    image = image_ref((120, 60), "white")
+    label = await Label(text="car 97%", x=5, y=10, size=14).process(context)
+    annotated = await AnnotateText(image=image, labels=[label]).process(context)
+    rendered = await RenderText(
+        image=image, text="car 97%", x=5, y=10, size=14
+    ).process(context)
+    assert np.array_equal(
+        np.asarray(await context.image_to_pil(annotated)),
+        np.asarray(await context.image_to_pil(rendered)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_annotate_text_background_box(context: ProcessingContext):
+    labels = [
+        TextLabel(
+            text="dog",
+            x=50,
+            y=20,
+            size=16,
+            color=ColorRef(value="#FFFFFF"),
+            anchor=RenderText.TextAlignment.CENTER,
+            background=ColorRef(value="#0000FF"),
+            padding=4,
+        ),
+        TextLabel(text="", x=0, y=0),
+    ]
+    result = await AnnotateText(
+        image=image_ref((100, 60), "black"), labels=labels
+    ).process(context)
+    image = await context.image_to_pil(result)
+    assert image.getpixel((0, 0)) == (0, 0, 0)
+    pixels = np.asarray(image)
+    rows, cols = np.nonzero(pixels[..., 2] == 255)
+    # The box is centered horizontally on x
+    assert abs((cols.min() + cols.max()) / 2 - 50) <= 1
+    assert (pixels[..., 0] > 128).any()
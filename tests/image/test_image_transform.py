@@ -16,6 +16,8 @@ from nodetool.nodes.lib.pillow.filter import (
     Canny,
     ConvertToGrayscale,
     GetChannel,
+    SplitChannels,
+    MergeChannels,
 )
 from nodetool.nodes.nodetool.image import Fit, Scale, Resize, Crop
 
@@ -45,6 +47,8 @@ dummy_image = ImageRef(data=buffer.getvalue())
         (Crop(image=dummy_image, left=10, top=10, right=90, bottom=90), ImageRef),
         (ConvertToGrayscale(image=dummy_image), ImageRef),
         (GetChannel(image=dummy_image, channel=GetChannel.ChannelEnum.RED), ImageRef),
+        (SplitChannels(image=dummy_image), dict),
+        (MergeChannels(red=dummy_image, green=dummy_image, blue=dummy_image), ImageRef),
     ],
 )
 async def test_image_transform_nodes(context: ProcessingContext, node, expected_type):
@@ -58,3 +62,19 @@ async def test_image_transform_nodes(context: ProcessingContext, node, expected_
 
     except Exception as e:
         pytest.fail(f"Error processing {node.__class__.__name__}: {str(e)}")
+
+
+@pytest.mark.asyncio
+async def test_split_and_merge_channels(context: ProcessingContext):
+    buffer = BytesIO()
+    Image.new("RGBA", (10, 10), color=(10, 20, 30, 40)).save(buffer, format="PNG")
+    image = ImageRef(data=buffer.getvalue())
+
+    channels = await SplitChannels(image=image).process(context)
+    assert set(channels) == {"red", "green", "blue", "alpha"}
+    alpha = await context.image_to_pil(channels["alpha"])
+    assert alpha.getpixel((0, 0))[0] == 40
+
+    merged = await MergeChannels(**channels).process(context)
+    buffer = await context.asset_to_io(merged)
+    assert Image.open(buffer).getpixel((0, 0)) == (10, 20, 30, 40)
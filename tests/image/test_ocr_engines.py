@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+from nodetool.nodes.lib import ocr_engines
+from nodetool.nodes.lib.ocr_engines import DEFAULT_ENGINE_SIZE, EnginePool
+
+
+class FakeEngine:
+    def __init__(self, language, **config):
+        self.language = language
+        self.config = config
+        self.calls = 0
+        self.active = 0
+        self.overlapped = False
+
+    def ocr(self, image):
+        self.active += 1
+        self.overlapped |= self.active > 1
+        time.sleep(0.01)
+        self.calls += 1
+        self.active -= 1
+        return [[]]
+
+
+@pytest.fixture(autouse=True)
+def fixed_engine_size(monkeypatch):
+    monkeypatch.setattr(ocr_engines, "_resident_bytes", lambda: None)
+
+
+def test_engines_are_shared_and_warmed_up():
+    created = []
+
+    def factory(language, **config):
+        created.append((language, config))
+        return FakeEngine(language, **config)
+
+    pool = EnginePool(factory=factory)
+    first = pool.load("en")
+    assert first.calls == 1
+    with pool.acquire("en") as engine:
+        assert engine is first
+    pool.load("en", use_angle_cls=True)
+    assert created == [("en", {}), ("en", {"use_angle_cls": True})]
+    assert pool.stats()["hits"] == 1
+    assert pool.stats()["engines"] == 2
+
+
+def test_lru_eviction_under_budget():
+    pool = EnginePool(max_bytes=2 * DEFAULT_ENGINE_SIZE, factory=FakeEngine)
+    english = pool.load("en")
+    pool.load("fr")
+    pool.load("en")
+    pool.load("de")
+    assert pool.stats()["evictions"] == 1
+    assert ocr_engines.engine_key("fr") not in pool
+    assert pool.load("en") is english
+
+
+def test_concurrent_requests_create_once_and_wait_for_the_lock():
+    created = []
+
+    def factory(language, **config):
+        time.sleep(0.05)
+        created.append(language)
+        return FakeEngine(language)
+
+    pool = EnginePool(factory=factory)
+
+    def run():
+        with pool.acquire("en") as engine:
+            engine.ocr(None)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert created == ["en"]
+    engine = pool.load("en")
+    assert engine.calls == 9
+    assert not engine.overlapped
+
+
+def test_failed_creation_is_retried():
+    attempts = []
+
+    def factory(language, **config):
+        attempts.append(language)
+        if len(attempts) == 1:
+            raise RuntimeError("download failed")
+        return FakeEngine(language)
+
+    pool = EnginePool(factory=factory, warm=None)
+    with pytest.raises(RuntimeError):
+        pool.load("en")
+    assert pool.load("en").language == "en"
+    assert attempts == ["en", "en"]
@@ -0,0 +1,147 @@
+import asyncio
+
+import numpy as np
+import pytest
+from nodetool.nodes.lib.ocr_engines import recognize
+from nodetool.nodes.lib.ocr_tiles import (
+    join_text,
+    recognize_tiled,
+    suppress_duplicates,
+    tile_boxes,
+)
+
+
+class ShadeEngine:
+    """Finds every gray level below white as one line, named by its level."""
+
+    def ocr(self, image):
+        lines = []
+        for level in np.unique(image[..., 0]):
+            if level == 255:
+                continue
+            ys, xs = np.nonzero(image[..., 0] == level)
+            left, top, right, bottom = xs.min(), ys.min(), xs.max() + 1, ys.max() + 1
+            box = [[left, top], [right, top], [right, bottom], [left, bottom]]
+            lines.append((box, (str(level), 0.9)))
+        return [lines]
+
+
+class LetterEngine:
+    """
+    Reads one line from the columns of a box: the green channel holds each
+    column's letter and the blue channel the letter's position.
+    """
+
+    def ocr(self, image):
+        ys, xs = np.nonzero(image[..., 0] < 255)
+        left, top, right, bottom = xs.min(), ys.min(), xs.max() + 1, ys.max() + 1
+        row = image[top, left:right]
+        starts = np.flatnonzero(np.diff(row[:, 2].astype(int), prepend=-1))
+        text = "".join(chr(letter) for letter in row[starts, 1])
+        box = [[left, top], [right, top], [right, bottom], [left, bottom]]
+        return [[(box, (text, 0.9))]]
+
+
+class InlineWorkers:
+    def __init__(self, engine=ShadeEngine):
+        self.engine = engine
+        self.sizes = []
+
+    async def recognize(self, image, language, **config):
+        self.sizes.append(image.shape[:2])
+        return recognize(self.engine(), image)
+
+
+def box(left, top, right, bottom):
+    return [[left, top], [right, top], [right, bottom], [left, bottom]]
+
+
+def test_tiles_cover_the_image():
+    tiles = tile_boxes(1000, 700, 512, 64)
+    covered = np.zeros((700, 1000), bool)
+    for left, top, right, bottom in tiles:
+        assert (right - left, bottom - top) == (512, 512)
+        covered[top:bottom, left:right] = True
+    assert covered.all()
+    assert tile_boxes(300, 200, 512, 64) == [(0, 0, 300, 200)]
+    with pytest.raises(ValueError):
+        tile_boxes(1000, 1000, 64, 64)
+
+
+def test_text_is_joined_where_the_pieces_repeat_it():
+    assert join_text("Hello w", "llo world", 0.4) == "Hello world"
+    # Without a repeated part, the share of the right piece is dropped
+    assert join_text("Hello w", "XYZ world", 0.4) == "Hello wworld"
+    assert join_text("ab", "cd", 0.0) == "abcd"
+
+
+def test_whole_lines_win_over_cut_fragments():
+    lines = [
+        ("Hel", 0.99, box(400, 10, 512, 30)),
+        ("Hello world", 0.8, box(400, 10, 600, 30)),
+        # Overlapping lines of one tile are left alone
+        ("a", 0.9, box(0, 100, 50, 120)),
+        ("b", 0.9, box(10, 100, 60, 120)),
+    ]
+    keep = suppress_duplicates(
+        lines, np.array([0, 1, 0, 0]), np.array([True, False, False, False])
+    )
+    assert keep == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_seam_lines_are_mapped_and_merged():
+    image = np.full((384, 384, 3), 255, np.uint8)
+    image[20:40, 150:260] = 10  # cut off in the left tile, whole in the right
+    image[180:200, 40:90] = 20  # whole in both left tiles
+    image[140:170, 180:230] = 30  # whole in all four tiles
+    workers = InlineWorkers()
+    lines = await recognize_tiled(workers, image, "en", 256, 128)
+    assert workers.sizes == [(256, 256)] * 4
+    assert [(text, corners[0], corners[2]) for text, _, corners in lines] == [
+        ("10", [150, 20], [260, 40]),
+        ("30", [180, 140], [230, 170]),
+        ("20", [40, 180], [90, 200]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_lines_longer_than_the_overlap_are_joined():
+    image = np.full((100, 896, 3), 255, np.uint8)
+    text = "Hello world"
+    image[30:50, 300:700, 0] = 0
+    for index, letter in enumerate(text):
+        left = 300 + index * 400 // len(text)
+        image[30:50, left:700, 1] = ord(letter)
+        image[30:50, left:700, 2] = index
+    workers = InlineWorkers(LetterEngine)
+    # Tiles at 0 and 384 cut the line off in both of them
+    lines = await recognize_tiled(workers, image, "en", 512, 128)
+    assert workers.sizes == [(100, 512)] * 2
+    assert [(text, corners[0], corners[2]) for text, _, corners in lines] == [
+        ("Hello world", [300, 30], [700, 50])
+    ]
+
+
+class FailingWorkers:
+    def __init__(self):
+        self.cancelled = 0
+
+    async def recognize(self, image, language, **config):
+        if image[0, 0, 0] == 0:
+            raise RuntimeError("worker failed")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+@pytest.mark.asyncio
+async def test_other_tiles_are_cancelled_when_one_fails():
+    image = np.full((384, 384, 3), 255, np.uint8)
+    image[0, 0] = 0
+    workers = FailingWorkers()
+    with pytest.raises(RuntimeError):
+        await recognize_tiled(workers, image, "en", 256, 128)
+    assert workers.cancelled == 3
@@ -0,0 +1,240 @@
+import asyncio
+import os
+from io import BytesIO
+
+import numpy as np
+import PIL.Image
+import pytest
+from nodetool.metadata.types import ImageRef
+from concurrent.futures.process import BrokenProcessPool
+from nodetool.nodes.lib import ocr, ocr_workers
+from nodetool.nodes.lib.ocr_engines import engine_key, recognize
+from nodetool.nodes.lib.ocr_workers import OCRWorkers
+
+
+class FakeEngine:
+    """Reports the image size, mean and worker process as one text line."""
+
+    def __init__(self, language, **config):
+        self.language = language
+
+    def ocr(self, image):
+        height, width = image.shape[:2]
+        text = f"{self.language} {width}x{height} {image.mean():.1f} {os.getpid()}"
+        box = [[0, 0], [width, 0], [width, height], [0, height]]
+        return [[(box, (text, 0.5))]]
+
+
+class EmptyEngine:
+    def ocr(self, image):
+        return [None]
+
+
+class CrashingEngine(FakeEngine):
+    def ocr(self, image):
+        if image.mean() == 13:
+            # Like a worker killed for running out of memory
+            os._exit(1)
+        return super().ocr(image)
+
+
+class FailingOnceEngine(FakeEngine):
+    """Fails to load in the first worker that creates it."""
+
+    def __init__(self, language, **config):
+        try:
+            os.close(os.open(os.environ["OCR_TEST_FAILURE"], os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            super().__init__(language, **config)
+        else:
+            raise RuntimeError("model download failed")
+
+
+def test_recognize_returns_plain_lines():
+    lines = recognize(FakeEngine("en"), np.zeros((4, 6, 3), np.uint8))
+    assert lines == [
+        ("en 6x4 0.0 " + str(os.getpid()), 0.5, [[0, 0], [6, 0], [6, 4], [0, 4]])
+    ]
+    assert recognize(EmptyEngine(), np.zeros((4, 6, 3), np.uint8)) == []
+
+
+@pytest.fixture
+def workers():
+    workers = OCRWorkers(workers=2, max_pending=3, factory=FakeEngine)
+    yield workers
+    workers.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_images_are_recognized_in_workers(workers):
+    images = [np.full((10 + i, 20, 3), i, np.uint8) for i in range(8)]
+    results = await asyncio.gather(
+        *[workers.recognize(image, "fr") for image in images]
+    )
+    for index, lines in enumerate(results):
+        [(text, score, box)] = lines
+        language, size, mean, pid = text.split()
+        assert (language, size, float(mean)) == ("fr", f"20x{10 + index}", index)
+        assert int(pid) != os.getpid()
+        assert box[2] == [20, 10 + index]
+
+
+@pytest.mark.asyncio
+async def test_pending_jobs_are_bounded(workers, monkeypatch):
+    pending = 0
+    most = 0
+    original = asyncio.get_running_loop().run_in_executor
+
+    async def counting(executor, fn, *args):
+        nonlocal pending, most
+        pending += 1
+        most = max(most, pending)
+        try:
+            return await original(executor, fn, *args)
+        finally:
+            pending -= 1
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "run_in_executor", counting)
+    image = np.zeros((8, 8, 3), np.uint8)
+    await asyncio.gather(*[workers.recognize(image, "en") for _ in range(12)])
+    assert most == 3
+
+
+@pytest.mark.asyncio
+async def test_pending_images_are_bounded(workers, monkeypatch):
+    pending = 0
+    most = 0
+    alone = False
+    original = asyncio.get_running_loop().run_in_executor
+
+    async def counting(executor, fn, name, layouts, *args):
+        nonlocal pending, most, alone
+        pending += len(layouts)
+        most = max(most, pending)
+        if len(layouts) > 3:
+            alone = pending == len(layouts)
+        try:
+            return await original(executor, fn, name, layouts, *args)
+        finally:
+            pending -= len(layouts)
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "run_in_executor", counting)
+    image = np.zeros((8, 8, 3), np.uint8)
+    batches = [[image] * 2 for _ in range(6)] + [[image] * 5]
+    results = await asyncio.gather(
+        *[workers.recognize_batch(batch, "en") for batch in batches]
+    )
+    assert [len(lines) for lines in results] == [2] * 6 + [5]
+    assert most == 5
+    assert alone
+
+
+@pytest.mark.asyncio
+async def test_load_warms_up_every_worker(workers):
+    assert not workers.is_loaded("en")
+    await workers.load("en")
+    assert workers.is_loaded("en")
+    assert len(workers.loaded[engine_key("en")]) == 2
+    assert os.getpid() not in workers.loaded[engine_key("en")]
+
+
+@pytest.mark.asyncio
+async def test_failed_load_does_not_stall_the_other_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("OCR_TEST_FAILURE", str(tmp_path / "failed"))
+    workers = OCRWorkers(workers=2, factory=FailingOnceEngine)
+    try:
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(workers.load("en"), 20)
+        image = np.zeros((4, 4), np.uint8)
+        results = await asyncio.wait_for(
+            asyncio.gather(*[workers.recognize(image, "en") for _ in range(4)]), 20
+        )
+        assert all(text.startswith("en 4x4") for [(text, _, _)] in results)
+        await asyncio.wait_for(workers.load("en"), 20)
+        assert workers.is_loaded("en")
+    finally:
+        workers.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_replaced():
+    workers = OCRWorkers(workers=1, factory=CrashingEngine)
+    try:
+        await workers.load("en")
+        with pytest.raises(BrokenProcessPool):
+            await workers.recognize(np.full((4, 4), 13, np.uint8), "en")
+        assert not workers.is_loaded("en")
+        [(text, _, _)] = await workers.recognize(np.zeros((4, 4), np.uint8), "en")
+        assert text.startswith("en 4x4 0.0")
+    finally:
+        workers.shutdown()
+
+
+def test_least_recently_used_pools_are_retired(monkeypatch):
+    monkeypatch.setattr(ocr_workers, "_pools", ocr_workers.OrderedDict())
+    one = ocr_workers.ocr_workers(1)
+    two = ocr_workers.ocr_workers(2)
+    assert ocr_workers.ocr_workers(1) is one
+    ocr_workers.ocr_workers(3)
+    assert two._retired and not one._retired
+    assert list(ocr_workers._pools) == [1, 3]
+
+
+def png(width: int, height: int, value: int) -> ImageRef:
+    buffer = BytesIO()
+    PIL.Image.new("RGB", (width, height), (value,) * 3).save(buffer, format="PNG")
+    return ImageRef(data=buffer.getvalue())
+
+
+@pytest.mark.asyncio
+async def test_batch_ocr_node(workers, monkeypatch, context):
+    monkeypatch.setattr(ocr, "ocr_workers", lambda count: workers)
+    images = [png(20 + i, 10, i * 10) for i in range(7)]
+    node = ocr.BatchOCR(images=images, language=ocr.OCRLanguage.GERMAN, batch_size=2)
+    output = await node.process(context)
+
+    assert len(output["results"]) == 7
+    for index, (boxes, text) in enumerate(zip(output["results"], output["texts"])):
+        [box] = boxes
+        assert box.text == text
+        assert text.startswith(f"de {20 + index}x10 {index * 10}.0 ")
+        assert tuple(box.bottom_right) == (20 + index, 10)
+    assert output["metrics"]["images"] == 7
+    assert output["metrics"]["lines"] == 7
+    assert output["metrics"]["images_per_second"] > 0
+
+
+class StalledWorkers:
+    max_pending = 4
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = 0
+
+    async def recognize_batch(self, images, language, **config):
+        self.started += 1
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+@pytest.mark.asyncio
+async def test_batch_ocr_cancels_jobs_when_a_decode_fails(monkeypatch, context):
+    workers = StalledWorkers()
+    monkeypatch.setattr(ocr, "ocr_workers", lambda count: workers)
+    decode = context.image_to_numpy
+
+    async def fetching(ref):
+        # Like a download, decoding lets scheduled jobs start
+        await asyncio.sleep(0)
+        return await decode(ref)
+
+    monkeypatch.setattr(context, "image_to_numpy", fetching)
+    images = [png(8, 8, 0), png(8, 8, 0), ImageRef(data=b"not an image")]
+    node = ocr.BatchOCR(images=images)
+    with pytest.raises(Exception):
+        await node.process(context)
+    assert workers.started == 2
+    assert workers.cancelled == 2
@@ -0,0 +1,64 @@
+import pytest
+from io import BytesIO
+from PIL import Image
+from nodetool.workflows.processing_context import ProcessingContext
+from nodetool.metadata.types import ImageRef
+from nodetool.nodes.lib import profiling
+from nodetool.nodes.lib.pillow.filter import Blur
+
+# Create a dummy ImageRef for testing
+buffer = BytesIO()
+Image.new("RGB", (100, 100), color="red").save(buffer, format="PNG")
+dummy_image = ImageRef(data=buffer.getvalue())
+
+
+@pytest.fixture
+def profiling_enabled():
+    profiling.reset()
+    profiling.enable()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+@pytest.mark.asyncio
+async def test_profiling_disabled_records_nothing(context: ProcessingContext):
+    profiling.reset()
+    await Blur(image=dummy_image, radius=2).process(context)
+    assert profiling.snapshot() == {}
+
+
+@pytest.mark.asyncio
+async def test_profiling_records_phases(context: ProcessingContext, profiling_enabled):
+    profiles = []
+    profiling.add_sink(profiles.append)
+    try:
+        result = await Blur(image=dummy_image, radius=2).process(context)
+    finally:
+        profiling.remove_sink(profiles.append)
+
+    assert isinstance(result, ImageRef)
+    assert len(profiles) == 1
+    profile = profiles[0]
+    assert profile["decode"] > 0
+    assert profile["encode"] > 0
+    assert profile["total"] >= profile["decode"] + profile["encode"]
+    if profiling._resident_bytes() is not None:
+        assert profile["rss"] > 0
+    if profiling._peak_resident_bytes() is not None:
+        assert profile["peak_rss"] > 0
+
+    metrics = profiling.snapshot()[Blur.get_node_type()]
+    for phase in profiling.PHASES:
+        assert metrics[phase]["count"] == 1
+
+
+def test_histogram_buckets():
+    hist = profiling.Histogram()
+    for value in [1, 3, 1000, 1500]:
+        hist.add(value)
+    data = hist.to_dict()
+    assert data["count"] == 4
+    assert data["min"] == 1
+    assert data["max"] == 1500
+    assert data["buckets"] == {"<2": 1, "<4": 1, "<1024": 1, "<2048": 1}
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_animate import (
+    Animator,
+    Easing,
+    compose_transform,
+    frame_times,
+    interpolate,
+    sample,
+)
+from nodetool.nodes.lib.svg_render import raster_cache
+
+
+def track(target, attribute, times, values, easing=Easing.LINEAR):
+    return SimpleNamespace(
+        target=target, attribute=attribute, times=times, values=values, easing=easing
+    )
+
+
+def scene():
+    return [
+        SVGElement(
+            name="rect",
+            attributes={
+                "x": "0",
+                "y": "0",
+                "width": "40",
+                "height": "40",
+                "fill": "#ffffff",
+            },
+        ),
+        SVGElement(
+            name="circle",
+            attributes={
+                "id": "ball",
+                "cx": "5",
+                "cy": "20",
+                "r": "4",
+                "fill": "#ff0000",
+            },
+        ),
+        SVGElement(
+            name="rect",
+            attributes={
+                "x": "0",
+                "y": "36",
+                "width": "40",
+                "height": "4",
+                "fill": "#0000ff",
+            },
+        ),
+    ]
+
+
+def test_sample_interpolates_numbers_and_colors():
+    assert sample([0, 1], ["0", "10"], Easing.LINEAR, 0.25) == "2.5"
+    assert sample([0, 1], ["0", "10"], Easing.LINEAR, -1) == "0"
+    assert sample([0, 1], ["0", "10"], Easing.LINEAR, 2) == "10"
+    assert sample([0, 1], ["0", "10"], Easing.EASE_IN, 0.5) == "2.5"
+    assert sample([0, 1], ["0", "10"], Easing.STEP, 0.9) == "0"
+    assert interpolate("#000000", "#ff0000", 0.5) == "#800000"
+    assert interpolate("visible", "hidden", 0.9) == "visible"
+
+
+def test_sample_requires_matching_keyframes():
+    with pytest.raises(ValueError):
+        sample([0, 1], ["0"], Easing.LINEAR, 0)
+
+
+def test_compose_transform_appends_channels():
+    assert compose_transform("", {}) == ""
+    assert (
+        compose_transform("scale(2)", {"translate_x": 5, "rotate": 90})
+        == "scale(2) translate(5,0) rotate(90)"
+    )
+
+
+def test_frame_times():
+    assert frame_times(1, 4) == [0, 0.25, 0.5, 0.75]
+    assert frame_times(0.01, 4) == [0]
+
+
+def test_layers_and_unknown_target():
+    animator = Animator(
+        scene(), [track("ball", "cx", [0, 1], ["5", "35"])], 40, 40, "0 0 40 40"
+    )
+    assert [animated for animated, _ in animator.layers] == [False, True, False]
+    with pytest.raises(ValueError, match="Unknown animation target"):
+        Animator(scene(), [track("missing", "cx", [0], ["5"])], 40, 40, "0 0 40 40")
+
+
+def test_frames_render_static_layers_once(monkeypatch):
+    content = scene()
+    animator = Animator(
+        content, [track("ball", "cx", [0, 1], ["5", "35"])], 40, 40, "0 0 40 40"
+    )
+    calls = []
+    render = animator._render
+    monkeypatch.setattr(
+        animator,
+        "_render",
+        lambda items, *a, **k: calls.append(items) or render(items, *a, **k),
+    )
+    raster_cache.clear()
+
+    first = np.asarray(animator.frame(0))
+    last = np.asarray(animator.frame(0.99))
+    assert len(calls) == 4
+    # Only the two static layers went into the raster cache
+    assert raster_cache.stats()["entries"] == 2
+    assert tuple(first[20, 5]) == (255, 0, 0, 255)
+    assert tuple(last[20, 5]) == (255, 255, 255, 255)
+    assert tuple(last[20, 34]) == (255, 0, 0, 255)
+    assert tuple(last[38, 20]) == (0, 0, 255, 255)
+    # The input content is not modified
+    assert content[1].attributes["cx"] == "5"
@@ -0,0 +1,74 @@
+import random
+
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_atlas import build_atlas, pack_rectangles
+
+
+def overlaps(a, b, padding):
+    return (
+        a[0] < b[2] + padding
+        and b[0] < a[2] + padding
+        and a[1] < b[3] + padding
+        and b[1] < a[3] + padding
+    )
+
+
+def test_pack_rectangles_without_overlap():
+    rng = random.Random(0)
+    sizes = [(rng.randint(1, 40), rng.randint(1, 40)) for _ in range(200)]
+    positions, (width, height) = pack_rectangles(sizes, padding=2)
+    boxes = [(x, y, x + w, y + h) for (x, y), (w, h) in zip(positions, sizes)]
+    for index, box in enumerate(boxes):
+        assert 0 <= box[0] and box[2] <= width
+        assert 0 <= box[1] and box[3] <= height
+        assert not any(overlaps(box, other, 2) for other in boxes[index + 1 :])
+    # Shelf packing stays reasonably dense
+    area = sum(w * h for w, h in sizes)
+    assert area / (width * height) > 0.6
+
+
+def test_pack_rectangles_empty():
+    assert pack_rectangles([]) == ([], (0, 0))
+
+
+def test_build_atlas_places_sprites():
+    sprites = [
+        SVGElement(name="g", children=[SVGElement(name="circle")]),
+        SVGElement(
+            name="svg",
+            attributes={"width": "20.5", "height": "10", "viewBox": "0 0 41 20"},
+        ),
+    ]
+    content, size, boxes = build_atlas(sprites, (16, 16), "0 0 32 32", padding=1)
+    assert content[0].name == "svg"
+    assert content[0].attributes["viewBox"] == "0 0 32 32"
+    assert content[0].children[0] is sprites[0]
+    assert content[1].attributes["viewBox"] == "0 0 41 20"
+    assert [b[2] - b[0] for b in boxes] == [16, 21]
+    for element, (left, top, right, bottom) in zip(content, boxes):
+        assert element.attributes["x"] == str(left)
+        assert element.attributes["y"] == str(top)
+    assert size[0] >= max(box[2] for box in boxes)
+    assert size[1] >= max(box[3] for box in boxes)
+
+
+def test_build_atlas_renames_clashing_ids():
+    def sprite():
+        return SVGElement(
+            name="g",
+            children=[
+                SVGElement(name="filter", attributes={"id": "blur"}),
+                SVGElement(name="rect", attributes={"filter": "url(#blur)"}),
+                SVGElement(name="use", attributes={"href": "#blur"}),
+            ],
+        )
+
+    first, second = sprite(), sprite()
+    content, _, _ = build_atlas([first, second], (8, 8), "0 0 8 8")
+    assert content[0].children[0] is first
+    renamed = content[1].children[0].children
+    assert renamed[0].attributes["id"] == "blur-1"
+    assert renamed[1].attributes["filter"] == "url(#blur-1)"
+    assert renamed[2].attributes["href"] == "#blur-1"
+    # The input sprites are not modified
+    assert second.children[0].attributes["id"] == "blur"
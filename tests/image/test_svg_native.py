@@ -0,0 +1,152 @@
+import numpy as np
+import pytest
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_native import primitive_shapes, render_primitives
+from nodetool.nodes.lib.svg_optimize import optimize_content
+from nodetool.nodes.lib.svg_render import render_pixels, unpremultiply_bgra
+from nodetool.nodes.lib.svg_serialize import serialize_document
+
+# Largest and mean per-pixel alpha difference allowed against exact coverage
+MAX_DIFFERENCE = 32
+MEAN_DIFFERENCE = 1.0
+
+
+def shapes():
+    return [
+        SVGElement(
+            name="rect",
+            attributes={
+                "x": "10.25",
+                "y": "60",
+                "width": "30.5",
+                "height": "20",
+                "fill": "#ff0000",
+                "stroke": "none",
+                "stroke-width": "1",
+            },
+        ),
+        SVGElement(
+            name="circle",
+            attributes={"cx": "60.2", "cy": "39.7", "r": "20.3", "fill": "#0000ff"},
+        ),
+        SVGElement(
+            name="polygon",
+            attributes={"points": "5,5 40,12 20,45", "fill": "#00ff00"},
+        ),
+    ]
+
+
+def exact_alpha(size: int, samples: int = 16) -> np.ndarray:
+    ys, xs = (np.mgrid[0 : size * samples, 0 : size * samples] + 0.5) / samples
+    inside = (xs >= 10.25) & (xs < 40.75) & (ys >= 60) & (ys < 80)
+    inside |= (xs - 60.2) ** 2 + (ys - 39.7) ** 2 < 20.3**2
+    points = [(5, 5), (40, 12), (20, 45)]
+    sides = np.stack(
+        [
+            (x2 - x1) * (ys - y1) - (y2 - y1) * (xs - x1)
+            for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1])
+        ]
+    )
+    inside |= (sides > 0).all(axis=0)
+    return inside.reshape(size, samples, size, samples).mean(axis=(1, 3)) * 255
+
+
+def render(content, size, view_box):
+    surface = render_primitives(content, size, size, view_box)
+    assert surface is not None
+    return unpremultiply_bgra(surface)
+
+
+def test_matches_exact_coverage():
+    pixels = render(shapes(), 100, (0, 0, 100, 100))
+    difference = np.abs(pixels[..., 3].astype(float) - exact_alpha(100))
+    assert difference.max() <= MAX_DIFFERENCE
+    assert difference.mean() <= MEAN_DIFFERENCE
+    assert tuple(pixels[70, 20]) == (255, 0, 0, 255)
+    assert tuple(pixels[40, 60]) == (0, 0, 255, 255)
+
+
+def test_stroked_circle_matches_exact_coverage():
+    circle = SVGElement(
+        name="circle",
+        attributes={
+            "cx": "25.2",
+            "cy": "24.7",
+            "r": "10",
+            "fill": "none",
+            "stroke": "#ffffff",
+            "stroke-width": "3",
+        },
+    )
+    pixels = render([circle], 50, (0, 0, 50, 50))
+    ys, xs = (np.mgrid[0:800, 0:800] + 0.5) / 16
+    inside = np.abs(np.hypot(xs - 25.2, ys - 24.7) - 10) < 1.5
+    expected = inside.reshape(50, 16, 50, 16).mean(axis=(1, 3)) * 255
+    difference = np.abs(pixels[..., 3].astype(float) - expected)
+    assert difference.max() <= MAX_DIFFERENCE
+    assert difference.mean() <= MEAN_DIFFERENCE
+
+
+def test_maps_view_box():
+    # A 50x50 viewBox fills a 100x100 output at twice the size
+    pixels = render(shapes(), 100, (0, 0, 50, 50))
+    assert tuple(pixels[40, 40]) == (0, 255, 0, 255)
+    assert tuple(pixels[99, 99]) == (0, 0, 255, 255)
+    assert pixels[99, 0, 3] == 0
+
+
+def test_falls_back_for_unsupported_content():
+    rect = shapes()[0]
+    assert primitive_shapes([rect]) is not None
+    for attributes in ({"rx": "4"}, {"transform": "rotate(5)"}, {"fill": "url(#g)"}):
+        element = rect.model_copy(
+            update={"attributes": {**rect.attributes, **attributes}}
+        )
+        assert primitive_shapes([element]) is None
+    assert (
+        primitive_shapes(
+            [SVGElement(name="path", attributes={"d": "M0,0 C1,1 2,2 3,3"})]
+        )
+        is None
+    )
+    assert primitive_shapes(["<rect/>"]) is None
+
+
+def test_falls_back_for_large_areas(monkeypatch):
+    monkeypatch.setattr("nodetool.nodes.lib.svg_native.MAX_PAINTED_PIXELS", 100)
+    assert render_primitives(shapes(), 100, 100, (0, 0, 100, 100)) is None
+
+
+def test_optimized_content_renders_the_same():
+    rects = [
+        SVGElement(
+            name="rect",
+            attributes={
+                "x": str(x),
+                "y": "0",
+                "width": "8",
+                "height": "8",
+                "fill": "red",
+            },
+        )
+        for x in (0, 10, 20)
+    ]
+    optimized = optimize_content(rects)
+    assert len(optimized) == 1
+    assert np.array_equal(
+        render_primitives(rects, 32, 32, (0, 0, 32, 32)),
+        render_primitives(optimized, 32, 32, (0, 0, 32, 32)),
+    )
+
+
+def test_matches_cairosvg():
+    try:
+        import cairosvg  # noqa: F401
+    except OSError:
+        pytest.skip("cairo is not available")
+    svg = serialize_document(shapes(), 100, 100, "0 0 100 100")
+    expected = render_pixels(svg, 100, 100).astype(float)
+    pixels = render(shapes(), 100, (0, 0, 100, 100))
+    difference = np.abs(pixels[..., 3].astype(float) - expected[..., 3])
+    assert difference.max() <= MAX_DIFFERENCE
+    assert difference.mean() <= MEAN_DIFFERENCE
@@ -0,0 +1,108 @@
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_optimize import collapse_transform, optimize_content
+
+
+def blur(id="filter_gaussian_blur", deviation="3.0"):
+    return SVGElement(
+        name="filter",
+        attributes={"id": id},
+        children=[
+            SVGElement(name="feGaussianBlur", attributes={"stdDeviation": deviation})
+        ],
+    )
+
+
+def rect(x, fill="#ff0000"):
+    return SVGElement(
+        name="rect",
+        attributes={
+            "x": str(x),
+            "y": "0",
+            "width": "10",
+            "height": "10",
+            "fill": fill,
+            "stroke": "none",
+            "stroke-width": "1",
+        },
+    )
+
+
+def test_dedupes_definitions_and_rewrites_references():
+    shape = SVGElement(name="circle", attributes={"r": "5", "filter": "url(#b)"})
+    content = [blur(), blur(), blur("b"), shape]
+    optimized = optimize_content(content)
+    assert [str(item) for item in optimized] == [
+        str(blur()),
+        '<circle r="5" filter="url(#filter_gaussian_blur)"></circle>',
+    ]
+    # The input is left untouched
+    assert shape.attributes["filter"] == "url(#b)"
+
+
+def test_keeps_conflicting_definitions():
+    content = [blur(deviation="1"), blur(deviation="2")]
+    assert optimize_content(content) == content
+
+
+def test_strips_defaults_and_merges_siblings():
+    optimized = optimize_content([rect(0), rect(20), rect(40, fill="blue")])
+    assert [str(item) for item in optimized] == [
+        '<path fill="#ff0000" d="M0,0h10v10h-10z M20,0h10v10h-10z"></path>',
+        '<rect x="40" y="0" width="10" height="10" fill="blue"></rect>',
+    ]
+
+
+def test_respects_inherited_values():
+    group = SVGElement(
+        name="g",
+        attributes={"stroke": "red"},
+        children=[
+            SVGElement(name="circle", attributes={"r": "1", "stroke": "none"}),
+            SVGElement(name="circle", attributes={"r": "2", "stroke": "red"}),
+        ],
+    )
+    (optimized,) = optimize_content([group])
+    assert [child.attributes for child in optimized.children] == [
+        {"r": "1", "stroke": "none"},
+        {"r": "2"},
+    ]
+
+
+def test_keeps_inherited_values_of_referenced_elements():
+    # <use href="#p" fill="red"> would turn the path red without its fill
+    path = SVGElement(
+        name="path", attributes={"id": "p", "d": "M0 0 L1 1", "fill": "#000000"}
+    )
+    use = SVGElement(name="use", attributes={"href": "#p", "fill": "red"})
+    optimized = optimize_content([path, use])
+    assert optimized[0].attributes["fill"] == "#000000"
+
+
+def test_does_not_merge_translucent_strokes():
+    lines = [
+        SVGElement(
+            name="line",
+            attributes={"x2": "10", "stroke": "red", "stroke-opacity": "0.5"},
+        )
+        for _ in range(2)
+    ]
+    assert optimize_content(lines) == lines
+
+
+def test_collapses_identity_transforms():
+    assert collapse_transform("translate(0,0) rotate(0) scale(1)") == ""
+    assert collapse_transform("translate(10, 0) scale(1,1)") == "translate(10, 0)"
+    assert collapse_transform("matrix(1 0 0 1 0 0)") == ""
+    assert collapse_transform("invalid") == "invalid"
+    group = SVGElement(
+        name="g", attributes={"transform": "rotate(360)"}, children=[rect(0)]
+    )
+    # The group is left without attributes and unwrapped
+    (optimized,) = optimize_content([group])
+    assert optimized.name == "rect"
+
+
+def test_raw_markup_disables_restructuring():
+    content = ["<style>rect { fill: blue }</style>", rect(0), rect(20)]
+    optimized = optimize_content(content)
+    assert [str(item) for item in optimized] == [str(item) for item in content]
@@ -0,0 +1,162 @@
+import asyncio
+
+import numpy as np
+import pytest
+from PIL import Image
+from nodetool.metadata.types import SVGRef
+from nodetool.nodes.lib import svg, svg_render
+from nodetool.nodes.lib.svg_render import (
+    RasterCache,
+    cache_key,
+    fill_template,
+    parse_view_box,
+    tile_windows,
+    unpremultiply_bgra,
+)
+
+
+def test_cache_key_depends_on_size_and_scale():
+    svg = b"<svg/>"
+    assert cache_key(svg, 10, 10, 1) == cache_key(svg, 10, 10, 1)
+    assert cache_key(svg, 10, 10, 1) != cache_key(svg, 10, 10, 2)
+    assert cache_key(svg, 10, 10, 1) != cache_key(svg, 20, 10, 1)
+    assert cache_key(svg, 10, 10, 1) != cache_key(b"<svg />", 10, 10, 1)
+
+
+def test_raster_cache_lru_eviction():
+    cache = RasterCache(max_bytes=2 * 10 * 10 * 4)
+    images = {key: Image.new("RGBA", (10, 10)) for key in "abc"}
+    cache.put("a", images["a"])
+    cache.put("b", images["b"])
+    assert cache.get("a") is images["a"]
+    cache.put("c", images["c"])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is images["a"]
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+
+def test_pool_workers_split_the_cache_budget(monkeypatch):
+    cache = RasterCache(max_bytes=1000)
+    cache.put("a", Image.new("L", (10, 10)))
+    monkeypatch.setattr(svg_render, "raster_cache", cache)
+    svg_render._initialize_worker(4)
+    assert cache.max_bytes == 250
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalid_settings_fall_back_to_defaults(monkeypatch):
+    monkeypatch.setenv("NODETOOL_SVG_WORKERS", "many")
+    assert svg_render._env_int("NODETOOL_SVG_WORKERS", 0) == 0
+    monkeypatch.setenv("NODETOOL_SVG_WORKERS", "3")
+    assert svg_render._env_int("NODETOOL_SVG_WORKERS", 0) == 3
+
+
+def test_raster_cache_disk_tier(tmp_path):
+    image = Image.new("RGBA", (8, 8), (255, 0, 0, 255))
+    RasterCache(directory=tmp_path).put("key", image)
+
+    cache = RasterCache(directory=tmp_path)
+    cached = cache.get("key")
+    assert cached is not None
+    assert cached.getpixel((0, 0)) == (255, 0, 0, 255)
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.get("key") is cached
+    assert cache.stats()["hits"] == 1
+
+
+def test_unpremultiply_bgra():
+    pixels = np.array(
+        [[[0, 0, 128, 128], [255, 0, 0, 255], [0, 0, 0, 0], [10, 20, 30, 40]]],
+        dtype=np.uint8,
+    )
+    assert unpremultiply_bgra(pixels).tolist() == [
+        [[255, 0, 0, 128], [0, 0, 255, 255], [0, 0, 0, 0], [191, 128, 64, 40]]
+    ]
+
+    opaque = np.full((2, 3, 4), 255, dtype=np.uint8)
+    opaque[..., 0] = 7
+    assert unpremultiply_bgra(opaque)[0, 0].tolist() == [255, 255, 7, 255]
+
+
+def test_unpremultiply_matches_reference():
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (16, 16, 4), dtype=np.uint8)
+    pixels[..., :3] = np.minimum(pixels[..., :3], pixels[..., 3:])
+    alpha = pixels[..., 3:].astype(np.int64)
+    color = pixels[..., 2::-1].astype(np.int64)
+    expected = np.where(
+        alpha > 0, (color * 255 + alpha // 2) // np.maximum(alpha, 1), 0
+    )
+    assert np.array_equal(unpremultiply_bgra(pixels)[..., :3], expected)
+
+
+def test_fill_template_escapes_values():
+    template = '<svg><text title="$title">${name}</text></svg>'
+    svg = fill_template(template, {"name": "R&D <team>", "title": 'say "hi"'})
+    assert svg == (
+        b'<svg><text title="say &quot;hi&quot;">R&amp;D &lt;team&gt;</text></svg>'
+    )
+    with pytest.raises(ValueError, match="name"):
+        fill_template(template, {"title": "x"})
+
+
+def test_tile_windows_cover_output():
+    tiles = tile_windows("0 0 100 50", 250, 100, 128, margin=4)
+    assert [box for box, _, _ in tiles] == [
+        (0, 0, 128, 100),
+        (128, 0, 250, 100),
+    ]
+    # Overlapping render boxes are clamped to the output
+    assert [render_box for _, render_box, _ in tiles] == [
+        (0, 0, 132, 100),
+        (124, 0, 250, 100),
+    ]
+
+
+def test_tile_windows_map_view_box():
+    # A 100x50 viewBox fits a 200x200 output at scale 2, centred vertically
+    tiles = tile_windows("10 20 100 50", 200, 200, 100, margin=0)
+    windows = [parse_view_box(window) for _, _, window in tiles]
+    assert windows[0] == (10, 20 - 25, 50, 50)
+    assert windows[3] == (60, 20 + 25, 50, 50)
+
+
+def test_parse_view_box_rejects_invalid():
+    assert parse_view_box("0,0, 10 20") == (0, 0, 10, 20)
+    with pytest.raises(ValueError):
+        parse_view_box("0 0 10")
+    with pytest.raises(ValueError):
+        parse_view_box("0 0 0 10")
+
+
+@pytest.mark.asyncio
+async def test_batch_cancels_pending_chunks_when_closed(context, monkeypatch):
+    started = []
+    cancelled = []
+
+    async def run_in_pool(render, chunk, width, height, scale):
+        started.append(chunk)
+        try:
+            await asyncio.sleep(0 if len(started) == 1 else 10)
+        except asyncio.CancelledError:
+            cancelled.append(chunk)
+            raise
+        return [np.zeros((height, width, 4), np.uint8) for _ in chunk]
+
+    monkeypatch.setattr(svg, "run_in_pool", run_in_pool)
+    node = svg.BatchSVGToImage(
+        documents=[SVGRef(data=b"<svg/>")] * 8, width=4, height=4, workers=2
+    )
+    stream = node.gen_process(context)
+    assert (await stream.__anext__())[0] == "image"
+    await stream.aclose()
+    await asyncio.sleep(0)
+    # Two chunks run at once: the two in flight were cancelled, and the rest
+    # never started
+    assert len(started) == 3
+    assert len(cancelled) == 2
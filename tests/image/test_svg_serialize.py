@@ -0,0 +1,42 @@
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_serialize import FragmentCache, serialize_document
+
+
+def make_elements():
+    rect = SVGElement(name="rect", attributes={"x": "1", "fill": "#000"})
+    text = SVGElement(name="text", attributes={"x": "2"}, content="hi & bye")
+    group = SVGElement(
+        name="g", attributes={"id": "a"}, children=[rect, SVGElement(name="circle")]
+    )
+    return [rect, text, group]
+
+
+def test_serialize_document():
+    svg = serialize_document(make_elements(), 10, 20, "0 0 10 20").decode("utf-8")
+    assert svg == (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<svg xmlns="http://www.w3.org/2000/svg"\n'
+        '     width="10"\n'
+        '     height="20"\n'
+        '     viewBox="0 0 10 20">\n'
+        '    <rect x="1" fill="#000"></rect>\n'
+        '<text x="2">hi & bye</text>\n'
+        '<g id="a"><rect x="1" fill="#000"></rect><circle ></circle></g>\n'
+        "</svg>"
+    )
+    assert serialize_document("<rect/>", 1, 1, "0 0 1 1").count(b"<rect/>") == 1
+
+
+def test_fragment_cache_detects_changes():
+    elements = make_elements()
+    cache = FragmentCache()
+    first = serialize_document(elements, 10, 10, "0 0 10 10", cache)
+    assert serialize_document(elements, 10, 10, "0 0 10 10", cache) == first
+    assert cache.hits == 3
+
+    # Mutating a nested child invalidates the fragment of its group
+    elements[2].children[0].attributes["fill"] = "#fff"
+    changed = serialize_document(elements, 10, 10, "0 0 10 10", cache)
+    assert changed == serialize_document(elements, 10, 10, "0 0 10 10")
+    assert changed != first
+    assert cache.misses == 5
@@ -0,0 +1,91 @@
+import numpy as np
+from nodetool.metadata.types import SVGElement
+from nodetool.nodes.lib.svg_native import render_primitives
+from nodetool.nodes.lib.svg_simplify import (
+    simplify_content,
+    simplify_path_data,
+    simplify_points,
+    simplify_polyline,
+)
+
+
+def reference(points, tolerance):
+    # Recursive Ramer-Douglas-Peucker
+    if len(points) < 3:
+        return points
+    a, b = points[0], points[-1]
+    ab = b - a
+    t = np.clip((points - a) @ ab / (ab @ ab), 0, 1)
+    distance = ((points - (a + t[:, None] * ab)) ** 2).sum(axis=1)
+    index = int(np.argmax(distance))
+    if distance[index] <= tolerance * tolerance:
+        return points[[0, -1]]
+    left = reference(points[: index + 1], tolerance)
+    return np.concatenate([left[:-1], reference(points[index:], tolerance)])
+
+
+def wavy_ring(points: int) -> np.ndarray:
+    t = np.linspace(0, 2 * np.pi, points, endpoint=False)
+    radius = 40 + 2 * np.sin(12 * t) + 0.05 * np.sin(301 * t)
+    return np.stack([50 + radius * np.cos(t), 50 + radius * np.sin(t)], axis=1)
+
+
+def test_matches_recursive_reference():
+    rng = np.random.default_rng(0)
+    for count in (3, 10, 500):
+        points = np.cumsum(rng.normal(size=(count, 2)), axis=0)
+        for tolerance in (0, 0.5, 3):
+            expected = reference(points, tolerance)
+            np.testing.assert_array_equal(
+                simplify_polyline(points, tolerance), expected
+            )
+
+
+def test_path_data_commands():
+    assert simplify_path_data("M0 0 l1 0 l1 0 1 0 v5 h-3 z", 0.1) == (
+        "M0,0 L3,0 3,5 0,5 Z"
+    )
+    assert simplify_path_data("M0,0 L1e1,0 20,0", 0.1) == "M0,0 L20,0"
+    # Drawing after a closepath starts at the closed subpath's start
+    assert simplify_path_data("M0 0 H2 V2 Z L0 5 L0 6 L0 7", 0.1) == (
+        "M0,0 L2,0 2,2 Z M0,0 L0,7"
+    )
+    # Curves and already minimal paths are returned as they are
+    for d in ("M0 0 C 1 1 2 2 3 3", "M0 0 L 5 5"):
+        assert simplify_path_data(d, 1) is d
+
+
+def test_points_attribute():
+    assert simplify_points("0,0 1,0 2,0 2,2 0,2", 0.1) == "0,0 2,0 2,2 0,2"
+    assert simplify_points("0,0 1,0 2", 0.1) == "0,0 1,0 2"
+
+
+def test_simplified_render_stays_within_tolerance():
+    ring = wavy_ring(20_000)
+    d = "M" + " L".join(f"{x},{y}" for x, y in ring) + "Z"
+    content = [SVGElement(name="path", attributes={"d": d, "fill": "#000000"})]
+    simplified = simplify_content(content, 0.25, 100, 100, "0 0 100 100")
+    assert simplified[0].attributes["d"].count(",") < 1_000
+    assert content[0].attributes["d"] == d
+
+    original = render_primitives(content, 100, 100, (0, 0, 100, 100))
+    reduced = render_primitives(simplified, 100, 100, (0, 0, 100, 100))
+    difference = np.abs(original[..., 3].astype(int) - reduced[..., 3])
+    # Edges move by at most the tolerance, plus the rasterizer's own error
+    assert difference.max() <= 0.25 * 255 + 24
+    assert difference.mean() < 1
+
+
+def test_content_tolerance_in_output_pixels():
+    ring = wavy_ring(2_000)
+    points = " ".join(f"{x},{y}" for x, y in ring)
+    polygon = SVGElement(name="polygon", attributes={"points": points})
+    transformed = SVGElement(name="g", attributes={"transform": "scale(2)"})
+    transformed.children.append(polygon)
+
+    coarse = simplify_content([polygon], 1, 100, 100, "0 0 100 100")
+    fine = simplify_content([polygon], 1, 100, 100, "0 0 100 100", scale=10)
+    assert len(fine[0].attributes["points"]) > len(coarse[0].attributes["points"])
+    assert simplify_content([transformed], 1, 100, 100, "0 0 100 100")[0] is (
+        transformed
+    )